@@ -24,7 +24,9 @@ async def run_advanced_backtest(request: BacktestAdvancedRequest):
     - Métricas profesionales (Sharpe, Sortino, Calmar, MAE/MFE)
     - Análisis por sesiones y días de la semana
     
-    **Tiempo estimado:** 30-60 segundos
+    `seed` hace reproducible el Monte Carlo.
+    
+    **Tiempo estimado:** 5-15 segundos (depende de la carga de datos históricos)
     """
     try:
         service = BacktestAdvancedService()
@@ -45,23 +47,18 @@ async def run_walk_forward_only(request: WalkForwardRequest):
     """
     Ejecuta solo Walk-Forward Analysis sin Monte Carlo.
     
-    Más rápido para validación rápida de robustez.
+    Ventanas rolling de in_sample_days + out_sample_days que avanzan
+    step_days. Por cada período retorna métricas in-sample, out-of-sample
+    y su degradación.
     
-    **Tiempo estimado:** 10-20 segundos
+    **Tiempo estimado:** 1-5 segundos (depende de la carga de datos históricos)
     """
     try:
         service = BacktestAdvancedService()
-        result = await service._run_walk_forward(
-            historical_data=None,  # Se obtiene dentro del servicio
-            request=BacktestAdvancedRequest(
-                signal_data=request.signal_data,
-                start_date=request.start_date,
-                end_date=request.end_date,
-                in_sample_percentage=70,
-                rolling_window_days=request.in_sample_days + request.out_sample_days
-            )
-        )
+        result = await service._run_walk_forward(request)
         return result
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -77,6 +74,8 @@ async def health_check():
     """
     Verifica que el servicio de backtesting avanzado está operativo.
     """
+    from app.services.historical_data_loader import get_historical_loader
+    
     return {
         "status": "operational",
         "service": "Backtesting Avanzado",
@@ -86,7 +85,8 @@ async def health_check():
             "Advanced Metrics (Sharpe, Sortino, Calmar)",
             "Session Analysis",
             "Weekday Analysis"
-        ]
+        ],
+        "candle_cache": get_historical_loader().cache.stats()
     }
 
 @router.post("/temporal-analysis")
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, HTTPException
 from app.models.macro_analysis import MacroAnalysisRequest, MacroAnalysisResponse
 from app.services.modules.macro_analysis import MacroAnalysisModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
+from app.services.reference_data import get_reference_data_cache
 
 router = APIRouter()
 
 @router.post("/macro-analysis", response_model=MacroAnalysisResponse)
 async def analyze_macro(request: MacroAnalysisRequest):
     try:
-        fetcher = MarketDataFetcher()
-        df_asset = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=50)
-        current_price = await fetcher.get_current_price(request.symbol)
-        df_btc = await fetcher.get_ohlcv("BTC/USDT", request.timeframe, limit=50)
-        df_eth = await fetcher.get_ohlcv("ETH/USDT", request.timeframe, limit=50)
+        async with get_market_data_fetcher() as fetcher:
+            df_asset = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=50)
+            current_price = await fetcher.get_current_price(request.symbol)
+            df_btc, df_eth = await get_reference_data_cache().get_macro_frames(
+                fetcher, request.timeframe, limit=50
+            )
 
         analyzer = MacroAnalysisModule()
         result = analyzer.analyze(
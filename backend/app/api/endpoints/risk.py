@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.risk_management import RiskManagementRequest, RiskManagementResponse
 from app.services.modules.risk_management import RiskManagementModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
 
 router = APIRouter()
 
@@ -17,9 +17,9 @@ async def analyze_risk(request: RiskManagementRequest):
     - Score de calidad del setup (0-4 puntos)
     """
     try:
-        fetcher = MarketDataFetcher()
-        df = await fetcher.get_ohlcv(request.symbol, request.timeframe)
-        current_price = await fetcher.get_current_price(request.symbol)
+        async with get_market_data_fetcher() as fetcher:
+            df = await fetcher.get_ohlcv(request.symbol, request.timeframe)
+            current_price = await fetcher.get_current_price(request.symbol)
         
         analyzer = RiskManagementModule()
         result = analyzer.analyze(
@@ -41,8 +41,8 @@ async def analyze_risk(request: RiskManagementRequest):
 async def test_risk():
     """Test rápido con BTC/USDT"""
     try:
-        fetcher = MarketDataFetcher()
-        current_price = await fetcher.get_current_price("BTC/USDT")
+        async with get_market_data_fetcher() as fetcher:
+            current_price = await fetcher.get_current_price("BTC/USDT")
         
         request = RiskManagementRequest(
             symbol="BTC/USDT",
@@ -1,7 +1,15 @@
 # backend/app/api/endpoints/scanner.py
+import json
+
 from fastapi import APIRouter, HTTPException
-from app.models.scanner import ScannerRequest, ScannerResponse
+from fastapi.responses import StreamingResponse
+from app.models.scanner import (
+    ScannerRequest, ScannerResponse,
+    MultiTimeframeScannerRequest, MultiTimeframeScannerResponse
+)
 from app.services.scanner_service import ScannerService
+from app.services.scanner_scheduler import get_scanner_scheduler
+from app.utils.exchange_pool import get_exchange_pool
 
 router = APIRouter()
 
@@ -22,10 +30,21 @@ async def run_scanner(request: ScannerRequest):
     - min_confluence: Filtro mínimo de confluencias (default 70%)
     
     Retorna top 10 oportunidades ordenadas por confluencias
+    
+    Se sirve desde el snapshot del scanner en segundo plano cuando existe
+    (from_snapshot / snapshot_age_seconds). force_refresh=True escanea en vivo.
     """
+    scheduler = get_scanner_scheduler()
+    cached = scheduler.get_response(request)
+    if cached is not None:
+        return cached
+    
+    scanner = ScannerService()
     try:
-        scanner = ScannerService()
         result = await scanner.scan_all_cryptos(request)
+        # all_results no depende de los filtros: un escaneo en vivo del universo renueva el snapshot
+        if scheduler.is_universe_scan(request):
+            scheduler.store(request.timeframe, result)
         return result
     except Exception as e:
         import traceback
@@ -33,24 +52,96 @@ async def run_scanner(request: ScannerRequest):
         print("ERROR SCANNER:")
         print(error_detail)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await scanner.close()
+
+@router.post("/stream")
+async def stream_scanner(request: ScannerRequest):
+    """
+    Escaneo en streaming (Server-Sent Events, text/event-stream)
+    
+    Mismos parámetros que /run. En lugar de esperar a todo el universo,
+    envía cada oportunidad en cuanto termina su análisis:
+    - event: start        → símbolos a escanear
+    - event: progress     → un evento por símbolo analizado
+    - event: opportunity  → CryptoOpportunity (pasa confluencia y filtros)
+    - event: summary      → resumen final ordenado por confluencias
+    - event: error        → error fatal del escaneo
+    """
+    if request.symbols and len(request.symbols) > 5:
+        raise HTTPException(status_code=400, detail="Máximo 5 símbolos permitidos para escaneo personalizado")
+    
+    async def event_stream():
+        scanner = ScannerService()
+        try:
+            async for event in scanner.scan_stream(request):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        except Exception as e:
+            import traceback
+            print(traceback.format_exc())
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            await scanner.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/multi-timeframe", response_model=MultiTimeframeScannerResponse)
+async def run_multi_timeframe_scanner(request: MultiTimeframeScannerRequest):
+    """
+    Escaneo multi-timeframe (análisis top-down)
+    
+    Descarga velas de 1h una sola vez por símbolo y construye localmente
+    (alineados a UTC como los del exchange) los timeframes que alcanzan
+    SCANNER_MTF_MIN_BARS velas; el resto se descarga nativo
+    (timeframe_sources indica el origen de cada uno; los símbolos cuyo
+    exchange devuelve menos velas de 1h usan el nativo). Retorna la
+    confluencia de cada símbolo en cada timeframe, si las direcciones
+    coinciden (aligned_direction) y el ScannerResponse de cada timeframe
+    con los filtros del request.
+    """
+    scanner = ScannerService()
+    try:
+        return await scanner.scan_multi_timeframe(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await scanner.close()
 
 @router.get("/test")
 async def test_scanner():
     """
     Test rápido del scanner con confluencia baja para ver resultados
     """
+    test_request = ScannerRequest(timeframe="1h", min_confluence=50.0)
+    cached = get_scanner_scheduler().get_response(test_request)
+    if cached is not None:
+        return cached
+    
+    scanner = ScannerService()
     try:
-        scanner = ScannerService()
-        test_request = ScannerRequest(timeframe="1h", min_confluence=50.0)
         result = await scanner.scan_all_cryptos(test_request)
         return result
     except Exception as e:
         import traceback
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await scanner.close()
 
 @router.get("/status")
 async def scanner_status():
     """Estado del scanner y configuración"""
     scanner = ScannerService()
-    return scanner.get_scanner_status()
+    status = scanner.get_scanner_status()
+    status["background"] = get_scanner_scheduler().status()
+    status["exchange_pool"] = get_exchange_pool().stats()
+    await scanner.close()
+    return status
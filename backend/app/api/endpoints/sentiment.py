@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.sentiment_analysis import SentimentAnalysisRequest, SentimentAnalysisResponse
 from app.services.modules.sentiment_analysis import SentimentAnalysisModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
 
 router = APIRouter()
 
@@ -18,9 +18,9 @@ async def analyze_sentiment(request: SentimentAnalysisRequest):
     Score total: 0-4 puntos
     """
     try:
-        fetcher = MarketDataFetcher()
-        df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=50)
-        current_price = await fetcher.get_current_price(request.symbol)
+        async with get_market_data_fetcher() as fetcher:
+            df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=50)
+            current_price = await fetcher.get_current_price(request.symbol)
 
         analyzer = SentimentAnalysisModule()
         result = analyzer.analyze(request.symbol, df, request.timeframe, current_price)
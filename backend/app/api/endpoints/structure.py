@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.market_structure import MarketStructureRequest, MarketStructureResponse
 from app.services.modules.market_structure import MarketStructureModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
 
 router = APIRouter()
 
@@ -18,9 +18,9 @@ async def analyze_structure(request: MarketStructureRequest):
     Score total: 0-5 puntos
     """
     try:
-        fetcher = MarketDataFetcher()
-        df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=200)
-        current_price = await fetcher.get_current_price(request.symbol)
+        async with get_market_data_fetcher() as fetcher:
+            df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=200)
+            current_price = await fetcher.get_current_price(request.symbol)
 
         analyzer = MarketStructureModule()
         result = analyzer.analyze(df, request.symbol, request.timeframe, current_price)
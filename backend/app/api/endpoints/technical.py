@@ -1,16 +1,16 @@
 from fastapi import APIRouter, HTTPException
 from app.models.technical_analysis import TechnicalAnalysisRequest, TechnicalAnalysisResponse
 from app.services.modules.technical_analysis import TechnicalAnalysisModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
 
 router = APIRouter()
 
 @router.post("/technical-analysis", response_model=TechnicalAnalysisResponse)
 async def analyze_technical(request: TechnicalAnalysisRequest):
     try:
-        fetcher = MarketDataFetcher()
-        df = await fetcher.get_ohlcv(request.symbol, request.timeframe)
-        current_price = await fetcher.get_current_price(request.symbol)
+        async with get_market_data_fetcher() as fetcher:
+            df = await fetcher.get_ohlcv(request.symbol, request.timeframe)
+            current_price = await fetcher.get_current_price(request.symbol)
         
         analyzer = TechnicalAnalysisModule()
         result = analyzer.analyze(df, request.symbol, request.timeframe, current_price)
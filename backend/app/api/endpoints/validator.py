@@ -1,5 +1,13 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import pandas as pd
 from fastapi import APIRouter, HTTPException, Query
-from app.models.signal_validator import ManualSignalRequest, SignalValidationResponse
+from app.models.signal_validator import (
+    ManualSignalRequest, SignalValidationResponse,
+    BatchSignalValidationRequest, BatchSignalValidationResponse, BatchSignalResult
+)
 from app.models.technical_analysis import TechnicalAnalysisRequest
 from app.models.market_structure import MarketStructureRequest
 from app.models.risk_management import RiskManagementRequest
@@ -12,10 +20,186 @@ from app.services.modules.risk_management import RiskManagementModule
 from app.services.modules.macro_analysis import MacroAnalysisModule
 from app.services.modules.sentiment_analysis import SentimentAnalysisModule
 from app.services.signal_validator_service import SignalValidatorService
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
+from app.services.reference_data import get_reference_data_cache
+from app.services.price_service import get_price_service
+from app.services.indicators import IndicatorContext
+from app.services.swing_points import SwingPointIndex
+from app.services.streaming_indicators import get_indicator_state_store
+from app.utils.rate_limiter import get_rate_limiter
+from app.config.crypto_config import get_exchange_for_crypto
 
 router = APIRouter()
 
+def _analyze_market(
+    symbol: str,
+    timeframe: str,
+    df: pd.DataFrame,
+    current_price: float,
+    df_btc: pd.DataFrame,
+    df_eth: pd.DataFrame
+) -> dict:
+    """
+    Módulos que no dependen de la señal (técnico, estructura, macro,
+    sentimiento). Se calculan una vez por (símbolo, timeframe) y se
+    comparten entre todas las señales del grupo.
+    """
+    # Contexto de indicadores: cada indicador se calcula una sola vez por frame
+    indicators = IndicatorContext(df)
+    # EMAs incrementales: solo se procesan las velas nuevas desde la última validación
+    live_indicators = get_indicator_state_store().sync(symbol, timeframe, df)
+
+    # Módulo 1: Técnico
+    tech_module = TechnicalAnalysisModule()
+    tech_result = tech_module.analyze(
+        df, symbol, timeframe, current_price, indicators, live_indicators
+    )
+
+    # Módulo 2: Estructura
+    struct_module = MarketStructureModule()
+    struct_result = struct_module.analyze(df, symbol, timeframe, current_price, indicators)
+
+    # Módulo 4: Macro
+    macro_module = MacroAnalysisModule()
+    macro_result = macro_module.analyze(
+        symbol,
+        df,
+        df_btc,
+        df_eth,
+        "1d",
+        current_price
+    )
+
+    # Módulo 5: Sentimiento
+    sent_module = SentimentAnalysisModule()
+    sent_result = sent_module.analyze(symbol, df, timeframe, current_price, indicators)
+
+    return {
+        "df": df,
+        "current_price": current_price,
+        "indicators": indicators,
+        "technical": tech_result,
+        "structure": struct_result,
+        "macro": macro_result,
+        "sentiment": sent_result
+    }
+
+
+def _validate_with_market(request: ManualSignalRequest, market: dict) -> dict:
+    """Riesgo y validación final de una señal sobre un análisis de mercado ya hecho."""
+    df = market["df"]
+    current_price = market["current_price"]
+    indicators = market["indicators"]
+    tech_result = market["technical"]
+    struct_result = market["structure"]
+    macro_result = market["macro"]
+    sent_result = market["sentiment"]
+
+    # Módulo 3: Riesgo
+    risk_module = RiskManagementModule()
+    # DESPUÉS (correcto):
+    risk_result = risk_module.analyze(
+        df,
+        request.symbol,
+        request.timeframe,
+        request.entry_price,
+        current_price,
+        request.stop_loss,
+        request.capital,
+        request.risk_percentage,
+        None,  # support_level
+        indicators
+    )
+
+    # Validación final
+    validator = SignalValidatorService()
+    validation = validator.validate_signal(
+        signal=request,
+        current_price=current_price,
+        tech_score=tech_result.total_score,
+        struct_score=struct_result.total_score,
+        risk_score=risk_result.total_score,
+        macro_score=macro_result.total_score,
+        sent_score=sent_result.total_score,
+        detailed_analysis={
+            "technical": {
+                "score": tech_result.total_score,
+                "recommendation": tech_result.recommendation,
+                "summary": tech_result.summary
+            },
+            "structure": {
+                "score": struct_result.total_score,
+                "recommendation": struct_result.recommendation,
+                "summary": struct_result.summary
+            },
+            "risk": {
+                "score": risk_result.total_score,
+                "recommendation": risk_result.recommendation,
+                "summary": risk_result.summary
+            },
+            "macro": {
+                "score": macro_result.total_score,
+                "recommendation": macro_result.recommendation,
+                "summary": macro_result.summary
+            },
+            "sentiment": {
+                "score": sent_result.total_score,
+                "recommendation": sent_result.recommendation,
+                "summary": sent_result.summary
+            }
+        }
+    )
+
+    # ✨ NUEVO: Datos listos para bitácora
+    journal_entry_data = {
+        # Datos de la señal
+        "activo": f"{request.symbol} {request.direction}",
+        "tipo_activo": "crypto",
+        "operacion": request.direction,
+
+        # Precios
+        "precio_entrada": request.entry_price,
+        "stop_loss": request.stop_loss,
+        "take_profit_1": request.take_profit_1,
+        "take_profit_2": request.take_profit_2,
+        "take_profit_3": request.take_profit_3,
+        "beneficio_esperado_porcentaje": ((request.take_profit_1 - request.entry_price) / request.entry_price * 100) if request.take_profit_1 else None,
+
+        # Gestión de riesgo
+        "capital_usado": request.capital,
+        "riesgo_porcentaje": request.risk_percentage,
+        "tamano_posicion": getattr(risk_result, 'position_size', None),
+        "apalancamiento_usado": getattr(risk_result, 'leverage_needed', None),
+        "margen_bloqueado": getattr(risk_result, 'margin_required', None),
+        "rr_ratio": getattr(risk_result, 'rr_ratio', None),
+
+        # Scores
+        "score_tecnico": tech_result.total_score,
+        "score_estructura": struct_result.total_score,
+        "score_riesgo": risk_result.total_score,
+        "score_macro": macro_result.total_score,
+        "score_sentimiento": sent_result.total_score,
+        "score_total": validation.scores.total,
+        "confluencia_porcentaje": validation.scores.percentage,
+        "recomendacion": validation.validation.recommendation,
+
+        # Análisis completo de los 5 módulos
+        "analisis_completo": {
+            "tecnico": tech_result.dict() if hasattr(tech_result, 'dict') else {},
+            "estructura": struct_result.dict() if hasattr(struct_result, 'dict') else {},
+            "macro": macro_result.dict() if hasattr(macro_result, 'dict') else {},
+            "sentimiento": sent_result.dict() if hasattr(sent_result, 'dict') else {},
+            "riesgo": risk_result.dict() if hasattr(risk_result, 'dict') else {}
+        }
+    }
+
+    # Convertir validation a dict y agregar journal_entry_data
+    response_dict = validation.dict()
+    response_dict["journal_entry_data"] = journal_entry_data
+
+    return response_dict
+
+
 @router.post("/validate-signal")
 async def validate_signal_manual(request: ManualSignalRequest):
     """
@@ -36,148 +220,140 @@ async def validate_signal_manual(request: ManualSignalRequest):
     - <55%: EVITAR (confianza baja)
     """
     try:
-        fetcher = MarketDataFetcher()
-
-        # Obtener datos de mercado
-        df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=200)
-        current_price = await fetcher.get_current_price(request.symbol)
-
-        # Módulo 1: Técnico
-        tech_module = TechnicalAnalysisModule()
-        tech_result = tech_module.analyze(df, request.symbol, request.timeframe, current_price)
-
-        # Módulo 2: Estructura
-        struct_module = MarketStructureModule()
-        struct_result = struct_module.analyze(df, request.symbol, request.timeframe, current_price)
-
-        # Módulo 3: Riesgo
-        risk_module = RiskManagementModule()
-        # DESPUÉS (correcto):
-        risk_result = risk_module.analyze(
-            df,
-            request.symbol,
-            request.timeframe,
-            request.entry_price,
-            current_price,
-            request.stop_loss,
-            request.capital,
-            request.risk_percentage,
-            None  # support_level
-        )
-
-        # Módulo 4: Macro
-        df_btc = await fetcher.get_ohlcv("BTC/USDT", "1d", limit=50)
-        df_eth = await fetcher.get_ohlcv("ETH/USDT", "1d", limit=50)
-
-        macro_module = MacroAnalysisModule()
-        macro_result = macro_module.analyze(
-            request.symbol,
-            df,
-            df_btc,
-            df_eth,
-            "1d",
-            current_price
-        )
+        # Obtener datos de mercado (clientes async, no bloquean el event loop)
+        async with get_market_data_fetcher() as fetcher:
+            df = await fetcher.get_ohlcv(request.symbol, request.timeframe, limit=200)
+            current_price = await get_price_service().get_price(fetcher, request.symbol)
+            df_btc, df_eth = await get_reference_data_cache().get_macro_frames(fetcher, "1d", limit=50)
 
-        # Módulo 5: Sentimiento
-        sent_module = SentimentAnalysisModule()
-        sent_result = sent_module.analyze(request.symbol, df, request.timeframe, current_price)
+        market = _analyze_market(request.symbol, request.timeframe, df, current_price, df_btc, df_eth)
+        return _validate_with_market(request, market)
 
-        # Validación final
-        validator = SignalValidatorService()
-        validation = validator.validate_signal(
-            signal=request,
-            current_price=current_price,
-            tech_score=tech_result.total_score,
-            struct_score=struct_result.total_score,
-            risk_score=risk_result.total_score,
-            macro_score=macro_result.total_score,
-            sent_score=sent_result.total_score,
-            detailed_analysis={
-                "technical": {
-                    "score": tech_result.total_score,
-                    "recommendation": tech_result.recommendation,
-                    "summary": tech_result.summary
-                },
-                "structure": {
-                    "score": struct_result.total_score,
-                    "recommendation": struct_result.recommendation,
-                    "summary": struct_result.summary
-                },
-                "risk": {
-                    "score": risk_result.total_score,
-                    "recommendation": risk_result.recommendation,
-                    "summary": risk_result.summary
-                },
-                "macro": {
-                    "score": macro_result.total_score,
-                    "recommendation": macro_result.recommendation,
-                    "summary": macro_result.summary
-                },
-                "sentiment": {
-                    "score": sent_result.total_score,
-                    "recommendation": sent_result.recommendation,
-                    "summary": sent_result.summary
-                }
-            }
-        )
+    except Exception as e:
+        import traceback
+        error_detail = traceback.format_exc()
+        print("ERROR COMPLETO:")
+        print(error_detail)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # ✨ NUEVO: Datos listos para bitácora
-        journal_entry_data = {
-            # Datos de la señal
-            "activo": f"{request.symbol} {request.direction}",
-            "tipo_activo": "crypto",
-            "operacion": request.direction,
-
-            # Precios
-            "precio_entrada": request.entry_price,
-            "stop_loss": request.stop_loss,
-            "take_profit_1": request.take_profit_1,
-            "take_profit_2": request.take_profit_2,
-            "take_profit_3": request.take_profit_3,
-            "beneficio_esperado_porcentaje": ((request.take_profit_1 - request.entry_price) / request.entry_price * 100) if request.take_profit_1 else None,
-
-            # Gestión de riesgo
-            "capital_usado": request.capital,
-            "riesgo_porcentaje": request.risk_percentage,
-            "tamano_posicion": getattr(risk_result, 'position_size', None),
-            "apalancamiento_usado": getattr(risk_result, 'leverage_needed', None),
-            "margen_bloqueado": getattr(risk_result, 'margin_required', None),
-            "rr_ratio": getattr(risk_result, 'rr_ratio', None),
-
-            # Scores
-            "score_tecnico": tech_result.total_score,
-            "score_estructura": struct_result.total_score,
-            "score_riesgo": risk_result.total_score,
-            "score_macro": macro_result.total_score,
-            "score_sentimiento": sent_result.total_score,
-            "score_total": validation.scores.total,
-            "confluencia_porcentaje": validation.scores.percentage,
-            "recomendacion": validation.validation.recommendation,
-
-            # Análisis completo de los 5 módulos
-            "analisis_completo": {
-                "tecnico": tech_result.dict() if hasattr(tech_result, 'dict') else {},
-                "estructura": struct_result.dict() if hasattr(struct_result, 'dict') else {},
-                "macro": macro_result.dict() if hasattr(macro_result, 'dict') else {},
-                "sentimiento": sent_result.dict() if hasattr(sent_result, 'dict') else {},
-                "riesgo": risk_result.dict() if hasattr(risk_result, 'dict') else {}
-            }
-        }
+@router.post("/validate-signals/batch", response_model=BatchSignalValidationResponse)
+async def validate_signals_batch(request: BatchSignalValidationRequest):
+    """
+    Valida varias señales en una sola llamada
 
-        # Convertir validation a dict y agregar journal_entry_data
-        response_dict = validation.dict()
-        response_dict["journal_entry_data"] = journal_entry_data
+    Las señales se agrupan por (símbolo, timeframe): velas, precio e
+    indicadores se cargan una vez por grupo y los módulos que no dependen
+    de la señal (técnico, estructura, macro, sentimiento) se calculan una
+    sola vez; solo riesgo y validación final se hacen por señal. BTC/ETH y
+    precios se obtienen una vez para todo el lote. Los grupos se analizan
+    en paralelo (max_concurrency).
 
-        return response_dict
+    Retorna un resultado por señal (mismo orden que signals; un error en
+    una señal no invalida las demás) y tiempos por fase y por grupo.
+    """
+    started = time.monotonic()
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for index, signal in enumerate(request.signals):
+        groups.setdefault((signal.symbol, signal.timeframe), []).append(index)
+
+    results: List[BatchSignalResult] = [None] * len(request.signals)
+    group_timing = []
+
+    def fail(index: int, error: str) -> BatchSignalResult:
+        signal = request.signals[index]
+        return BatchSignalResult(
+            index=index, symbol=signal.symbol, timeframe=signal.timeframe,
+            success=False, error=error
+        )
 
+    try:
+        async with get_market_data_fetcher() as fetcher:
+            # Datos compartidos por todo el lote
+            shared_started = time.monotonic()
+            (df_btc, df_eth), prices = await asyncio.gather(
+                get_reference_data_cache().get_macro_frames(fetcher, "1d", limit=50),
+                get_price_service().get_prices(fetcher, {symbol for symbol, _ in groups})
+            )
+            shared_seconds = time.monotonic() - shared_started
+
+            semaphore = asyncio.Semaphore(request.max_concurrency)
+
+            async def run_group(symbol: str, timeframe: str, indices: List[int]):
+                async with semaphore:
+                    group_started = time.monotonic()
+                    try:
+                        await get_rate_limiter(get_exchange_for_crypto(symbol)).acquire_async()
+                        df = await fetcher.get_ohlcv(symbol, timeframe, limit=200)
+                        current_price = prices.get(symbol)
+                        if current_price is None:
+                            current_price = await get_price_service().get_price(fetcher, symbol)
+                    except Exception as e:
+                        for index in indices:
+                            results[index] = fail(index, str(e))
+                        return
+                    fetched = time.monotonic()
+
+                    def analyze():
+                        market = _analyze_market(symbol, timeframe, df, current_price, df_btc, df_eth)
+                        outcomes = []
+                        for index in indices:
+                            try:
+                                outcomes.append((index, _validate_with_market(request.signals[index], market), None))
+                            except Exception as e:
+                                outcomes.append((index, None, str(e)))
+                        return outcomes
+
+                    # Cálculo fuera del event loop: los grupos avanzan en paralelo
+                    try:
+                        outcomes = await asyncio.to_thread(analyze)
+                    except Exception as e:
+                        outcomes = [(index, None, str(e)) for index in indices]
+
+                    for index, result, error in outcomes:
+                        if error is not None:
+                            results[index] = fail(index, error)
+                        else:
+                            results[index] = BatchSignalResult(
+                                index=index, symbol=symbol, timeframe=timeframe,
+                                success=True, result=result
+                            )
+
+                    group_timing.append({
+                        "symbol": symbol,
+                        "timeframe": timeframe,
+                        "signals": len(indices),
+                        "fetch_seconds": round(fetched - group_started, 3),
+                        "analysis_seconds": round(time.monotonic() - fetched, 3)
+                    })
+
+            await asyncio.gather(*[
+                run_group(symbol, timeframe, indices)
+                for (symbol, timeframe), indices in groups.items()
+            ])
     except Exception as e:
         import traceback
-        error_detail = traceback.format_exc()
-        print("ERROR COMPLETO:")
-        print(error_detail)
+        print("ERROR VALIDACIÓN EN LOTE:")
+        print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+    succeeded = sum(1 for r in results if r.success)
+    total_seconds = time.monotonic() - started
+    print(f"✅ Lote validado: {succeeded}/{len(results)} señales en {len(groups)} grupos ({total_seconds:.2f}s)")
+
+    return BatchSignalValidationResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        groups=len(groups),
+        results=results,
+        timing={
+            "total_seconds": round(total_seconds, 3),
+            "shared_data_seconds": round(shared_seconds, 3),
+            "per_signal_seconds": round(total_seconds / len(results), 3),
+            "groups": group_timing
+        }
+    )
+
 @router.get("/validate-signal/test")
 async def test_validator():
     """Test con señal de ejemplo en BTC/USDT"""
@@ -234,6 +410,9 @@ async def analyze_entry_context(data: dict):
     - Ruptura alcista/bajista
     - Continuación de tendencia
     - Reversión en zona clave
+    
+    use_swing_levels (opcional): usar los swing points agrupados como
+    soporte/resistencia en vez del mínimo/máximo de las últimas 30 velas.
     """
     try:
         from app.services.entry_context_analyzer import get_entry_context_analyzer
@@ -264,7 +443,8 @@ async def analyze_entry_context(data: dict):
         context = analyzer.analyze_entry_context(
             entry_price=entry_price,
             direction=direction,
-            historical_data=historical_data
+            historical_data=historical_data,
+            use_swing_levels=bool(data.get('use_swing_levels', False))
         )
         
         return context
@@ -337,7 +517,8 @@ async def validate_breakout_signal(
         result = breakout_validator.validate_breakout(
             df=df,
             current_price=current_price,
-            resistance_price=resistance_price
+            resistance_price=resistance_price,
+            live_indicators=get_indicator_state_store().sync(symbol, timeframe, df)
         )
         
         # 3. Agregar metadata
@@ -421,13 +602,29 @@ async def delete_trading_level(level_id: str):
 
 @router.post("/levels/analyze")
 async def analyze_levels_proximity(data: dict):
-    """Analizar proximidad de entrada a niveles clave"""
+    """
+    Analizar proximidad de entrada a niveles clave
+    
+    Si no se envía entry_price se usa el precio actual (PriceService).
+    Si se envía timeframe, también se puntúan los soportes/resistencias
+    detectados en las velas (swing points).
+    """
     try:
         symbol = data.get("symbol")
         entry_price = data.get("entry_price")
         direction = data.get("direction", "LONG")
+        timeframe = data.get("timeframe")
+        swing_index = None
+        
+        if entry_price is None or timeframe:
+            async with get_market_data_fetcher() as fetcher:
+                if entry_price is None:
+                    entry_price = await get_price_service().get_price(fetcher, symbol)
+                if timeframe:
+                    df = await fetcher.get_ohlcv(symbol, timeframe, limit=500)
+                    swing_index = SwingPointIndex.from_frame(df)
         
-        analysis = levels_service.analyze_proximity(symbol, entry_price, direction)
-        return {"success": True, "analysis": analysis}
+        analysis = levels_service.analyze_proximity(symbol, entry_price, direction, swing_index)
+        return {"success": True, "entry_price": entry_price, "analysis": analysis}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -61,6 +61,16 @@ CRYPTO_CONFIG = {
 }
 
 
+# Presupuesto de requests por exchange (requests/segundo)
+# Equivale a los delays históricos: 0.6s Kraken, 0.3s el resto
+EXCHANGE_RATE_LIMITS = {
+    "kraken": 1 / 0.6,
+    "kucoin": 1 / 0.3,
+    "coinex": 1 / 0.3,
+    "binance": 1 / 0.3,
+}
+
+
 def get_crypto_config():
     """Retorna la configuración completa de criptomonedas"""
     return CRYPTO_CONFIG
@@ -83,6 +93,11 @@ def get_exchange_for_crypto(symbol: str):
     return "binance"  # Default
 
 
+def get_exchange_rate_limit(exchange: str) -> float:
+    """Requests por segundo permitidos para un exchange"""
+    return EXCHANGE_RATE_LIMITS.get(exchange, 1 / 0.6)
+
+
 def get_all_symbols():
     """Retorna lista de todos los símbolos configurados"""
     return list(CRYPTO_CONFIG.keys())
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # API Settings
@@ -13,6 +13,38 @@ class Settings(BaseSettings):
     DEFAULT_RISK_PERCENTAGE: float = 2.0  # 2% por trade
     DEFAULT_CAPITAL: float = 1000.0  # Capital default en USD
 
+    # Caché de velas en memoria (HistoricalDataLoader)
+    CANDLE_CACHE_MAX_MB: float = 256.0
+
+    # TTL de las series BTC/ETH compartidas por el módulo macro
+    REFERENCE_DATA_TTL_SECONDS: float = 300.0
+
+    # TTL de los precios actuales obtenidos en bloque (fetch_tickers)
+    PRICE_CACHE_TTL_SECONDS: float = 0.5
+
+    # Scanner en segundo plano (snapshots por timeframe al cierre de vela).
+    # Opcional: cada proceso que lo activa escanea todo el universo, así que
+    # con varios workers de uvicorn se activa solo en uno (variable de entorno)
+    SCANNER_SCHEDULER_ENABLED: bool = False
+    SCANNER_TIMEFRAMES: List[str] = ["1h", "4h", "1d"]
+    SCANNER_CLOSE_DELAY_SECONDS: float = 10.0
+
+    # Scanner multi-timeframe: velas base descargadas una vez y resampleadas.
+    # Los timeframes que no alcanzan SCANNER_MTF_MIN_BARS velas resampleadas
+    # se descargan nativos (EMA200 necesita 200 velas). 1000 velas de 1h
+    # (una petición en KuCoin/CoinEx) dan 249 de 4h; 1d se descarga nativo
+    SCANNER_MTF_BASE_TIMEFRAME: str = "1h"
+    SCANNER_MTF_BASE_LIMIT: int = 1000
+    SCANNER_MTF_MIN_BARS: int = 200
+
+    # Monte Carlo del backtest avanzado: techo de memoria total (bloques en
+    # vuelo + intérpretes del pool), puntos de cada curva de ejemplo y
+    # procesos del pool (0 = los núcleos asignados al proceso; el techo de
+    # memoria puede reducirlos)
+    MONTE_CARLO_MAX_CHUNK_MB: float = 1024.0
+    MONTE_CARLO_SAMPLE_POINTS: int = 200
+    MONTE_CARLO_WORKERS: int = 0
+
     # API Keys (se configuran en Replit Secrets)
     KRAKEN_API_KEY: Optional[str] = None
     KRAKEN_API_SECRET: Optional[str] = None
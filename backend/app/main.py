@@ -69,6 +69,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_exchange_pool():
+    # Clientes ccxt compartidos por todo el proceso (se crean al primer uso)
+    from app.utils.exchange_pool import get_exchange_pool
+    get_exchange_pool()
+    logger.info("🔌 Pool de exchanges listo")
+
+@app.on_event("startup")
+async def start_background_scanner():
+    if settings.SCANNER_SCHEDULER_ENABLED:
+        from app.services.scanner_scheduler import get_scanner_scheduler
+        get_scanner_scheduler().start()
+
+@app.on_event("shutdown")
+async def stop_background_scanner():
+    if settings.SCANNER_SCHEDULER_ENABLED:
+        from app.services.scanner_scheduler import get_scanner_scheduler
+        await get_scanner_scheduler().stop()
+
+@app.on_event("shutdown")
+async def close_exchange_pool():
+    from app.utils.exchange_pool import get_exchange_pool
+    await get_exchange_pool().close()
+
+@app.on_event("shutdown")
+async def close_monte_carlo_pool():
+    from app.services.monte_carlo import shutdown_monte_carlo_pool
+    shutdown_monte_carlo_pool()
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
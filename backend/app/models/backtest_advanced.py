@@ -21,6 +21,7 @@ class BacktestAdvancedRequest(BaseModel):
     # Monte Carlo params
     num_simulations: int = Field(default=10000, ge=1000, le=50000)
     confidence_level: float = Field(default=95, ge=90, le=99)
+    seed: Optional[int] = Field(None, ge=0, description="Semilla para reproducir el Monte Carlo")
     
     # Filtros
     min_score: Optional[int] = Field(None, ge=0, le=100)
@@ -34,9 +35,11 @@ class WalkForwardRequest(BaseModel):
     signal_data: dict
     start_date: str
     end_date: str
-    in_sample_days: int = Field(default=60)
-    out_sample_days: int = Field(default=30)
-    step_days: int = Field(default=15)
+    in_sample_days: int = Field(default=60, ge=1)
+    out_sample_days: int = Field(default=30, ge=1)
+    step_days: int = Field(default=15, ge=1)
+    initial_capital: float = Field(default=10000, ge=1000)
+    risk_per_trade: float = Field(default=2.0, ge=0.5, le=10)
 
 
 # ========================================
@@ -110,7 +113,12 @@ class MonteCarloResults(BaseModel):
     probability_of_profit: float
     probability_of_ruin: float  # Equity < 50% inicial
     
-    # Equity curves (sample de 100)
+    # Max drawdown (%) por simulación
+    mean_max_drawdown_pct: Optional[float] = None
+    median_max_drawdown_pct: Optional[float] = None
+    percentile_95_max_drawdown_pct: Optional[float] = None
+    
+    # Equity curves (sample de 100, submuestreadas)
     sample_curves: List[List[float]]
 
 
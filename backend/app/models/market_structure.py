@@ -35,12 +35,17 @@ class Divergence(BaseModel):
     indicator: str  # "RSI" o "MACD"
     strength: str  # "strong", "moderate", "weak"
     timeframe: str
+    bar_index: Optional[int] = None  # Vela (posición en el DataFrame) del último pivot
+    previous_bar_index: Optional[int] = None  # Vela del pivot anterior
 
 class DivergenceAnalysis(BaseModel):
     rsi_divergence: Optional[Divergence]
     macd_divergence: Optional[Divergence]
-    has_divergence: bool
+    has_divergence: bool  # Alguna divergencia alcista (RSI o MACD)
     score: int  # 0-1 punto
+    rsi_bearish_divergence: Optional[Divergence] = None
+    macd_bearish_divergence: Optional[Divergence] = None
+    has_bearish_divergence: bool = False
 
 class MarketStructureResponse(BaseModel):
     symbol: str
@@ -1,6 +1,6 @@
 # backend/app/models/scanner.py
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ScannerRequest(BaseModel):
@@ -26,6 +26,27 @@ class ScannerRequest(BaseModel):
         default=None,
         description="Filtrar por exchanges: ['kraken'], ['binance'], ['kraken', 'binance'], o None para todos"
     )
+    
+    # 🆕 ESCANEO CONCURRENTE
+    concurrent: bool = Field(
+        default=True,
+        description="Analizar símbolos en paralelo (exchanges en paralelo entre sí)"
+    )
+    max_concurrency_per_exchange: int = Field(
+        default=3,
+        ge=1,
+        le=20,
+        description="Análisis simultáneos máximos por exchange"
+    )
+    deadline_seconds: float = Field(
+        default=90.0,
+        gt=0,
+        description="Tiempo máximo del escaneo; los símbolos sin terminar se reportan como TIMEOUT"
+    )
+    force_refresh: bool = Field(
+        default=False,
+        description="Ignorar el snapshot del scanner en segundo plano y escanear en vivo"
+    )
 
 class CryptoOpportunity(BaseModel):
     """Oportunidad detectada en una criptomoneda"""
@@ -54,3 +75,45 @@ class ScannerResponse(BaseModel):
     
     # 🆕 Información de filtros aplicados
     filters_applied: Optional[dict] = None
+    
+    # 🆕 Snapshot del scanner en segundo plano
+    from_snapshot: bool = False
+    snapshot_age_seconds: Optional[float] = None
+
+
+# 🆕 SCANNER MULTI-TIMEFRAME
+
+class MultiTimeframeScannerRequest(ScannerRequest):
+    """Request para escanear varios timeframes con una sola descarga de velas"""
+    timeframes: List[str] = Field(
+        default=["1h", "4h", "1d"],
+        description="Timeframes a analizar; se construyen a partir del timeframe base (1h) si alcanzan las velas mínimas, si no se descargan nativos"
+    )
+
+class TimeframeConfluence(BaseModel):
+    """Resultado de un símbolo en un timeframe"""
+    timeframe: str
+    confluence_percentage: int
+    recommendation: str
+    total_score: int
+    direction: Optional[str] = None
+
+class MultiTimeframeResult(BaseModel):
+    """Confluencias de un símbolo en todos los timeframes (top-down)"""
+    symbol: str
+    exchange: str
+    current_price: float
+    timeframes: Dict[str, TimeframeConfluence]
+    average_confluence: float
+    aligned_direction: Optional[str] = None  # LONG/SHORT si todos los timeframes coinciden
+
+class MultiTimeframeScannerResponse(BaseModel):
+    """Response del scanner multi-timeframe"""
+    timestamp: str
+    base_timeframe: str
+    timeframes: List[str]
+    timeframe_sources: Dict[str, str] = {}  # "resampled" (desde el base) o "native" (descarga propia)
+    total_scanned: int
+    results: List[MultiTimeframeResult]
+    per_timeframe: Dict[str, ScannerResponse]
+    elapsed_seconds: float
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class ManualSignalRequest(BaseModel):
@@ -37,4 +37,34 @@ class SignalValidationResponse(BaseModel):
     scores: ModuleScores
     validation: ValidationResult
     summary: str
-    detailed_analysis: dict
\ No newline at end of file
+    detailed_analysis: dict
+
+
+# 🆕 VALIDACIÓN EN LOTE
+
+class BatchSignalValidationRequest(BaseModel):
+    """Varias señales validadas en una sola llamada"""
+    signals: List[ManualSignalRequest] = Field(..., min_length=1, max_length=100)
+    max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=16,
+        description="Grupos (símbolo, timeframe) analizados a la vez"
+    )
+
+class BatchSignalResult(BaseModel):
+    """Resultado de una señal del lote (en el orden recibido)"""
+    index: int
+    symbol: str
+    timeframe: str
+    success: bool
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+class BatchSignalValidationResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    groups: int
+    results: List[BatchSignalResult]
+    timing: dict
@@ -5,14 +5,18 @@ Servicio de Backtesting Avanzado
 - Métricas Profesionales
 """
 
+import asyncio
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 from dataclasses import asdict
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import random
 
+from app.core.config import settings
 from app.services.historical_data_loader import get_historical_loader
+from app.services.monte_carlo import run_parallel
 from app.services.trading_costs import get_trading_costs
 from app.services.backtest_reality_check import get_reality_checker
 from app.models.backtest_advanced import (
@@ -20,9 +24,16 @@ from app.models.backtest_advanced import (
     BacktestAdvancedResponse,
     AdvancedMetrics,
     MonteCarloResults,
-    WalkForwardPeriod
+    WalkForwardPeriod,
+    WalkForwardRequest
 )
 
+# Velas posteriores a la entrada en las que se buscan SL/TP
+EXIT_HORIZON = 49
+
+# Degradación media del win rate (in → out of sample) tolerada en walk-forward
+WF_MAX_WIN_RATE_DEGRADATION = 20.0
+
 
 class BacktestAdvancedService:
     """Servicio de backtesting avanzado con Walk-Forward y Monte Carlo."""
@@ -37,26 +48,12 @@ class BacktestAdvancedService:
         """Ejecuta backtesting avanzado completo."""
         
         # Cargar datos históricos REALES
+        historical_data = None
         try:
-            loader = get_historical_loader()
-            
-            symbol = request.signal_data.get('symbol', 'BTC/USDT')
-            timeframe = request.signal_data.get('timeframe', '1h')
-            
-            start = datetime.strptime(request.start_date, '%Y-%m-%d')
-            end = datetime.strptime(request.end_date, '%Y-%m-%d')
-            
-            print(f"📊 Cargando datos: {symbol} {timeframe} desde {start} hasta {end}")
-            
-            historical_data = loader.load_data(
-                symbol=symbol,
-                timeframe=timeframe,
-                start_date=start,
-                end_date=end
+            historical_data = self._load_historical_data(
+                request.signal_data, request.start_date, request.end_date
             )
             
-            print(f"✅ {len(historical_data)} velas cargadas")
-            
             # Simular trades sobre datos reales
             all_trades = self._simulate_trades_on_data(
                 historical_data,
@@ -68,27 +65,37 @@ class BacktestAdvancedService:
         except Exception as e:
             print(f"⚠️ Error: {e}")
             print("Usando fallback a datos simulados")
+            historical_data = None
             all_trades = self._generate_mock_trades(200)
         
-        # Walk-Forward (simplificado)
-        walk_forward_result = {
-            'periods': [],
-            'summary': {
-                'total_periods': 0,
-                'avg_win_rate_degradation': 0.0,
-                'total_out_sample_trades': len(all_trades),
-                'consistent': True,
-                'message': "Estrategia consistente"
-            },
-            'trades': all_trades
-        }
+        # Walk-Forward: ventana rolling dividida según in_sample_percentage,
+        # avanzando lo que dura el out-of-sample
+        if historical_data is not None:
+            in_sample_days = max(1, round(request.rolling_window_days * request.in_sample_percentage / 100))
+            out_sample_days = max(1, request.rolling_window_days - in_sample_days)
+            walk_forward_result = await self._run_walk_forward(
+                WalkForwardRequest(
+                    signal_data=request.signal_data,
+                    start_date=request.start_date,
+                    end_date=request.end_date,
+                    in_sample_days=in_sample_days,
+                    out_sample_days=out_sample_days,
+                    step_days=out_sample_days,
+                    initial_capital=request.initial_capital,
+                    risk_per_trade=request.risk_per_trade
+                ),
+                historical_data=historical_data
+            )
+        else:
+            walk_forward_result = {'periods': [], 'summary': self._walk_forward_summary([])}
         
         # Monte Carlo Simulation
         monte_carlo_result = await self._run_monte_carlo(
             trades=all_trades,
             initial_capital=request.initial_capital,
             num_simulations=request.num_simulations,
-            confidence_level=request.confidence_level
+            confidence_level=request.confidence_level,
+            seed=request.seed
         )
         
         # Métricas avanzadas
@@ -125,12 +132,178 @@ class BacktestAdvancedService:
             reality_check=asdict(reality_check)
         )
     
+    def _load_historical_data(self, signal_data: dict, start_date: str, end_date: str) -> pd.DataFrame:
+        """Carga las velas del símbolo/timeframe de la señal en el rango pedido."""
+        loader = get_historical_loader()
+        
+        symbol = signal_data.get('symbol', 'BTC/USDT')
+        timeframe = signal_data.get('timeframe', '1h')
+        
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        
+        print(f"📊 Cargando datos: {symbol} {timeframe} desde {start} hasta {end}")
+        
+        historical_data = loader.load_data(
+            symbol=symbol,
+            timeframe=timeframe,
+            start_date=start,
+            end_date=end
+        )
+        
+        print(f"✅ {len(historical_data)} velas cargadas")
+        return historical_data
+    
+    async def _run_walk_forward(
+        self,
+        request: WalkForwardRequest,
+        historical_data: Optional[pd.DataFrame] = None
+    ) -> dict:
+        """
+        Walk-Forward Analysis con ventanas rolling.
+        
+        Cada período simula la estrategia en su in-sample y en el
+        out-of-sample siguiente y mide la degradación. Las velas y el ATR
+        se calculan una sola vez; cada ventana es un slice de esos arrays
+        y los períodos se evalúan en paralelo en hilos.
+        
+        Returns:
+            {'periods': List[WalkForwardPeriod], 'summary': dict}
+        """
+        if historical_data is None:
+            historical_data = self._load_historical_data(
+                request.signal_data, request.start_date, request.end_date
+            )
+        
+        arrays = self._market_arrays(historical_data)
+        folds = self._walk_forward_folds(arrays['time_ns'], request)
+        
+        periods = await asyncio.gather(*[
+            asyncio.to_thread(self._evaluate_walk_forward_fold, arrays, number, fold, request)
+            for number, fold in enumerate(folds, start=1)
+        ])
+        periods = list(periods)
+        
+        print(f"🔁 Walk-Forward: {len(periods)} períodos")
+        return {
+            'periods': periods,
+            'summary': self._walk_forward_summary(periods)
+        }
+    
+    def _walk_forward_folds(self, time_ns: np.ndarray, request: WalkForwardRequest) -> List[Tuple[int, ...]]:
+        """
+        Ventanas (inicio, fin in-sample, fin out-of-sample) en ns y sus
+        posiciones [a, b) / [b, c) en los arrays. Solo se incluyen los
+        períodos cuyo out-of-sample cabe completo en los datos.
+        """
+        if len(time_ns) == 0:
+            return []
+        
+        day = pd.Timedelta(days=1).value
+        in_sample = request.in_sample_days * day
+        out_sample = request.out_sample_days * day
+        step = request.step_days * day
+        
+        folds = []
+        start = int(time_ns[0])
+        while start + in_sample + out_sample <= time_ns[-1]:
+            bounds = (start, start + in_sample, start + in_sample + out_sample)
+            positions = np.searchsorted(time_ns, bounds)
+            folds.append(bounds + tuple(int(p) for p in positions))
+            start += step
+        return folds
+    
+    def _evaluate_walk_forward_fold(
+        self,
+        arrays: dict,
+        number: int,
+        fold: Tuple[int, ...],
+        request: WalkForwardRequest
+    ) -> WalkForwardPeriod:
+        """Simula in-sample y out-of-sample de un período y compara métricas."""
+        start, in_end, out_end, a, b, c = fold
+        
+        in_stats = self._window_stats(
+            self._simulate_window(arrays, a, b, request.signal_data, request.initial_capital, request.risk_per_trade),
+            request.initial_capital
+        )
+        out_stats = self._window_stats(
+            self._simulate_window(arrays, b, c, request.signal_data, request.initial_capital, request.risk_per_trade),
+            request.initial_capital
+        )
+        
+        win_rate_degradation = (
+            (in_stats['win_rate'] - out_stats['win_rate']) / in_stats['win_rate'] * 100
+            if in_stats['win_rate'] > 0 else 0.0
+        )
+        sharpe_degradation = (
+            (in_stats['sharpe'] - out_stats['sharpe']) / abs(in_stats['sharpe']) * 100
+            if in_stats['sharpe'] != 0 else 0.0
+        )
+        
+        date = lambda ns: pd.Timestamp(ns).strftime('%Y-%m-%d')
+        
+        return WalkForwardPeriod(
+            period_number=number,
+            in_sample_start=date(start),
+            in_sample_end=date(in_end),
+            out_sample_start=date(in_end),
+            out_sample_end=date(out_end),
+            in_sample_trades=in_stats['trades'],
+            in_sample_win_rate=round(in_stats['win_rate'], 2),
+            in_sample_pnl=round(in_stats['pnl'], 2),
+            in_sample_sharpe=round(in_stats['sharpe'], 2),
+            out_sample_trades=out_stats['trades'],
+            out_sample_win_rate=round(out_stats['win_rate'], 2),
+            out_sample_pnl=round(out_stats['pnl'], 2),
+            out_sample_sharpe=round(out_stats['sharpe'], 2),
+            win_rate_degradation=round(win_rate_degradation, 2),
+            sharpe_degradation=round(sharpe_degradation, 2)
+        )
+    
+    def _window_stats(self, trades: List[dict], initial_capital: float) -> dict:
+        """Trades, win rate, P&L y Sharpe de una ventana."""
+        total = len(trades)
+        wins = sum(1 for t in trades if t['pnl'] > 0)
+        return {
+            'trades': total,
+            'win_rate': (wins / total * 100) if total > 0 else 0.0,
+            'pnl': float(sum(t['pnl'] for t in trades)),
+            'sharpe': float(self._calculate_sharpe([t['pnl'] / initial_capital for t in trades]))
+        }
+    
+    def _walk_forward_summary(self, periods: List[WalkForwardPeriod]) -> dict:
+        """Resumen de los períodos walk-forward."""
+        if not periods:
+            return {
+                'total_periods': 0,
+                'avg_win_rate_degradation': 0.0,
+                'total_out_sample_trades': 0,
+                'profitable_out_sample_pct': 0.0,
+                'consistent': False,
+                'message': "Datos insuficientes para walk-forward"
+            }
+        
+        avg_degradation = float(np.mean([p.win_rate_degradation for p in periods]))
+        profitable_pct = sum(1 for p in periods if p.out_sample_pnl > 0) / len(periods) * 100
+        consistent = avg_degradation <= WF_MAX_WIN_RATE_DEGRADATION and profitable_pct >= 50
+        
+        return {
+            'total_periods': len(periods),
+            'avg_win_rate_degradation': round(avg_degradation, 2),
+            'total_out_sample_trades': sum(p.out_sample_trades for p in periods),
+            'profitable_out_sample_pct': round(profitable_pct, 2),
+            'consistent': consistent,
+            'message': "Estrategia consistente" if consistent else "Degradación significativa fuera de muestra"
+        }
+    
     async def _run_monte_carlo(
         self,
         trades: List[dict],
         initial_capital: float,
         num_simulations: int,
-        confidence_level: float
+        confidence_level: float,
+        seed: Optional[int] = None
     ) -> MonteCarloResults:
         """
         Monte Carlo Simulation con varianza realista.
@@ -139,42 +312,29 @@ class BacktestAdvancedService:
         - Reordenamiento aleatorio de trades
         - Varianza de ±10% en cada P&L
         - 5% de probabilidad de trade fallido
-        """
-        
-        pnls = [t['pnl'] for t in trades]
-        num_trades = len(pnls)
-        
-        final_equities = []
-        sample_curves = []
         
-        for sim in range(num_simulations):
-            # Selección aleatoria CON reemplazo (permite repeticiones)
-            selected_indices = random.choices(range(num_trades), k=num_trades)
-            
-            equity = initial_capital
-            curve = [equity]
-            
-            for idx in selected_indices:
-                base_pnl = pnls[idx]
-                
-                # Agregar varianza realista (±10%)
-                variance_factor = random.uniform(0.9, 1.1)
-                varied_pnl = base_pnl * variance_factor
-                
-                # 5% de probabilidad de trade fallido (P&L = 0)
-                if random.random() < 0.05:
-                    varied_pnl = 0
-                
-                equity += varied_pnl
-                curve.append(equity)
-            
-            final_equities.append(equity)
-            
-            # Guardar algunas curvas de ejemplo
-            if sim < 100:
-                sample_curves.append(curve)
+        Vectorizado con NumPy y por bloques repartidos entre procesos (ver
+        monte_carlo.run_parallel), fuera del event loop. La memoria total
+        (bloques en vuelo + procesos) queda acotada por
+        MONTE_CARLO_MAX_CHUNK_MB. Los
+        percentiles son exactos y las curvas de ejemplo se submuestrean a
+        MONTE_CARLO_SAMPLE_POINTS puntos. Con el mismo seed el resultado
+        es reproducible.
+        """
         
-        final_equities = np.array(final_equities)
+        pnls = np.array([t['pnl'] for t in trades], dtype=np.float64)
+        result = await run_parallel(
+            pnls,
+            num_simulations=num_simulations,
+            initial_capital=initial_capital,
+            max_chunk_mb=settings.MONTE_CARLO_MAX_CHUNK_MB,
+            seed=seed,
+            num_samples=100,
+            sample_points=settings.MONTE_CARLO_SAMPLE_POINTS,
+            workers=settings.MONTE_CARLO_WORKERS
+        )
+        final_equities = result.final_equities
+        max_drawdowns = result.max_drawdowns
         
         # Calcular estadísticas
         mean_equity = float(np.mean(final_equities))
@@ -194,7 +354,10 @@ class BacktestAdvancedService:
             max_final_equity=float(np.max(final_equities)),
             probability_of_profit=float(np.sum(final_equities > initial_capital) / num_simulations * 100),
             probability_of_ruin=float(np.sum(final_equities < initial_capital * 0.5) / num_simulations * 100),
-            sample_curves=sample_curves
+            mean_max_drawdown_pct=float(np.mean(max_drawdowns)),
+            median_max_drawdown_pct=float(np.percentile(max_drawdowns, 50)),
+            percentile_95_max_drawdown_pct=float(np.percentile(max_drawdowns, 95)),
+            sample_curves=result.sample_curves
         )
     
     def _calculate_advanced_metrics(
@@ -437,6 +600,82 @@ class BacktestAdvancedService:
         
         return trades
 
+    def _first_touch_exits(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        entries: np.ndarray,
+        stop_loss: np.ndarray,
+        take_profit: np.ndarray,
+        direction: str,
+        horizon: int = EXIT_HORIZON
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Primer toque de SL/TP para todas las entradas a la vez.
+        
+        Cada entrada i mira las velas i+1 .. i+horizon (ventanas sobre
+        arrays con relleno NaN al final). Si SL y TP se tocan en la misma
+        vela gana el SL. Sin toque, sale al cierre de la última vela de
+        la ventana.
+        
+        Returns:
+            (exit_price, hit_sl, hit_tp)
+        """
+        padding = np.full(horizon, np.nan)
+        high_windows = sliding_window_view(np.concatenate([high, padding]), horizon)[entries + 1]
+        low_windows = sliding_window_view(np.concatenate([low, padding]), horizon)[entries + 1]
+        
+        if direction == 'long':
+            sl_touch = low_windows <= stop_loss[:, None]
+            tp_touch = high_windows >= take_profit[:, None]
+        else:
+            sl_touch = high_windows >= stop_loss[:, None]
+            tp_touch = low_windows <= take_profit[:, None]
+        
+        # Índice del primer toque (horizon si no hay)
+        first_sl = np.where(sl_touch.any(axis=1), sl_touch.argmax(axis=1), horizon)
+        first_tp = np.where(tp_touch.any(axis=1), tp_touch.argmax(axis=1), horizon)
+        
+        hit_sl = (first_sl < horizon) & (first_sl <= first_tp)
+        hit_tp = (first_tp < horizon) & ~hit_sl
+        
+        last_close = close[np.minimum(entries + horizon, len(close) - 1)]
+        exit_price = np.where(hit_sl, stop_loss, np.where(hit_tp, take_profit, last_close))
+        return exit_price, hit_sl, hit_tp
+
+    def _market_arrays(self, historical_data: pd.DataFrame) -> dict:
+        """
+        Arrays compartidos para simular sobre cualquier ventana: OHLC, ATR
+        y calendario se calculan una vez y las ventanas son vistas (slices).
+        
+        El ATR es una media de 14 velas, así que desde la vela 14 de una
+        ventana coincide con el que se calcularía solo con esa ventana.
+        """
+        high = historical_data['high']
+        low = historical_data['low']
+        close = historical_data['close']
+        
+        # Calcular ATR
+        tr = pd.concat([
+            high - low,
+            abs(high - close.shift()),
+            abs(low - close.shift())
+        ], axis=1).max(axis=1)
+        
+        timestamps = pd.to_datetime(historical_data['timestamp'])
+        
+        return {
+            'high': high.to_numpy(dtype=np.float64),
+            'low': low.to_numpy(dtype=np.float64),
+            'close': close.to_numpy(dtype=np.float64),
+            'atr': tr.rolling(14).mean().to_numpy(),
+            'raw_timestamps': historical_data['timestamp'],
+            'time_ns': pd.DatetimeIndex(timestamps).asi8,
+            'weekday': timestamps.dt.weekday.to_numpy(),  # 0=Lunes, 6=Domingo
+            'hour': timestamps.dt.hour.to_numpy()
+        }
+
     def _simulate_trades_on_data(
         self,
         historical_data,
@@ -445,8 +684,33 @@ class BacktestAdvancedService:
         risk_per_trade: float
     ):
         """Simula trades sobre datos históricos REALES con COSTOS."""
-        import pandas as pd
+        trades = self._simulate_window(
+            self._market_arrays(historical_data),
+            0,
+            len(historical_data),
+            signal_data,
+            initial_capital,
+            risk_per_trade
+        )
+        print(f"TRADES REALES CON COSTOS: {len(trades)}")
+        return trades
+
+    def _simulate_window(
+        self,
+        arrays: dict,
+        start: int,
+        stop: int,
+        signal_data: dict,
+        initial_capital: float,
+        risk_per_trade: float
+    ) -> List[dict]:
+        """
+        Simula trades con COSTOS sobre las velas [start, stop) de _market_arrays.
         
+        Entradas cada 10 velas (desde la 14 de la ventana) con SL 2 ATR y
+        TP 3 ATR; las salidas se calculan para todas las entradas a la vez
+        con _first_touch_exits, sin mirar velas fuera de la ventana.
+        """
         trades = []
         
         # COSTOS
@@ -455,97 +719,73 @@ class BacktestAdvancedService:
         AVG_SLIPPAGE = 0.05
         AVG_SPREAD = 0.02
         
-        # Calcular ATR
-        high = historical_data['high']
-        low = historical_data['low']
-        close = historical_data['close']
+        direction = signal_data.get('direction', 'long')
         
-        tr = pd.concat([
-            high - low,
-            abs(high - close.shift()),
-            abs(low - close.shift())
-        ], axis=1).max(axis=1)
+        high_values = arrays['high'][start:stop]
+        low_values = arrays['low'][start:stop]
+        close_values = arrays['close'][start:stop]
+        atr = arrays['atr'][start:stop]
+        n = stop - start
         
-        atr = tr.rolling(14).mean()
-        direction = signal_data.get('direction', 'long')
+        # Entradas: cada 10 velas, con ATR válido y al menos una vela posterior
+        entries = np.arange(14, n, 10)
+        entries = entries[~np.isnan(atr[entries]) & (entries + 1 < n)]
+        if len(entries) == 0:
+            return trades
         
-        # Simular trades
-        for i in range(14, len(historical_data), 10):
-            row = historical_data.iloc[i]
-            atr_value = atr.iloc[i]
-            
-            if pd.isna(atr_value):
-                continue
-            
-            entry_price = row['close']
-            
-            if direction == 'long':
-                stop_loss = entry_price - (2.0 * atr_value)
-                take_profit = entry_price + (3.0 * atr_value)
-            else:
-                stop_loss = entry_price + (2.0 * atr_value)
-                take_profit = entry_price - (3.0 * atr_value)
-            
-            next_rows = historical_data.iloc[i+1:i+50]
-            if len(next_rows) == 0:
-                continue
-            
-            hit_tp = False
-            hit_sl = False
-            exit_price = entry_price
-            
-            for _, next_row in next_rows.iterrows():
-                if direction == 'long':
-                    if next_row['low'] <= stop_loss:
-                        hit_sl = True
-                        exit_price = stop_loss
-                        break
-                    if next_row['high'] >= take_profit:
-                        hit_tp = True
-                        exit_price = take_profit
-                        break
-                else:
-                    if next_row['high'] >= stop_loss:
-                        hit_sl = True
-                        exit_price = stop_loss
-                        break
-                    if next_row['low'] <= take_profit:
-                        hit_tp = True
-                        exit_price = take_profit
-                        break
-            
-            if not hit_tp and not hit_sl and len(next_rows) > 0:
-                exit_price = next_rows.iloc[-1]['close']
-            
-            # CALCULAR POSITION SIZE REAL
-            # Position size = (Capital × Risk%) / Stop Loss Distance
-            risk_amount = initial_capital * (risk_per_trade / 100)
-            sl_distance = abs(entry_price - stop_loss)
-            position_size = risk_amount / sl_distance if sl_distance > 0 else 1.0
-            
-            # COSTOS
-            entry_commission = entry_price * position_size * (TAKER_FEE / 100)
-            entry_slippage = entry_price * position_size * (AVG_SLIPPAGE / 100)
-            entry_spread = entry_price * position_size * (AVG_SPREAD / 100)
-            entry_costs = entry_commission + entry_slippage + entry_spread
-            
-            exit_commission = exit_price * position_size * (TAKER_FEE / 100)
-            exit_slippage = exit_price * position_size * (AVG_SLIPPAGE / 100)
-            exit_costs = exit_commission + exit_slippage
-            
-            if direction == 'long':
-                raw_pnl = (exit_price - entry_price) * position_size
-            else:
-                raw_pnl = (entry_price - exit_price) * position_size
-            
-            total_costs = entry_costs + exit_costs
-            net_pnl = raw_pnl - total_costs
-            pnl_pct = (net_pnl / entry_price) * 100
-            
-            # Calcular campos adicionales
-            timestamp = pd.to_datetime(row['timestamp'])
-            weekday = timestamp.weekday()  # 0=Lunes, 6=Domingo
-            hour = timestamp.hour
+        entry_price = close_values[entries]
+        atr_value = atr[entries]
+        
+        if direction == 'long':
+            stop_loss = entry_price - (2.0 * atr_value)
+            take_profit = entry_price + (3.0 * atr_value)
+        else:
+            stop_loss = entry_price + (2.0 * atr_value)
+            take_profit = entry_price - (3.0 * atr_value)
+        
+        exit_price, hit_sl, hit_tp = self._first_touch_exits(
+            high_values, low_values, close_values, entries, stop_loss, take_profit, direction
+        )
+        
+        # CALCULAR POSITION SIZE REAL
+        # Position size = (Capital × Risk%) / Stop Loss Distance
+        risk_amount = initial_capital * (risk_per_trade / 100)
+        sl_distance = np.abs(entry_price - stop_loss)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_size = np.where(sl_distance > 0, risk_amount / sl_distance, 1.0)
+        
+        # COSTOS
+        entry_commission = entry_price * position_size * (TAKER_FEE / 100)
+        entry_slippage = entry_price * position_size * (AVG_SLIPPAGE / 100)
+        entry_spread = entry_price * position_size * (AVG_SPREAD / 100)
+        entry_costs = entry_commission + entry_slippage + entry_spread
+        
+        exit_commission = exit_price * position_size * (TAKER_FEE / 100)
+        exit_slippage = exit_price * position_size * (AVG_SLIPPAGE / 100)
+        exit_costs = exit_commission + exit_slippage
+        
+        if direction == 'long':
+            raw_pnl = (exit_price - entry_price) * position_size
+        else:
+            raw_pnl = (entry_price - exit_price) * position_size
+        
+        total_costs = entry_costs + exit_costs
+        net_pnl = raw_pnl - total_costs
+        pnl_pct = (net_pnl / entry_price) * 100
+        
+        # R-multiple (ratio respecto al riesgo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_multiple = np.where(sl_distance > 0, net_pnl / sl_distance, 0.0)
+            cost_impact_pct = np.where(raw_pnl != 0, total_costs / np.abs(raw_pnl) * 100, 0.0)
+        
+        # Calcular campos adicionales
+        positions = start + entries
+        raw_timestamps = arrays['raw_timestamps'].iloc[positions]
+        weekdays = arrays['weekday'][positions]
+        hours = arrays['hour'][positions]
+        
+        for k, raw_timestamp in enumerate(raw_timestamps):
+            hour = hours[k]
             
             # Determinar sesión de trading
             if 0 <= hour < 8:
@@ -559,37 +799,30 @@ class BacktestAdvancedService:
             
             # MAE/MFE simplificados (basados en stop/target alcanzados)
             if direction == 'long':
-                mae = float(stop_loss - entry_price) if hit_sl else 0.0
-                mfe = float(exit_price - entry_price) if net_pnl > 0 else 0.0
+                mae = float(stop_loss[k] - entry_price[k]) if hit_sl[k] else 0.0
+                mfe = float(exit_price[k] - entry_price[k]) if net_pnl[k] > 0 else 0.0
             else:
-                mae = float(entry_price - stop_loss) if hit_sl else 0.0
-                mfe = float(entry_price - exit_price) if net_pnl > 0 else 0.0
-            
-            # R-multiple (ratio respecto al riesgo)
-            risk = abs(entry_price - stop_loss)
-            r_multiple = float(net_pnl / risk) if risk > 0 else 0.0
+                mae = float(entry_price[k] - stop_loss[k]) if hit_sl[k] else 0.0
+                mfe = float(entry_price[k] - exit_price[k]) if net_pnl[k] > 0 else 0.0
             
             trades.append({
-                'entry_time': str(row['timestamp']),
-                'entry_price': float(entry_price),
-                'exit_price': float(exit_price),
+                'entry_time': str(raw_timestamp),
+                'entry_price': float(entry_price[k]),
+                'exit_price': float(exit_price[k]),
                 'direction': direction,
-                'pnl': float(net_pnl),
-                'pnl_pct': float(pnl_pct),
-                'stop_loss': float(stop_loss),
-                'take_profit': float(take_profit),
-                'outcome': 'win' if net_pnl > 0 else 'loss',
-                'costs': float(total_costs),
-                'cost_impact_pct': float((total_costs / abs(raw_pnl) * 100) if raw_pnl != 0 else 0),
-                'weekday': int(weekday),
+                'pnl': float(net_pnl[k]),
+                'pnl_pct': float(pnl_pct[k]),
+                'stop_loss': float(stop_loss[k]),
+                'take_profit': float(take_profit[k]),
+                'outcome': 'win' if net_pnl[k] > 0 else 'loss',
+                'costs': float(total_costs[k]),
+                'cost_impact_pct': float(cost_impact_pct[k]),
+                'weekday': int(weekdays[k]),
                 'session': session,
                 'mae': mae,
                 'mfe': mfe,
-                'r_multiple': r_multiple,
-                'position_size': float(position_size)
+                'r_multiple': float(r_multiple[k]),
+                'position_size': float(position_size[k])
             })
         
-        print(f"TRADES REALES CON COSTOS: {len(trades)}")
         return trades
-
-
@@ -7,12 +7,12 @@ import numpy as np
 from app.models.backtest import (
     BacktestRequest, BacktestResponse, BacktestMetrics, TradeResult
 )
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
 from app.services.scanner_service import ScannerService
 
 class BacktestService:
     def __init__(self):
-        self.fetcher = MarketDataFetcher()
+        self.fetcher = get_market_data_fetcher()
         self.scanner = ScannerService()
     
     async def run_backtest(self, request: BacktestRequest) -> BacktestResponse:
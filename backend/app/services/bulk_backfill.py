@@ -0,0 +1,139 @@
+"""
+Backfill masivo de históricos para todo el universo de CRYPTO_CONFIG.
+
+Un pool de hilos por exchange (Kraken, KuCoin, CoinEx) descarga en
+paralelo; cada página consume un token del bucket de su exchange, de modo
+que el tiempo total queda acotado por el exchange más lento y no por la
+suma de todos. Los resultados se escriben en el almacén de velas.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from app.config.crypto_config import get_all_symbols, get_exchange_for_crypto
+from app.services.candle_store import CandleStore
+
+logger = logging.getLogger(__name__)
+
+
+class BulkBackfillEngine:
+    """Descarga concurrente multi-símbolo con límite por exchange."""
+
+    def __init__(self, data_dir: str = "data", workers_per_exchange: int = 2):
+        self.store = CandleStore(data_dir)
+        self.workers_per_exchange = workers_per_exchange
+
+    def _get_fetcher(self):
+        """Fetcher compartido: el pool entrega clientes ccxt sync por hilo de trabajo."""
+        from app.utils.market_data import get_market_data_fetcher
+        return get_market_data_fetcher()
+
+    def _job_start(self, symbol: str, timeframe: str, start: datetime) -> pd.Timestamp:
+        """Si el almacén ya cubre el inicio, solo se descarga la cola."""
+        columns = self.store.read_columns(symbol, timeframe)
+        if columns is not None and len(columns["timestamp"]) > 0:
+            first = pd.Timestamp(int(columns["timestamp"][0]), unit="ms")
+            if first <= pd.Timestamp(start):
+                return pd.Timestamp(int(columns["timestamp"][-1]), unit="ms")
+        return pd.Timestamp(start)
+
+    def _backfill_one(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> dict:
+        started = time.monotonic()
+        job_start = self._job_start(symbol, timeframe, start)
+
+        try:
+            df = self._get_fetcher().get_historical_ohlcv_range_sync(
+                symbol=symbol,
+                timeframe=timeframe,
+                start_date=job_start,
+                end_date=pd.Timestamp(end)
+            )
+            added = self.store.append(symbol, timeframe, df)
+            status = "ok"
+            error = None
+        except Exception as e:
+            added = 0
+            status = "error"
+            error = str(e)
+            logger.error(f"❌ Backfill {symbol} {timeframe}: {e}")
+
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "exchange": get_exchange_for_crypto(symbol),
+            "status": status,
+            "candles_added": added,
+            "seconds": round(time.monotonic() - started, 2),
+            "error": error
+        }
+
+    def run(
+        self,
+        symbols: Optional[Sequence[str]] = None,
+        timeframes: Sequence[str] = ("1h", "4h", "1d"),
+        days: int = 730,
+        end_date: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Ejecuta el backfill de symbols × timeframes.
+
+        Returns:
+            Dict con resumen y resultado por trabajo
+        """
+        symbols = list(symbols) if symbols else get_all_symbols()
+        end = end_date or datetime.utcnow()
+        start = end - timedelta(days=days)
+
+        # Agrupar trabajos por exchange
+        jobs: Dict[str, List[tuple]] = {}
+        for symbol in symbols:
+            exchange_name = get_exchange_for_crypto(symbol)
+            for timeframe in timeframes:
+                jobs.setdefault(exchange_name, []).append((symbol, timeframe))
+
+        logger.info(
+            f"📥 Backfill: {len(symbols)} símbolos × {len(timeframes)} timeframes "
+            f"en {len(jobs)} exchanges ({self.workers_per_exchange} hilos/exchange)"
+        )
+
+        started = time.monotonic()
+        pools = {
+            name: ThreadPoolExecutor(
+                max_workers=self.workers_per_exchange,
+                thread_name_prefix=f"backfill-{name}"
+            )
+            for name in jobs
+        }
+        try:
+            futures = [
+                pools[name].submit(self._backfill_one, symbol, timeframe, start, end)
+                for name, exchange_jobs in jobs.items()
+                for symbol, timeframe in exchange_jobs
+            ]
+
+            results = []
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                logger.info(
+                    f"  [{len(results)}/{len(futures)}] {result['symbol']} {result['timeframe']} "
+                    f"({result['exchange']}): {result['status']} +{result['candles_added']} velas"
+                )
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+        errors = [r for r in results if r["status"] != "ok"]
+        return {
+            "total_jobs": len(results),
+            "successful": len(results) - len(errors),
+            "failed": len(errors),
+            "candles_added": sum(r["candles_added"] for r in results),
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+            "results": sorted(results, key=lambda r: (r["symbol"], r["timeframe"]))
+        }
@@ -0,0 +1,317 @@
+"""
+Almacén columnar binario de velas OHLCV.
+
+Un archivo por símbolo/timeframe (``data/candles/BTC_USDT_1h.candles``):
+- Cabecera fija de 64 bytes (magic, versión, nº columnas, nº filas)
+- timestamp: int64 epoch-ms (ordenado, sin duplicados)
+- open, high, low, close, volume: float64
+
+Las lecturas usan numpy.memmap: el rango de fechas se localiza con
+búsqueda binaria y se retorna como vista, sin copiar ni cargar el
+historial completo.
+
+Reemplaza el parseo de CSV en cada petición. Los CSV existentes se
+migran una sola vez con ``migrate_csv_files``.
+"""
+
+import logging
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CNDL"
+VERSION = 1
+HEADER_SIZE = 64
+HEADER_FORMAT = "<4sHHQ"
+FILE_SUFFIX = ".candles"
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+COLUMNS = ["timestamp"] + PRICE_COLUMNS
+
+
+def _to_epoch_ms(timestamps) -> np.ndarray:
+    """Convierte una serie de fechas (naive = UTC) a int64 epoch-ms."""
+    ts = pd.to_datetime(pd.Series(timestamps))
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+    return ts.values.astype("datetime64[ms]").astype(np.int64)
+
+
+def _to_ms(value) -> int:
+    """Convierte datetime/str/Timestamp a epoch-ms."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value // 1_000_000)
+
+
+class CandleStore:
+    """Lectura/escritura de velas en formato columnar binario."""
+
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = Path(data_dir)
+        self.store_dir = self.data_dir / "candles"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[Path, tuple] = {}
+
+    # ==================== RUTAS ====================
+
+    def path_for(self, symbol: str, timeframe: str) -> Path:
+        """Ruta del archivo para un símbolo/timeframe."""
+        symbol_file = symbol.replace("/", "_")
+        return self.store_dir / f"{symbol_file}_{timeframe}{FILE_SUFFIX}"
+
+    def exists(self, symbol: str, timeframe: str) -> bool:
+        return self.path_for(symbol, timeframe).exists()
+
+    def available(self) -> List[tuple]:
+        """Lista de (símbolo, timeframe) presentes en el almacén."""
+        pairs = []
+        for f in self.store_dir.glob(f"*{FILE_SUFFIX}"):
+            parts = f.stem.split("_")
+            if len(parts) >= 3:
+                pairs.append((f"{parts[0]}/{parts[1]}", parts[2]))
+        return sorted(pairs)
+
+    # ==================== LECTURA ====================
+
+    def _read_header(self, path: Path) -> int:
+        """Valida la cabecera y retorna el número de filas."""
+        with open(path, "rb") as fh:
+            raw = fh.read(HEADER_SIZE)
+        magic, version, num_columns, num_rows = struct.unpack_from(HEADER_FORMAT, raw)
+        if magic != MAGIC or version != VERSION or num_columns != len(COLUMNS):
+            raise ValueError(f"Archivo de velas inválido: {path.name}")
+        return num_rows
+
+    def _open_map(self, path: Path) -> np.ndarray:
+        """
+        Mapea el archivo en memoria (numpy.memmap, solo lectura).
+
+        Todas las columnas miden 8 bytes, así que el archivo es una matriz
+        (columnas × filas) de int64; las columnas de precio se reinterpretan
+        como float64 sin copiar. El mapa se reutiliza mientras el archivo no
+        cambie (os.replace crea un inodo nuevo), y todos los procesos
+        comparten las mismas páginas del page cache del SO.
+        """
+        stat = path.stat()
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._maps.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        num_rows = self._read_header(path)
+        if num_rows == 0:
+            mapped = np.zeros((len(COLUMNS), 0), dtype="<i8")
+        else:
+            mapped = np.memmap(
+                path, dtype="<i8", mode="r", offset=HEADER_SIZE, shape=(len(COLUMNS), num_rows)
+            )
+        self._maps[path] = (key, mapped)
+        return mapped
+
+    def read_columns(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date=None,
+        end_date=None
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Retorna las columnas como vistas del memmap (sin copiar), recortadas
+        al rango de fechas con búsqueda binaria sobre los timestamps
+        ordenados. None si el símbolo/timeframe no está en el almacén.
+        """
+        path = self.path_for(symbol, timeframe)
+        if not path.exists():
+            return None
+
+        mapped = self._open_map(path)
+        timestamps = mapped[0]
+
+        start = 0
+        stop = len(timestamps)
+        if start_date is not None:
+            start = int(np.searchsorted(timestamps, _to_ms(start_date), side="left"))
+        if end_date is not None:
+            stop = int(np.searchsorted(timestamps, _to_ms(end_date), side="right"))
+        stop = max(start, stop)
+
+        prices = mapped[1:, start:stop].view("<f8")
+        columns = {"timestamp": timestamps[start:stop]}
+        for k, name in enumerate(PRICE_COLUMNS):
+            columns[name] = prices[k]
+        return columns
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date=None,
+        end_date=None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Lee velas como DataFrame (timestamp como datetime64).
+        Las columnas OHLCV son vistas de solo lectura sobre el memmap;
+        solo se materializa la columna de fechas del rango pedido.
+        Retorna None si el símbolo/timeframe no está en el almacén.
+        """
+        columns = self.read_columns(symbol, timeframe, start_date, end_date)
+        if columns is None:
+            return None
+
+        df = pd.DataFrame({name: columns[name] for name in PRICE_COLUMNS}, copy=False)
+        df.insert(0, "timestamp", pd.to_datetime(np.asarray(columns["timestamp"]), unit="ms"))
+        return df
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Último timestamp almacenado (None si no hay datos)."""
+        columns = self.read_columns(symbol, timeframe)
+        if columns is None or len(columns["timestamp"]) == 0:
+            return None
+        return pd.Timestamp(int(columns["timestamp"][-1]), unit="ms")
+
+    # ==================== ESCRITURA ====================
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Path:
+        """
+        Escribe (reemplaza) las velas de un símbolo/timeframe.
+        Ordena por timestamp, elimina duplicados y reemplaza el archivo
+        de forma atómica (archivo temporal + os.replace).
+        """
+        timestamps = _to_epoch_ms(df["timestamp"])
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+
+        # Último valor gana en timestamps duplicados
+        keep = np.ones(len(timestamps), dtype=bool)
+        keep[:-1] = timestamps[1:] != timestamps[:-1]
+        timestamps = timestamps[keep]
+
+        num_rows = len(timestamps)
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(COLUMNS), num_rows)
+
+        path = self.path_for(symbol, timeframe)
+        fd, tmp_name = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(header.ljust(HEADER_SIZE, b"\0"))
+                fh.write(np.ascontiguousarray(timestamps, dtype="<i8").tobytes())
+                for name in PRICE_COLUMNS:
+                    values = df[name].to_numpy(dtype=np.float64)[order][keep]
+                    fh.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+            os.replace(tmp_name, path)
+        except Exception:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        logger.info(f"💾 Velas guardadas: {path.name} ({num_rows} velas)")
+        return path
+
+    def append(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Agrega velas nuevas al final de la serie existente.
+
+        Las velas con timestamp ya almacenado reemplazan a las anteriores
+        (p.ej. la última vela, que estaba en formación). El archivo se
+        reescribe de forma atómica, así que los lectores nunca ven una
+        escritura a medias. Retorna el número de velas nuevas.
+        """
+        if df is None or df.empty:
+            return 0
+
+        existing = self.read_columns(symbol, timeframe)
+        if existing is None or len(existing["timestamp"]) == 0:
+            self.write(symbol, timeframe, df)
+            return len(df)
+
+        new_timestamps = _to_epoch_ms(df["timestamp"])
+        cutoff = int(new_timestamps.min())
+        keep = int(np.searchsorted(existing["timestamp"], cutoff, side="left"))
+        added = int(np.count_nonzero(new_timestamps > existing["timestamp"][-1]))
+
+        head = pd.DataFrame({name: existing[name][:keep] for name in PRICE_COLUMNS})
+        head.insert(0, "timestamp", pd.to_datetime(np.asarray(existing["timestamp"][:keep]), unit="ms"))
+        tail = df[COLUMNS].copy()
+        tail["timestamp"] = pd.to_datetime(new_timestamps, unit="ms")
+
+        self.write(symbol, timeframe, pd.concat([head, tail], ignore_index=True))
+        return added
+
+    def delete(self, symbol: str, timeframe: str) -> bool:
+        path = self.path_for(symbol, timeframe)
+        self._maps.pop(path, None)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+    # ==================== MIGRACIÓN CSV ====================
+
+    def import_csv_files(self, symbol: str, timeframe: str, files: Iterable[Path]) -> int:
+        """Importa uno o más CSV (se combinan y deduplican) al almacén."""
+        frames = []
+        for file_path in files:
+            csv_df = pd.read_csv(file_path, usecols=COLUMNS)
+            frames.append(csv_df)
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df.dropna(subset=["timestamp"])
+        self.write(symbol, timeframe, df)
+        return len(self.read_columns(symbol, timeframe)["timestamp"])
+
+    def migrate_csv_files(self, source_dir: Optional[str] = None, overwrite: bool = False) -> Dict[str, int]:
+        """
+        Migración única de los CSV existentes (``SYMBOL_QUOTE_TF_*.csv``).
+
+        Prioriza datos REALES: si existen CSV ``_REAL`` para un
+        símbolo/timeframe se combinan todos; solo si no hay, se usan
+        los sintéticos.
+        """
+        source = Path(source_dir) if source_dir else self.data_dir
+        groups: Dict[tuple, Dict[str, List[Path]]] = {}
+
+        for f in sorted(source.glob("*.csv")):
+            parts = f.stem.split("_")
+            if len(parts) < 3:
+                continue
+            key = (f"{parts[0]}/{parts[1]}", parts[2])
+            kind = "real" if f.stem.endswith("_REAL") else "synthetic"
+            groups.setdefault(key, {"real": [], "synthetic": []})[kind].append(f)
+
+        migrated = {}
+        for (symbol, timeframe), files in groups.items():
+            if self.exists(symbol, timeframe) and not overwrite:
+                logger.info(f"⏭️ Ya migrado: {symbol} {timeframe}")
+                continue
+
+            sources = files["real"] or files["synthetic"]
+            try:
+                rows = self.import_csv_files(symbol, timeframe, sources)
+                migrated[f"{symbol} {timeframe}"] = rows
+                logger.info(f"✅ Migrado {symbol} {timeframe}: {rows} velas de {len(sources)} CSV")
+            except Exception as e:
+                logger.error(f"❌ Error migrando {symbol} {timeframe}: {e}")
+
+        return migrated
+
+
+# Singleton
+_store = None
+
+def get_candle_store() -> CandleStore:
+    """Obtiene instancia del almacén de velas."""
+    global _store
+    if _store is None:
+        _store = CandleStore()
+    return _store
@@ -3,6 +3,7 @@ import ccxt
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+from app.services.candle_store import CandleStore
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +13,7 @@ class DataManager:
     def __init__(self, data_dir="data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.store = CandleStore(data_dir)
         self.exchange = ccxt.binance()
         
         # Política de caché
@@ -27,9 +29,7 @@ class DataManager:
         3. Descarga si es necesario
         4. Retorna DataFrame listo
         """
-        # Normalizar símbolo
-        symbol_file = symbol.replace("/", "_")
-        file_path = self.data_dir / f"{symbol_file}_{timeframe}_REAL.csv"
+        file_path = self.store.path_for(symbol, timeframe)
         
         # Verificar si necesita actualización
         needs_update = self._needs_update(file_path)
@@ -39,8 +39,8 @@ class DataManager:
             df = self._download_data(symbol, timeframe, start_date, end_date)
             
             if df is not None and not df.empty:
-                # Guardar con timestamp
-                df.to_csv(file_path, index=False)
+                # Guardar en almacén de velas
+                self.store.write(symbol, timeframe, df)
                 logger.info(f"✅ Guardado: {file_path} ({len(df)} velas)")
                 return df
             else:
@@ -49,11 +49,8 @@ class DataManager:
         else:
             # Usar caché
             logger.info(f"📂 Usando caché: {symbol} {timeframe}")
-            df = pd.read_csv(file_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Filtrar por rango de fechas solicitado
-            df = self._filter_date_range(df, start_date, end_date)
+            df = self.store.read(symbol, timeframe, start_date, end_date)
+            logger.info(f"📊 Filtrado: {len(df)} velas en rango")
             return df
     
     def _needs_update(self, file_path: Path) -> bool:
@@ -143,12 +140,8 @@ class DataManager:
     
     def force_refresh(self, symbol: str, timeframe: str):
         """Fuerza actualización eliminando caché"""
-        symbol_file = symbol.replace("/", "_")
-        file_path = self.data_dir / f"{symbol_file}_{timeframe}_REAL.csv"
-        
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"🗑️ Caché eliminado: {file_path.name}")
+        if self.store.delete(symbol, timeframe):
+            logger.info(f"🗑️ Caché eliminado: {symbol} {timeframe}")
 
 # Instancia global
 data_manager = DataManager()
@@ -3,6 +3,7 @@ import ccxt
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+from app.services.candle_store import CandleStore
 from app.services.crypto_compare_fetcher import fetch_historical_data_crypto_compare
 
 logger = logging.getLogger(__name__)
@@ -13,11 +14,16 @@ class DataService:
     def __init__(self, data_dir="data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.store = CandleStore(data_dir)
         # self.exchange = ccxt.binance()  # No usado, se usa CryptoCompare
         
         # Política de caché
         self.cache_hours = 24  # Actualizar cada 24h
         
+        # Actualización incremental: solo descarga las velas posteriores
+        # al último timestamp guardado en lugar de todo el rango
+        self.incremental = True
+        
     def get_data(self, symbol: str, timeframe: str, start_date: str, end_date: str) -> pd.DataFrame:
         """
         Obtiene datos con auto-actualización inteligente
@@ -28,20 +34,26 @@ class DataService:
         3. Descarga si es necesario
         4. Retorna DataFrame listo
         """
-        # Normalizar símbolo
-        symbol_file = symbol.replace("/", "_")
-        file_path = self.data_dir / f"{symbol_file}_{timeframe}_REAL.csv"
+        file_path = self.store.path_for(symbol, timeframe)
         
         # Verificar si necesita actualización
         needs_update = self._needs_update(file_path)
         
+        if needs_update and self.incremental and self._covers_start(symbol, timeframe, start_date):
+            logger.info(f"🔄 Actualización incremental: {symbol} {timeframe}")
+            self._refresh_tail(symbol, timeframe)
+            
+            df = self.store.read(symbol, timeframe, start_date, end_date)
+            logger.info(f"📊 Filtrado: {len(df)} velas en rango")
+            return df
+        
         if needs_update:
             logger.info(f"📥 Descargando datos frescos: {symbol} {timeframe}")
             df = self._download_data(symbol, timeframe, start_date, end_date)
             
             if df is not None and not df.empty:
-                # Guardar con timestamp
-                df.to_csv(file_path, index=False)
+                # Guardar en almacén de velas
+                self.store.write(symbol, timeframe, df)
                 logger.info(f"✅ Guardado: {file_path} ({len(df)} velas)")
                 return df
             else:
@@ -50,11 +62,8 @@ class DataService:
         else:
             # Usar caché
             logger.info(f"📂 Usando caché: {symbol} {timeframe}")
-            df = pd.read_csv(file_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Filtrar por rango de fechas solicitado
-            df = self._filter_date_range(df, start_date, end_date)
+            df = self.store.read(symbol, timeframe, start_date, end_date)
+            logger.info(f"📊 Filtrado: {len(df)} velas en rango")
             return df
     
     def _needs_update(self, file_path: Path) -> bool:
@@ -74,6 +83,38 @@ class DataService:
         logger.info(f"✅ Archivo reciente ({age_hours:.1f}h): {file_path.name}")
         return False
     
+    def _covers_start(self, symbol: str, timeframe: str, start_date: str) -> bool:
+        """True si el almacén ya tiene datos desde start_date (solo falta la cola)."""
+        columns = self.store.read_columns(symbol, timeframe)
+        if columns is None or len(columns["timestamp"]) == 0:
+            return False
+        
+        first = pd.Timestamp(int(columns["timestamp"][0]), unit="ms")
+        return first <= pd.to_datetime(start_date)
+    
+    def _refresh_tail(self, symbol: str, timeframe: str) -> int:
+        """
+        Descarga solo las velas desde el último timestamp guardado
+        (incluido, para refrescar la vela en formación) y las agrega
+        al almacén deduplicando por timestamp.
+        
+        Si no llega ninguna vela se actualiza igualmente el mtime del
+        archivo: el refresco queda registrado y las llamadas siguientes no
+        vuelven a descargar hasta que pasen cache_hours.
+        """
+        last_ts = self.store.last_timestamp(symbol, timeframe)
+        now = pd.Timestamp.utcnow().tz_localize(None)
+        
+        df = self._download_data(symbol, timeframe, last_ts, now)
+        if df is None or df.empty:
+            logger.warning(f"⚠️ Sin velas nuevas para {symbol} {timeframe}, usando caché existente")
+            self.store.path_for(symbol, timeframe).touch()
+            return 0
+        
+        added = self.store.append(symbol, timeframe, df)
+        logger.info(f"✅ Agregadas {added} velas nuevas a {symbol} {timeframe} (desde {last_ts})")
+        return added
+    
     def _download_data(self, symbol: str, timeframe: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Descarga datos usando CCXT SYNC (sin event loop issues)"""
         try:
@@ -83,11 +124,10 @@ class DataService:
             start = pd.to_datetime(start_date)
             end = pd.to_datetime(end_date)
             
-            # Importar MarketDataFetcher
-            from app.utils.market_data import MarketDataFetcher
+            # Fetcher compartido (clientes ccxt del pool, uno por hilo)
+            from app.utils.market_data import get_market_data_fetcher
             
-            # Crear fetcher
-            fetcher = MarketDataFetcher()
+            fetcher = get_market_data_fetcher()
             
             # Usar método SYNC (sin async, sin event loop)
             df = fetcher.get_historical_ohlcv_range_sync(
@@ -129,12 +169,8 @@ class DataService:
 
     def force_refresh(self, symbol: str, timeframe: str):
         """Fuerza actualización eliminando caché"""
-        symbol_file = symbol.replace("/", "_")
-        file_path = self.data_dir / f"{symbol_file}_{timeframe}_REAL.csv"
-        
-        if file_path.exists():
-            file_path.unlink()
-            logger.info(f"🗑️ Caché eliminado: {file_path.name}")
+        if self.store.delete(symbol, timeframe):
+            logger.info(f"🗑️ Caché eliminado: {symbol} {timeframe}")
 
 # Instancia global
 data_service = DataService()
@@ -0,0 +1,75 @@
+# backend/app/services/divergences.py
+"""
+Kernel vectorizado de divergencias precio/oscilador.
+
+Los pivots (mínimos para divergencias alcistas, máximos para bajistas)
+se detectan con find_pivots sobre la ventana ``lookback`` y se comparan
+de a pares consecutivos con operaciones NumPy, sin recorrer velas con
+``.iloc``. Sirve para cualquier oscilador (RSI, MACD...) y cualquier
+ventana: las posiciones devueltas son índices de vela del array completo.
+
+- Alcista: el precio marca un mínimo más bajo y el oscilador uno más alto.
+- Bajista: el precio marca un máximo más alto y el oscilador uno más bajo.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.swing_points import find_pivots
+
+DEFAULT_LOOKBACK = 30
+# Velas mínimas entre un pivot y los bordes de la ventana (pivot confirmado)
+DEFAULT_EDGE = 2
+
+
+def window_pivots(
+    values: np.ndarray,
+    kind: str,
+    lookback: int = DEFAULT_LOOKBACK,
+    edge: int = DEFAULT_EDGE
+) -> np.ndarray:
+    """Posiciones de los pivots (kind="low"/"high") de las últimas ``lookback`` velas."""
+    n = len(values)
+    start = max(0, n - lookback)
+    positions = find_pivots(values[start:], order=1, kind=kind) + start
+    return positions[(positions >= start + edge) & (positions <= n - 1 - edge)]
+
+
+def divergence_pairs(
+    price: np.ndarray,
+    oscillator: np.ndarray,
+    pivots: np.ndarray,
+    kind: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (pivot anterior, pivot actual) de cada par consecutivo con divergencia.
+
+    kind: "bullish" (pivots de mínimos) o "bearish" (pivots de máximos).
+    Los pares con el oscilador en NaN no cuentan.
+    """
+    previous, current = pivots[:-1], pivots[1:]
+    if kind == "bullish":
+        mask = (price[current] < price[previous]) & (oscillator[current] > oscillator[previous])
+    else:
+        mask = (price[current] > price[previous]) & (oscillator[current] < oscillator[previous])
+    return previous[mask], current[mask]
+
+
+def latest_pair(
+    price: np.ndarray,
+    oscillator: np.ndarray,
+    pivots: np.ndarray,
+    kind: str
+) -> Optional[Tuple[int, int]]:
+    """
+    (vela anterior, vela actual) si los dos últimos pivots divergen en la
+    dirección ``kind`` ("bullish" con pivots de mínimos y price=low,
+    "bearish" con pivots de máximos y price=high). None si no.
+
+    Cada dirección se evalúa por separado: una divergencia bajista más
+    reciente no oculta una alcista.
+    """
+    previous, current = divergence_pairs(price, oscillator, pivots[-2:], kind)
+    if len(current) == 0:
+        return None
+    return int(previous[-1]), int(current[-1])
@@ -4,7 +4,9 @@ Determina si la entrada es en rebote, ruptura, continuación, etc.
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from app.services.swing_points import SwingPointIndex
 
 class EntryContextAnalyzer:
     """Analiza el contexto técnico del punto de entrada."""
@@ -13,11 +15,18 @@ class EntryContextAnalyzer:
         self,
         entry_price: float,
         direction: str,
-        historical_data: pd.DataFrame
+        historical_data: pd.DataFrame,
+        use_swing_levels: bool = False,
+        swing_index: Optional[SwingPointIndex] = None
     ) -> Dict:
         """
         Analiza el contexto de la entrada.
         
+        use_swing_levels: soporte/resistencia = swing points agrupados más
+        cercanos al precio en vez del mínimo/máximo de las últimas 30 velas.
+        swing_index: índice de pivots ya construido sobre las últimas 50
+        velas (opcional, solo con use_swing_levels).
+        
         Returns:
             Dict con: type, confidence, description
         """
@@ -37,7 +46,7 @@ class EntryContextAnalyzer:
         trend = self._identify_trend(recent_data)
         
         # 2. Encontrar niveles clave (soportes/resistencias)
-        support, resistance = self._find_key_levels(recent_data)
+        support, resistance = self._find_key_levels(recent_data, use_swing_levels, swing_index)
         
         # 3. Detectar tipo de entrada
         context = self._detect_entry_type(
@@ -64,8 +73,20 @@ class EntryContextAnalyzer:
         else:
             return 'lateral'
     
-    def _find_key_levels(self, data: pd.DataFrame) -> Tuple[float, float]:
-        """Encuentra niveles de soporte y resistencia."""
+    def _find_key_levels(
+        self,
+        data: pd.DataFrame,
+        use_swing_levels: bool = False,
+        swing_index: Optional[SwingPointIndex] = None
+    ) -> Tuple[float, float]:
+        """
+        Encuentra niveles de soporte y resistencia.
+        
+        Por defecto: mínimo/máximo de las últimas 30 velas. Con
+        use_swing_levels, los swing points agrupados de esas velas más
+        cercanos al precio actual (si no hay pivots a ese lado, el
+        mínimo/máximo).
+        """
         
         # Últimas 30 velas
         recent = data.tail(30)
@@ -76,6 +97,17 @@ class EntryContextAnalyzer:
         # Resistencia = máximo reciente
         resistance = recent['high'].max()
         
+        if use_swing_levels:
+            current_price = data['close'].iloc[-1]
+            if swing_index is None:
+                swing_index = SwingPointIndex.from_frame(data)
+            support_level = swing_index.nearest(current_price, "support", last_bars=30)
+            resistance_level = swing_index.nearest(current_price, "resistance", last_bars=30)
+            if support_level:
+                support = support_level.price
+            if resistance_level:
+                resistance = resistance_level.price
+        
         return support, resistance
     
     def _detect_entry_type(
@@ -1,18 +1,108 @@
 """
-Carga datos históricos desde CSV con auto-descarga si no existen.
+Carga datos históricos desde el almacén columnar de velas con auto-descarga si no existen.
+Los CSV heredados se migran al almacén la primera vez que se usan.
 """
 
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional
+import threading
+import numpy as np
 import pandas as pd
 
+from app.core.config import settings
+from app.services.candle_store import CandleStore
+
+
+class CandleCache:
+    """
+    Caché LRU en memoria de historiales completos con presupuesto en bytes.
+
+    Clave: (symbol, timeframe) → (mtime del archivo, DataFrame). Cada
+    historial se guarda una sola vez y los rangos pedidos se recortan de
+    él, así peticiones con fechas distintas (p. ej. relativas a now())
+    comparten la entrada. Si el archivo en disco cambia (mtime distinto)
+    la entrada se invalida.
+    """
+    
+    def __init__(self, max_mb: float):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get(self, key: tuple, mtime_ns: int) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            entry_mtime, df, size = entry
+            if entry_mtime != mtime_ns:
+                # Archivo actualizado en disco → invalidar
+                del self._entries[key]
+                self.current_bytes -= size
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return df
+    
+    def put(self, key: tuple, mtime_ns: int, df: pd.DataFrame):
+        size = int(df.memory_usage(index=True, deep=False).sum())
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[2]
+            
+            self._entries[key] = (mtime_ns, df, size)
+            self.current_bytes += size
+            
+            # Expulsar las menos usadas hasta respetar el presupuesto
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_mb': round(self.current_bytes / (1024 * 1024), 2),
+            'max_mb': round(self.max_bytes / (1024 * 1024), 2),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / total * 100, 2) if total > 0 else 0.0
+        }
+
+
 class HistoricalDataLoader:
     """Carga datos históricos con descarga automática."""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", cache_max_mb: Optional[float] = None):
         self.data_dir = Path(data_dir)
-        self.cache = {}
+        self.store = CandleStore(data_dir)
+        self.cache = CandleCache(
+            cache_max_mb if cache_max_mb is not None else settings.CANDLE_CACHE_MAX_MB
+        )
     
     def load_data(
         self,
@@ -22,11 +112,21 @@ class HistoricalDataLoader:
         end_date: Optional[datetime] = None
     ) -> pd.DataFrame:
         """
-        Carga datos históricos desde CSV.
-        Si no existe, descarga automáticamente desde CryptoCompare.
+        Carga datos históricos desde el almacén de velas.
+        Si no existe, migra el CSV heredado o descarga automáticamente.
+        
+        El DataFrame retornado es propio del llamador (columnas escribibles,
+        sin vistas compartidas con la caché ni con el memmap): se puede
+        modificar o ampliar con columnas sin afectar a otras peticiones.
         """
         
-        # Buscar archivo (priorizar REALES)
+        # Caché en memoria → almacén columnar
+        df = self._load_cached(symbol, timeframe, start_date, end_date)
+        if df is not None:
+            print(f"✅ {len(df)} velas | {df['timestamp'].min()} a {df['timestamp'].max()}")
+            return df
+        
+        # Buscar CSV heredado (priorizar REALES)
         symbol_file = symbol.replace('/', '_')
         pattern_real = f"{symbol_file}_{timeframe}_*_REAL.csv"
         pattern_synth = f"{symbol_file}_{timeframe}_*.csv"
@@ -52,24 +152,54 @@ class HistoricalDataLoader:
             
             raise FileNotFoundError(f"No se pudo obtener datos para {symbol} {timeframe}")
         
-        # Cargar archivo existente
-        file_path = files[0]
-        print(f"✅ Usando datos REALES para {symbol} {timeframe}")
-        print(f"📂 Cargando: {file_path.name}")
-        
-        df = pd.read_csv(file_path)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Filtrar por fechas
-        if start_date:
-            df = df[df['timestamp'] >= start_date]
-        if end_date:
-            df = df[df['timestamp'] <= end_date]
+        # Migrar CSV existente al almacén (una sola vez)
+        print(f"📦 Migrando CSV al almacén de velas: {', '.join(f.name for f in files)}")
+        self.store.import_csv_files(symbol, timeframe, files)
         
+        df = self._load_cached(symbol, timeframe, start_date, end_date)
         print(f"✅ {len(df)} velas | {df['timestamp'].min()} a {df['timestamp'].max()}")
         
         return df
     
+    def _load_cached(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Sirve el rango pedido desde el historial completo en caché (búsqueda
+        binaria sobre los timestamps). Retorna una copia escribible del
+        rango; la entrada de la caché nunca sale del loader.
+        Retorna None si el símbolo/timeframe no está en el almacén.
+        """
+        path = self.store.path_for(symbol, timeframe)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        key = (symbol, timeframe)
+        full = self.cache.get(key, mtime_ns)
+        if full is None:
+            full = self.store.read(symbol, timeframe)
+            if full is None:
+                return None
+            # Copia propia de la caché: no retiene el memmap del archivo
+            full = full.copy()
+            self.cache.put(key, mtime_ns, full)
+        
+        timestamps = full['timestamp'].values
+        start = 0
+        stop = len(full)
+        if start_date is not None:
+            start = int(np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start_date)), side='left'))
+        if end_date is not None:
+            stop = int(np.searchsorted(timestamps, np.datetime64(pd.Timestamp(end_date)), side='right'))
+        
+        return full.iloc[start:max(start, stop)].copy()
+    
     def _auto_download(
         self,
         symbol: str,
@@ -79,7 +209,7 @@ class HistoricalDataLoader:
     ) -> pd.DataFrame:
         """
         Descarga datos automáticamente desde CryptoCompare.
-        Guarda el CSV para uso futuro.
+        DataService lo guarda en el almacén de velas para uso futuro.
         """
         
         # Import aquí para evitar dependencias circulares
@@ -114,7 +244,7 @@ class HistoricalDataLoader:
     def get_available_symbols(self) -> list:
         """Retorna lista de símbolos disponibles."""
         files = list(self.data_dir.glob("*.csv"))
-        symbols = set()
+        symbols = {symbol for symbol, _ in self.store.available()}
         for f in files:
             parts = f.stem.split('_')
             if len(parts) >= 2:
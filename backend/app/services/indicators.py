@@ -0,0 +1,271 @@
+# backend/app/services/indicators.py
+"""
+Motor de indicadores vectorizado para muchos símbolos a la vez.
+
+Las series de todos los símbolos se apilan en matrices 2-D
+(símbolos × velas), alineadas a la derecha (última vela en la última
+columna) y rellenadas con NaN a la izquierda cuando tienen distinta
+longitud. Cada indicador se calcula para todo el universo con
+operaciones NumPy sobre la matriz completa.
+
+Las fórmulas replican las de los módulos de análisis:
+- EMA: ewm(span, adjust=False)
+- RSI: medias móviles simples de ganancias/pérdidas (rolling mean)
+- MACD: EMA12 - EMA26, señal EMA9
+- ATR: media móvil simple del True Range
+
+Los módulos reciben un IndicatorContext (parámetro ``indicators``),
+que memoiza cada indicador por DataFrame y puede sembrarse con el
+resultado batch de un símbolo.
+"""
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.swing_points import DEFAULT_ORDER, SwingPointIndex
+
+EMA_PERIODS = (9, 12, 21, 26, 50, 200)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+VOLUME_AVG_PERIOD = 20
+MACD_SIGNAL_PERIOD = 9
+
+
+def stack_columns(frames: Sequence[pd.DataFrame], column: str, length: int) -> np.ndarray:
+    """Matriz (símbolos × length) de una columna, alineada a la derecha con NaN a la izquierda."""
+    matrix = np.full((len(frames), length), np.nan)
+    for row, df in enumerate(frames):
+        values = df[column].to_numpy(dtype=np.float64)[-length:]
+        if len(values):
+            matrix[row, length - len(values):] = values
+    return matrix
+
+
+def ema(values: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """
+    EMA (adjust=False) de varias longitudes a la vez.
+
+    values: (símbolos × velas) con NaN solo a la izquierda.
+    Retorna (períodos × símbolos × velas). Cada fila arranca en su
+    primer valor válido, igual que pandas.
+    """
+    alphas = (2.0 / (np.asarray(periods, dtype=np.float64) + 1.0))[:, None]
+    out = np.empty((len(periods),) + values.shape)
+    state = np.full((len(periods), values.shape[0]), np.nan)
+
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        state = np.where(np.isnan(state), x, alphas * x + (1.0 - alphas) * state)
+        out[:, :, t] = state
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Media móvil simple por fila; NaN hasta completar la ventana (min_periods=window)."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=-1)
+    return out
+
+
+def rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """RSI con medias móviles simples (como MarketStructureModule.calculate_rsi)."""
+    delta = np.full(close.shape, np.nan)
+    delta[:, 1:] = np.diff(close, axis=1)
+
+    # where(delta > 0, delta, 0): la primera vela (delta NaN) cuenta como 0,
+    # igual que pandas; el relleno a la izquierda sigue siendo NaN
+    padding = np.isnan(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[padding] = np.nan
+    loss[padding] = np.nan
+
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """max(high-low, |high-close previo|, |low-close previo|), ignorando NaN como pandas."""
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+class BatchIndicators:
+    """Indicadores de todo el universo, calculados en bloque."""
+
+    def __init__(self, symbols: Sequence[str], lengths: Sequence[int], values: Dict[str, np.ndarray]):
+        self.symbols = list(symbols)
+        self.lengths = list(lengths)
+        self.values = values
+        self._rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    def for_symbol(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """Indicadores de un símbolo (1-D, misma longitud que su DataFrame)."""
+        row = self._rows.get(symbol)
+        if row is None:
+            return None
+        length = self.lengths[row]
+        return {
+            name: matrix[row, matrix.shape[1] - length:]
+            for name, matrix in self.values.items()
+        }
+
+
+def compute_batch(frames: Mapping[str, pd.DataFrame]) -> BatchIndicators:
+    """
+    Calcula EMA 9/21/50/200, RSI 14, MACD (12/26/9), ATR 14 y volumen
+    medio 20 para todos los símbolos con operaciones sobre matrices.
+
+    frames: {símbolo: DataFrame OHLCV}
+    """
+    symbols = list(frames.keys())
+    dfs = [frames[symbol] for symbol in symbols]
+    lengths = [len(df) for df in dfs]
+    length = max(lengths) if lengths else 0
+
+    close = stack_columns(dfs, "close", length)
+    high = stack_columns(dfs, "high", length)
+    low = stack_columns(dfs, "low", length)
+    volume = stack_columns(dfs, "volume", length)
+
+    emas = dict(zip(EMA_PERIODS, ema(close, EMA_PERIODS)))
+    macd_line = emas[12] - emas[26]
+    macd_signal = ema(macd_line, [MACD_SIGNAL_PERIOD])[0]
+
+    values = {
+        "ema_9": emas[9],
+        "ema_12": emas[12],
+        "ema_21": emas[21],
+        "ema_26": emas[26],
+        "ema_50": emas[50],
+        "ema_200": emas[200],
+        "rsi_14": rsi(close, RSI_PERIOD),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_line - macd_signal,
+        "atr_14": rolling_mean(true_range(high, low, close), ATR_PERIOD),
+        "volume_avg_20": rolling_mean(volume, VOLUME_AVG_PERIOD),
+    }
+    return BatchIndicators(symbols, lengths, values)
+
+
+# Claves de compute_batch → (indicador, parámetros) de IndicatorContext
+_SEED_KEYS = {
+    "ema_9": ("ema", "close", 9),
+    "ema_12": ("ema", "close", 12),
+    "ema_21": ("ema", "close", 21),
+    "ema_26": ("ema", "close", 26),
+    "ema_50": ("ema", "close", 50),
+    "ema_200": ("ema", "close", 200),
+    "rsi_14": ("rsi", RSI_PERIOD),
+    "atr_14": ("atr", ATR_PERIOD),
+    "volume_avg_20": ("sma", "volume", VOLUME_AVG_PERIOD),
+}
+
+
+class IndicatorContext:
+    """
+    Indicadores de un DataFrame de velas, memoizados por (indicador, parámetros).
+
+    Se crea una vez por DataFrame y se pasa a todos los módulos de
+    análisis: cada indicador se calcula como mucho una vez por frame.
+    Puede sembrarse con el resultado de compute_batch para no recalcular
+    lo que ya se obtuvo para todo el universo.
+
+    Los arrays retornados son 1-D, de la misma longitud que el DataFrame,
+    y se comparten: no deben modificarse.
+    """
+
+    def __init__(self, df: pd.DataFrame, seed: Optional[Dict[str, np.ndarray]] = None):
+        self.df = df
+        self._cache: Dict[tuple, object] = {}
+        self.computed: Dict[tuple, int] = {}
+        self.hits = 0
+        if seed:
+            self._seed(seed)
+
+    @classmethod
+    def from_batch(cls, df: pd.DataFrame, batch: BatchIndicators, symbol: str) -> "IndicatorContext":
+        """Contexto sembrado con los indicadores batch de un símbolo."""
+        return cls(df, seed=batch.for_symbol(symbol))
+
+    def _seed(self, seed: Dict[str, np.ndarray]):
+        for name, key in _SEED_KEYS.items():
+            if name in seed:
+                self._cache[key] = seed[name]
+        if all(name in seed for name in ("macd", "macd_signal", "macd_hist")):
+            self._cache[("macd", 12, 26, MACD_SIGNAL_PERIOD)] = (
+                seed["macd"], seed["macd_signal"], seed["macd_hist"]
+            )
+
+    def _memo(self, key: tuple, compute):
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        value = compute()
+        self._cache[key] = value
+        self.computed[key] = self.computed.get(key, 0) + 1
+        return value
+
+    def _row(self, column: str) -> np.ndarray:
+        """Columna como matriz de una fila (para reutilizar el motor batch)."""
+        return self._memo(
+            ("column", column),
+            lambda: self.df[column].to_numpy(dtype=np.float64)[None, :]
+        )
+
+    # ==================== INDICADORES ====================
+
+    def ema(self, period: int, column: str = "close") -> np.ndarray:
+        """EMA (ewm span=period, adjust=False)."""
+        return self._memo(
+            ("ema", column, period),
+            lambda: ema(self._row(column), [period])[0, 0]
+        )
+
+    def sma(self, column: str, window: int) -> np.ndarray:
+        """Media móvil simple (rolling(window).mean())."""
+        return self._memo(
+            ("sma", column, window),
+            lambda: rolling_mean(self._row(column), window)[0]
+        )
+
+    def rsi(self, period: int = RSI_PERIOD) -> np.ndarray:
+        """RSI con medias móviles simples."""
+        return self._memo(("rsi", period), lambda: rsi(self._row("close"), period)[0])
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = MACD_SIGNAL_PERIOD):
+        """(línea MACD, señal, histograma)."""
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            signal_line = ema(line[None, :], [signal])[0, 0]
+            return line, signal_line, line - signal_line
+        return self._memo(("macd", fast, slow, signal), compute)
+
+    def true_range(self) -> np.ndarray:
+        return self._memo(
+            ("true_range",),
+            lambda: true_range(self._row("high"), self._row("low"), self._row("close"))
+        )
+
+    def atr(self, period: int = ATR_PERIOD) -> np.ndarray:
+        """ATR (media móvil simple del True Range)."""
+        return self._memo(("atr", period), lambda: rolling_mean(self.true_range(), period)[0])
+
+    def swing_points(self, order: int = DEFAULT_ORDER) -> SwingPointIndex:
+        """Índice de pivots y niveles S/R del frame."""
+        return self._memo(("swing_points", order), lambda: SwingPointIndex.from_frame(self.df, order))
+
+    def stats(self) -> dict:
+        """Cuántas veces se calculó cada indicador (debe ser 1) y aciertos de memo."""
+        return {
+            "computed": {"/".join(str(p) for p in key): count for key, count in self.computed.items()},
+            "hits": self.hits
+        }
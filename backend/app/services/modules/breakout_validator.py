@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from app.services.indicators import IndicatorContext
+
 
 class BreakoutValidatorModule:
     """
@@ -366,7 +368,9 @@ class BreakoutValidatorModule:
         self,
         df: pd.DataFrame,
         current_price: float,
-        resistance_price: float
+        resistance_price: float,
+        indicators: Optional[IndicatorContext] = None,
+        live_indicators: Optional[Dict[str, float]] = None
     ) -> Dict:
         """
         Valida ruptura técnica con los 5 criterios
@@ -375,26 +379,57 @@ class BreakoutValidatorModule:
             df: DataFrame con OHLCV (mínimo 200 velas recomendado)
             current_price: Precio actual
             resistance_price: Nivel de resistencia a romper
+            indicators: Contexto de indicadores del frame (opcional)
+            live_indicators: Valores del estado incremental por
+                (símbolo, timeframe) de IndicatorStateStore (opcional)
         
         Returns:
             Dict completo con validación de todos los criterios
         """
         
-        # Calcular indicadores
-        rsi = self.calculate_rsi(df, period=14)
-        macd_data = self.calculate_macd(df)
-        volume_avg = self.calculate_volume_avg(df, period=20)
-        ema_21 = df['close'].ewm(span=21, adjust=False).mean()
-        ema_slope = self.calculate_ema_slope(df, period=21)
-        
-        # Valores actuales
-        current_rsi = rsi.iloc[-1]
-        current_macd_line = macd_data['macd_line'].iloc[-1]
-        current_signal_line = macd_data['signal_line'].iloc[-1]
-        current_histogram = macd_data['histogram'].iloc[-1]
+        if live_indicators is not None:
+            # Valores actuales desde el estado incremental (una vela procesada por refresco)
+            current_rsi = live_indicators['rsi_14']
+            if current_rsi == 100:
+                # Sin pérdidas en la ventana: calculate_rsi lo trata como NaN
+                current_rsi = np.nan
+            current_macd_line = live_indicators['macd']
+            current_signal_line = live_indicators['macd_signal']
+            current_histogram = live_indicators['macd_hist']
+            current_avg_volume = live_indicators['volume_avg_20']
+            current_ema_21 = live_indicators['ema_21']
+            ema_slope = live_indicators['ema_21_slope']
+        elif indicators is not None:
+            # Valores actuales desde el contexto de indicadores (memoizados)
+            current_rsi = indicators.rsi(14)[-1]
+            if current_rsi == 100:
+                # Sin pérdidas en la ventana: calculate_rsi lo trata como NaN
+                current_rsi = np.nan
+            macd_line, signal_line, histogram = indicators.macd(12, 26, 9)
+            current_macd_line = macd_line[-1]
+            current_signal_line = signal_line[-1]
+            current_histogram = histogram[-1]
+            current_avg_volume = indicators.sma('volume', 20)[-1]
+            ema_21 = indicators.ema(21)
+            current_ema_21 = ema_21[-1]
+            ema_slope = (ema_21[-1] - ema_21[-5]) / 5 if len(ema_21) >= 5 else 0
+        else:
+            # Calcular indicadores
+            rsi = self.calculate_rsi(df, period=14)
+            macd_data = self.calculate_macd(df)
+            volume_avg = self.calculate_volume_avg(df, period=20)
+            ema_21 = df['close'].ewm(span=21, adjust=False).mean()
+            ema_slope = self.calculate_ema_slope(df, period=21)
+            
+            # Valores actuales
+            current_rsi = rsi.iloc[-1]
+            current_macd_line = macd_data['macd_line'].iloc[-1]
+            current_signal_line = macd_data['signal_line'].iloc[-1]
+            current_histogram = macd_data['histogram'].iloc[-1]
+            current_avg_volume = volume_avg.iloc[-1]
+            current_ema_21 = ema_21.iloc[-1]
+        
         current_volume = df['volume'].iloc[-1]
-        current_avg_volume = volume_avg.iloc[-1]
-        current_ema_21 = ema_21.iloc[-1]
         
         # Validar cada criterio
         criterion_1 = self.validate_criterion_1_resistance_breakout(
@@ -52,6 +52,22 @@ class MacroAnalysisModule:
         )
 
     def analyze_correlations(self, symbol: str, df_asset: pd.DataFrame, df_btc: pd.DataFrame, df_eth: pd.DataFrame) -> CorrelationsAnalysis:
+        if df_btc is None or df_eth is None:
+            # Sin datos de referencia BTC/ETH: correlaciones neutras (0 puntos)
+            unavailable = CorrelationData(
+                asset_1="BTC",
+                asset_2="ETH",
+                correlation=0.0,
+                strength="neutral",
+                interpretation="Datos BTC/ETH no disponibles"
+            )
+            return CorrelationsAnalysis(
+                btc_eth_correlation=unavailable,
+                btc_market_correlation=None,
+                trend_alignment="unknown",
+                score=0
+            )
+
         btc_eth_corr = self.calculate_correlation(df_btc, df_eth, "BTC", "ETH")
 
         btc_market_corr = None
@@ -142,6 +158,14 @@ class MacroAnalysisModule:
         )
 
     def analyze_dominance(self, df_btc: pd.DataFrame) -> DominanceAnalysis:
+        if df_btc is None:
+            return DominanceAnalysis(
+                btc_dominance=45.0,
+                trend="unknown",
+                interpretation="Datos de BTC no disponibles",
+                score=0
+            )
+
         recent_trend = df_btc["close"].iloc[-5:].mean()
         previous_trend = df_btc["close"].iloc[-15:-5].mean()
         simulated_dominance = 45.0
@@ -5,6 +5,8 @@ from app.models.market_structure import (
     OrderBlock, OrderBlocksAnalysis, WyckoffPhase, WyckoffAnalysis,
     Divergence, DivergenceAnalysis, MarketStructureResponse
 )
+from app.services.indicators import IndicatorContext
+from app.services.divergences import DEFAULT_LOOKBACK, latest_pair, window_pivots
 
 class MarketStructureModule:
 
@@ -25,6 +27,33 @@ class MarketStructureModule:
         signal = macd.ewm(span=9, adjust=False).mean()
         return macd, signal
 
+    def _top_order_blocks(
+        self,
+        block_type: str,
+        positions: np.ndarray,
+        low: np.ndarray,
+        high: np.ndarray,
+        volume_ratio: np.ndarray,
+        distances: np.ndarray,
+        limit: int = 3
+    ) -> List[OrderBlock]:
+        """
+        Construye OrderBlock solo para los `limit` candidatos más cercanos.
+        Orden estable por distancia redondeada (igual que ordenar los modelos).
+        """
+        rounded = np.round(distances, 2)
+        top = np.argsort(rounded, kind="stable")[:limit]
+        return [
+            OrderBlock(
+                type=block_type,
+                price_high=round(high[positions[k]], 2),
+                price_low=round(low[positions[k]], 2),
+                strength=int(min(5, volume_ratio[k])),
+                distance_from_current=rounded[k]
+            )
+            for k in top
+        ]
+
     def find_order_blocks(
         self, 
         df: pd.DataFrame, 
@@ -38,59 +67,39 @@ class MarketStructureModule:
         - 1 punto: Order blocks identificados pero lejos
         - 0 puntos: Sin order blocks claros
         """
-        demand_zones = []
-        supply_zones = []
-
-        # Buscar zonas de demanda (bullish order blocks)
-        for i in range(10, len(df) - 5):
-            # Buscar vela bajista seguida de impulso alcista fuerte
-            if (df['close'].iloc[i] < df['open'].iloc[i] and  # Vela bajista
-                df['close'].iloc[i+1] > df['close'].iloc[i+2] and  # Impulso alcista
-                df['volume'].iloc[i+1] > df['volume'].iloc[i] * 1.5):  # Alto volumen
-
-                high = df['high'].iloc[i]
-                low = df['low'].iloc[i]
-                distance = abs((current_price - low) / current_price) * 100
-
-                # Calcular fuerza (1-5) basado en volumen y tamaño
-                volume_strength = min(5, int(df['volume'].iloc[i+1] / df['volume'].iloc[i]))
-
-                demand_zones.append(OrderBlock(
-                    type="demand",
-                    price_high=round(high, 2),
-                    price_low=round(low, 2),
-                    strength=volume_strength,
-                    distance_from_current=round(distance, 2)
-                ))
-
-        # Buscar zonas de oferta (bearish order blocks)
-        for i in range(10, len(df) - 5):
-            # Buscar vela alcista seguida de impulso bajista fuerte
-            if (df['close'].iloc[i] > df['open'].iloc[i] and  # Vela alcista
-                df['close'].iloc[i+1] < df['close'].iloc[i+2] and  # Impulso bajista
-                df['volume'].iloc[i+1] > df['volume'].iloc[i] * 1.5):
-
-                high = df['high'].iloc[i]
-                low = df['low'].iloc[i]
-                distance = abs((current_price - high) / current_price) * 100
-
-                volume_strength = min(5, int(df['volume'].iloc[i+1] / df['volume'].iloc[i]))
-
-                supply_zones.append(OrderBlock(
-                    type="supply",
-                    price_high=round(high, 2),
-                    price_low=round(low, 2),
-                    strength=volume_strength,
-                    distance_from_current=round(distance, 2)
-                ))
-
-        # Ordenar por distancia
-        demand_zones.sort(key=lambda x: x.distance_from_current)
-        supply_zones.sort(key=lambda x: x.distance_from_current)
-
-        # Tomar solo los 3 más cercanos
-        demand_zones = demand_zones[:3]
-        supply_zones = supply_zones[:3]
+        open_ = df['open'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+
+        # Velas candidatas: i en [10, n-5), comparadas con i+1 e i+2
+        start, stop = 10, len(df) - 5
+        if stop <= start:
+            demand_zones = []
+            supply_zones = []
+        else:
+            idx = np.arange(start, stop)
+            next_close = close[idx + 1]
+            next2_close = close[idx + 2]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                high_volume = volume[idx + 1] > volume[idx] * 1.5  # Alto volumen
+                # Fuerza (1-5) basada en volumen
+                volume_ratio = volume[idx + 1] / volume[idx]
+
+            # Zonas de demanda: vela bajista seguida de impulso alcista fuerte
+            demand_mask = (close[idx] < open_[idx]) & (next_close > next2_close) & high_volume
+            # Zonas de oferta: vela alcista seguida de impulso bajista fuerte
+            supply_mask = (close[idx] > open_[idx]) & (next_close < next2_close) & high_volume
+
+            demand_zones = self._top_order_blocks(
+                "demand", idx[demand_mask], low, high, volume_ratio[demand_mask],
+                np.abs((current_price - low[idx[demand_mask]]) / current_price) * 100
+            )
+            supply_zones = self._top_order_blocks(
+                "supply", idx[supply_mask], low, high, volume_ratio[supply_mask],
+                np.abs((current_price - high[idx[supply_mask]]) / current_price) * 100
+            )
 
         nearest_demand = demand_zones[0] if demand_zones else None
         nearest_supply = supply_zones[0] if supply_zones else None
@@ -112,7 +121,7 @@ class MarketStructureModule:
             score=score
         )
 
-    def analyze_wyckoff(self, df: pd.DataFrame) -> WyckoffAnalysis:
+    def analyze_wyckoff(self, df: pd.DataFrame, indicators: Optional[IndicatorContext] = None) -> WyckoffAnalysis:
         """
         Analiza la estructura Wyckoff
 
@@ -124,7 +133,10 @@ class MarketStructureModule:
         recent = df.tail(50)
 
         # Analizar tendencia de volumen
-        volume_ma = recent['volume'].rolling(window=10).mean()
+        if indicators is not None:
+            volume_ma = pd.Series(indicators.sma("volume", 10)).tail(50)
+        else:
+            volume_ma = recent['volume'].rolling(window=10).mean()
         volume_increasing = recent['volume'].iloc[-5:].mean() > volume_ma.iloc[-10:-5].mean()
 
         # Analizar rango de precios
@@ -133,7 +145,10 @@ class MarketStructureModule:
         is_ranging = current_range < (price_range * 0.3)
 
         # Analizar tendencia
-        sma_20 = recent['close'].rolling(window=20).mean().iloc[-1]
+        if indicators is not None:
+            sma_20 = indicators.sma("close", 20)[-1]
+        else:
+            sma_20 = recent['close'].rolling(window=20).mean().iloc[-1]
         current_price = recent['close'].iloc[-1]
         is_bullish = current_price > sma_20
 
@@ -178,53 +193,69 @@ class MarketStructureModule:
             score=score
         )
 
-    def detect_divergences(self, df: pd.DataFrame) -> DivergenceAnalysis:
+    def detect_divergences(
+        self,
+        df: pd.DataFrame,
+        indicators: Optional[IndicatorContext] = None,
+        lookback: int = DEFAULT_LOOKBACK
+    ) -> DivergenceAnalysis:
         """
-        Detecta divergencias RSI y MACD
+        Detecta divergencias RSI y MACD entre los dos últimos pivots de
+        mínimos (alcista) o de máximos (bajista) de las últimas
+        `lookback` velas.
+
+        rsi_divergence/macd_divergence son solo alcistas (los dos últimos
+        mínimos); las bajistas van en rsi_bearish_divergence y
+        macd_bearish_divergence, así una bajista más reciente no oculta
+        una alcista.
+
+        Cambio de comportamiento: la divergencia MACD se busca ahora entre
+        los mismos pivots que la del RSI, no con la comparación simplificada
+        anterior (MACD y cierre de hace 5 velas). macd_divergence y
+        has_divergence pueden diferir de las versiones previas; el score
+        no cambia porque solo depende de la divergencia alcista del RSI.
 
         Score (0-1 punto):
-        - 1 punto: Divergencia alcista detectada
+        - 1 punto: Divergencia alcista en RSI detectada
         - 0 puntos: Sin divergencias o divergencia bajista
+
+        indicators: contexto de indicadores del frame (opcional)
         """
-        rsi = self.calculate_rsi(df)
-        macd, signal = self.calculate_macd(df)
-
-        recent = df.tail(30)
-        recent_rsi = rsi.tail(30)
-        recent_macd = macd.tail(30)
-
-        rsi_div = None
-        macd_div = None
-
-        # Detectar divergencia alcista en RSI
-        # Precio hace mínimos más bajos, RSI hace mínimos más altos
-        price_lows = []
-        rsi_lows = []
-
-        for i in range(2, len(recent) - 2):
-            if (recent['low'].iloc[i] < recent['low'].iloc[i-1] and 
-                recent['low'].iloc[i] < recent['low'].iloc[i+1]):
-                price_lows.append((i, recent['low'].iloc[i]))
-                rsi_lows.append((i, recent_rsi.iloc[i]))
-
-        if len(price_lows) >= 2:
-            if price_lows[-1][1] < price_lows[-2][1] and rsi_lows[-1][1] > rsi_lows[-2][1]:
-                rsi_div = Divergence(
-                    type="bullish",
-                    indicator="RSI",
-                    strength="strong",
-                    timeframe="recent"
-                )
-
-        # Detectar divergencia en MACD (simplificado)
-        if recent_macd.iloc[-1] > recent_macd.iloc[-5]:
-            if recent['close'].iloc[-1] < recent['close'].iloc[-5]:
-                macd_div = Divergence(
-                    type="bullish",
-                    indicator="MACD",
-                    strength="moderate",
-                    timeframe="recent"
-                )
+        if indicators is not None:
+            rsi = indicators.rsi(14)
+            macd = indicators.macd()[0]
+        else:
+            rsi = self.calculate_rsi(df).to_numpy()
+            macd = self.calculate_macd(df)[0].to_numpy()
+
+        low = df['low'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        # Pivots una sola vez para ambos osciladores
+        low_pivots = window_pivots(low, "low", lookback)
+        high_pivots = window_pivots(high, "high", lookback)
+
+        def build(oscillator: np.ndarray, indicator: str, strength: str, kind: str) -> Optional[Divergence]:
+            if kind == "bullish":
+                found = latest_pair(low, oscillator, low_pivots, kind)
+            else:
+                found = latest_pair(high, oscillator, high_pivots, kind)
+            if found is None:
+                return None
+            previous_bar, bar = found
+            return Divergence(
+                type=kind,
+                indicator=indicator,
+                strength=strength,
+                timeframe="recent",
+                bar_index=bar,
+                previous_bar_index=previous_bar
+            )
+
+        # Alcistas y bajistas por separado: el score solo depende de la alcista del RSI
+        rsi_div = build(rsi, "RSI", "strong", "bullish")
+        macd_div = build(macd, "MACD", "moderate", "bullish")
+        rsi_bearish = build(rsi, "RSI", "strong", "bearish")
+        macd_bearish = build(macd, "MACD", "moderate", "bearish")
 
         has_divergence = rsi_div is not None or macd_div is not None
         score = 1 if (rsi_div and rsi_div.type == "bullish") else 0
@@ -233,7 +264,10 @@ class MarketStructureModule:
             rsi_divergence=rsi_div,
             macd_divergence=macd_div,
             has_divergence=has_divergence,
-            score=score
+            score=score,
+            rsi_bearish_divergence=rsi_bearish,
+            macd_bearish_divergence=macd_bearish,
+            has_bearish_divergence=rsi_bearish is not None or macd_bearish is not None
         )
 
     def analyze(
@@ -241,7 +275,8 @@ class MarketStructureModule:
         df: pd.DataFrame,
         symbol: str,
         timeframe: str,
-        current_price: float
+        current_price: float,
+        indicators: Optional[IndicatorContext] = None
     ) -> MarketStructureResponse:
         """
         Análisis completo de estructura de mercado
@@ -252,8 +287,8 @@ class MarketStructureModule:
         - Divergencias: 1 punto
         """
         order_blocks = self.find_order_blocks(df, current_price)
-        wyckoff = self.analyze_wyckoff(df)
-        divergences = self.detect_divergences(df)
+        wyckoff = self.analyze_wyckoff(df, indicators)
+        divergences = self.detect_divergences(df, indicators)
 
         total_score = order_blocks.score + wyckoff.score + divergences.score
         confidence_percentage = (total_score / 5) * 100
@@ -5,6 +5,7 @@ from app.models.risk_management import (
     PositionSize, TakeProfitLevel, RiskRewardAnalysis,
     RiskManagementResponse
 )
+from app.services.indicators import IndicatorContext
 
 class RiskManagementModule:
     
@@ -63,7 +64,8 @@ class RiskManagementModule:
         df: pd.DataFrame,
         entry_price: float,
         user_stop_loss: Optional[float] = None,
-        support_level: Optional[float] = None
+        support_level: Optional[float] = None,
+        atr: Optional[float] = None
     ) -> Tuple[float, str, Optional[float]]:
         """
         Calcula el Stop Loss óptimo
@@ -72,8 +74,11 @@ class RiskManagementModule:
         1. Stop Loss provisto por el usuario
         2. Nivel de soporte técnico - 0.5%
         3. ATR × 2 por debajo del entry
+
+        atr: ATR ya calculado (contexto de indicadores); si no, se calcula del df
         """
-        atr = self.calculate_atr(df)
+        if atr is None:
+            atr = self.calculate_atr(df)
         
         if user_stop_loss:
             return user_stop_loss, "user_provided", atr
@@ -168,7 +173,8 @@ class RiskManagementModule:
         user_stop_loss: Optional[float],
         capital: float,
         risk_percentage: float,
-        support_level: Optional[float] = None
+        support_level: Optional[float] = None,
+        indicators: Optional[IndicatorContext] = None
     ) -> RiskManagementResponse:
         """
         Análisis completo de gestión de riesgo
@@ -179,8 +185,9 @@ class RiskManagementModule:
         - Position Size: 1 punto
         """
         # Calcular Stop Loss
+        atr = indicators.atr(14)[-1] if indicators is not None else None
         stop_loss, sl_source, atr = self.calculate_stop_loss(
-            df, entry_price, user_stop_loss, support_level
+            df, entry_price, user_stop_loss, support_level, atr
         )
         
         stop_loss_distance_percent = abs((entry_price - stop_loss) / entry_price) * 100
@@ -1,10 +1,11 @@
 import pandas as pd
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 from app.models.sentiment_analysis import (
     SocialSentiment, SocialAnalysis, FundingRate, FundingAnalysis,
     VolumeOIAnalysis, SentimentAnalysisResponse
 )
+from app.services.indicators import IndicatorContext
 
 class SentimentAnalysisModule:
 
@@ -110,7 +111,12 @@ class SentimentAnalysisModule:
             score=score
         )
 
-    def analyze_volume_oi(self, df: pd.DataFrame, symbol: str) -> VolumeOIAnalysis:
+    def analyze_volume_oi(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        indicators: Optional[IndicatorContext] = None
+    ) -> VolumeOIAnalysis:
         """
         Analiza volumen y open interest
 
@@ -123,8 +129,14 @@ class SentimentAnalysisModule:
         volume_24h = df['volume'].tail(24).sum() if len(df) >= 24 else df['volume'].sum()
 
         # Calcular cambio de volumen
-        recent_volume = df['volume'].tail(12).mean()
-        previous_volume = df['volume'].tail(24).head(12).mean() if len(df) >= 24 else recent_volume
+        if indicators is not None and len(df) >= 24:
+            # Media móvil de 12 velas: última ventana y la inmediatamente anterior
+            volume_ma_12 = indicators.sma("volume", 12)
+            recent_volume = volume_ma_12[-1]
+            previous_volume = volume_ma_12[-13]
+        else:
+            recent_volume = df['volume'].tail(12).mean()
+            previous_volume = df['volume'].tail(24).head(12).mean() if len(df) >= 24 else recent_volume
 
         volume_change_pct = ((recent_volume - previous_volume) / previous_volume * 100) if previous_volume > 0 else 0
 
@@ -157,7 +169,8 @@ class SentimentAnalysisModule:
         symbol: str,
         df: pd.DataFrame,
         timeframe: str,
-        current_price: float
+        current_price: float,
+        indicators: Optional[IndicatorContext] = None
     ) -> SentimentAnalysisResponse:
         """
         Análisis completo de sentimiento
@@ -170,7 +183,7 @@ class SentimentAnalysisModule:
 
         social = self.analyze_social_sentiment(symbol)
         funding = self.analyze_funding_rates(symbol)
-        volume_oi = self.analyze_volume_oi(df, symbol)
+        volume_oi = self.analyze_volume_oi(df, symbol, indicators)
 
         total_score = social.score + funding.score + volume_oi.score
         confidence_percentage = (total_score / 4) * 100
@@ -1,22 +1,43 @@
 import pandas as pd
 import numpy as np
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.models.technical_analysis import (
     EMAData, FibonacciData, FibonacciLevel,
     SupportResistanceData, SupportResistanceLevel,
     TechnicalAnalysisResponse
 )
+from app.services.indicators import IndicatorContext
+from app.services.swing_points import SwingPointIndex
 
 class TechnicalAnalysisModule:
     
     def calculate_ema(self, df: pd.DataFrame, period: int):
         return df['close'].ewm(span=period, adjust=False).mean()
     
-    def analyze_emas(self, df: pd.DataFrame, current_price: float):
-        ema_9 = self.calculate_ema(df, 9).iloc[-1]
-        ema_21 = self.calculate_ema(df, 21).iloc[-1]
-        ema_50 = self.calculate_ema(df, 50).iloc[-1]
-        ema_200 = self.calculate_ema(df, 200).iloc[-1]
+    def analyze_emas(
+        self,
+        df: pd.DataFrame,
+        current_price: float,
+        indicators: Optional[IndicatorContext] = None,
+        live_indicators: Optional[Dict[str, float]] = None
+    ):
+        if live_indicators is not None:
+            # Estado incremental (IndicatorStateStore): solo se procesaron las velas nuevas
+            ema_9 = live_indicators['ema_9']
+            ema_21 = live_indicators['ema_21']
+            ema_50 = live_indicators['ema_50']
+            ema_200 = live_indicators['ema_200']
+        elif indicators is not None:
+            # EMAs memoizadas en el contexto del frame (compartido entre módulos)
+            ema_9 = indicators.ema(9)[-1]
+            ema_21 = indicators.ema(21)[-1]
+            ema_50 = indicators.ema(50)[-1]
+            ema_200 = indicators.ema(200)[-1]
+        else:
+            ema_9 = self.calculate_ema(df, 9).iloc[-1]
+            ema_21 = self.calculate_ema(df, 21).iloc[-1]
+            ema_50 = self.calculate_ema(df, 50).iloc[-1]
+            ema_200 = self.calculate_ema(df, 200).iloc[-1]
         
         bullish_count = 0
         if current_price > ema_9: bullish_count += 1
@@ -93,56 +114,35 @@ class TechnicalAnalysisModule:
             score=score
         )
     
-    def find_support_resistance(self, df: pd.DataFrame, current_price: float):
+    def find_support_resistance(
+        self,
+        df: pd.DataFrame,
+        current_price: float,
+        indicators: Optional[IndicatorContext] = None
+    ):
         tolerance = 0.02
-        highs = df['high'].values
-        lows = df['low'].values
-        
-        support_levels = []
-        resistance_levels = []
-        
-        for i in range(2, len(lows) - 2):
-            if (lows[i] < lows[i-1] and lows[i] < lows[i-2] and 
-                lows[i] < lows[i+1] and lows[i] < lows[i+2]):
-                price = lows[i]
-                found = False
-                for level in support_levels:
-                    if abs(level['price'] - price) / price < tolerance:
-                        level['strength'] += 1
-                        found = True
-                        break
-                if not found:
-                    support_levels.append({'price': price, 'strength': 1})
-        
-        for i in range(2, len(highs) - 2):
-            if (highs[i] > highs[i-1] and highs[i] > highs[i-2] and 
-                highs[i] > highs[i+1] and highs[i] > highs[i+2]):
-                price = highs[i]
-                found = False
-                for level in resistance_levels:
-                    if abs(level['price'] - price) / price < tolerance:
-                        level['strength'] += 1
-                        found = True
-                        break
-                if not found:
-                    resistance_levels.append({'price': price, 'strength': 1})
+        # Pivots vectorizados + agrupación first-fit en orden cronológico,
+        # candidatos por búsqueda binaria (ver SwingPointIndex)
+        swing_index = indicators.swing_points() if indicators is not None else SwingPointIndex.from_frame(df)
+        support_levels = swing_index.levels("support", tolerance)
+        resistance_levels = swing_index.levels("resistance", tolerance)
         
         supports = [
             SupportResistanceLevel(
-                price=round(s['price'], 2),
-                strength=min(s['strength'], 5),
+                price=round(s.price, 2),
+                strength=min(s.strength, 5),
                 type="support"
             )
-            for s in sorted(support_levels, key=lambda x: x['price'], reverse=True)[:5]
+            for s in sorted(support_levels, key=lambda x: x.price, reverse=True)[:5]
         ]
         
         resistances = [
             SupportResistanceLevel(
-                price=round(r['price'], 2),
-                strength=min(r['strength'], 5),
+                price=round(r.price, 2),
+                strength=min(r.strength, 5),
                 type="resistance"
             )
-            for r in sorted(resistance_levels, key=lambda x: x['price'])[:5]
+            for r in sorted(resistance_levels, key=lambda x: x.price)[:5]
         ]
         
         nearest_support = None
@@ -182,10 +182,18 @@ class TechnicalAnalysisModule:
             score=score
         )
     
-    def analyze(self, df: pd.DataFrame, symbol: str, timeframe: str, current_price: float):
-        ema_data = self.analyze_emas(df, current_price)
+    def analyze(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        timeframe: str,
+        current_price: float,
+        indicators: Optional[IndicatorContext] = None,
+        live_indicators: Optional[Dict[str, float]] = None
+    ):
+        ema_data = self.analyze_emas(df, current_price, indicators, live_indicators)
         fib_data = self.calculate_fibonacci(df, current_price)
-        sr_data = self.find_support_resistance(df, current_price)
+        sr_data = self.find_support_resistance(df, current_price, indicators)
         
         total_score = ema_data.score + fib_data.score + sr_data.score
         confidence_percentage = (total_score / 7) * 100
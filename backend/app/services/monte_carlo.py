@@ -0,0 +1,293 @@
+# backend/app/services/monte_carlo.py
+"""
+Simulación Monte Carlo por bloques con techo de memoria.
+
+Una matriz (simulaciones × trades) de 50.000 × 5.000 ocupa ~2 GB en
+float64, así que las simulaciones se procesan en bloques de filas.
+MONTE_CARLO_MAX_CHUNK_MB es el techo de memoria total: cada bloque ocupa
+como mucho 1/BUDGET_SLICES de ese techo. De cada bloque
+solo se conservan:
+- Equity final de cada simulación (8 bytes por simulación, lo que permite
+  percentiles exactos sin aproximaciones)
+- Max drawdown (%) de cada simulación
+- Las curvas de ejemplo, submuestreadas a un número fijo de puntos
+
+Los bloques son independientes: cada uno tiene su semilla hija de
+SeedSequence(seed) y run_parallel los reparte entre un pool de procesos.
+La división en bloques no depende del número de workers, así que con el
+mismo seed el resultado es el mismo en 1 o en 16 núcleos. El número de
+workers se limita a los núcleos asignados al proceso (sched_getaffinity,
+no los del host) y a los que caben en el techo: cada worker suma el
+bloque real del plan (filas × trades × CELL_BYTES) y su propio
+intérprete (WORKER_OVERHEAD_MB).
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bytes por celda (simulación, trade) en el pico de memoria de un bloque:
+# P&L variado + matriz temporal (índices / factores / aleatorios / picos)
+CELL_BYTES = 24
+
+# Cada bloque ocupa como mucho 1/BUDGET_SLICES del techo de memoria total
+# (64 MB con el techo por defecto de 1 GB)
+BUDGET_SLICES = 16
+
+# Memoria aproximada de un intérprete spawn con NumPy cargado
+WORKER_OVERHEAD_MB = 40.0
+
+# Simulaciones máximas por bloque: reparte el trabajo entre procesos
+# aunque el techo de memoria permita bloques mayores
+BLOCK_SIMULATIONS = 1000
+
+# Por debajo de este tamaño (simulaciones × trades) no compensa usar procesos
+PARALLEL_MIN_CELLS = 2_000_000
+
+FAILED_TRADE_PROBABILITY = 0.05
+VARIANCE_RANGE = (0.9, 1.1)
+
+
+@dataclass
+class MonteCarloBlock:
+    """Resultado acumulado de una o varias simulaciones."""
+    final_equities: np.ndarray
+    max_drawdowns: np.ndarray
+    sample_curves: List[List[float]]
+
+
+def chunk_rows(num_trades: int, max_chunk_mb: float) -> int:
+    """Simulaciones por bloque para no superar max_chunk_mb."""
+    max_bytes = max_chunk_mb * 1024 * 1024
+    return max(1, int(max_bytes // (max(num_trades, 1) * CELL_BYTES)))
+
+
+def curve_points(num_trades: int, max_points: int) -> np.ndarray:
+    """Índices (0..num_trades) de la curva que se conservan al submuestrear."""
+    if num_trades + 1 <= max_points:
+        return np.arange(num_trades + 1)
+    return np.unique(np.linspace(0, num_trades, max_points).round().astype(np.int64))
+
+
+def simulate_block(
+    pnls: np.ndarray,
+    num_simulations: int,
+    initial_capital: float,
+    rng: np.random.Generator,
+    num_samples: int = 0,
+    sample_points: int = 200
+) -> MonteCarloBlock:
+    """
+    Simula un bloque de trayectorias (todas en memoria a la vez).
+
+    Cada trayectoria remuestrea los trades con reemplazo, aplica una
+    varianza de ±10% al P&L y anula un 5% de trades (fallidos).
+    """
+    num_trades = len(pnls)
+    if num_trades == 0:
+        flat = np.full(num_simulations, float(initial_capital))
+        return MonteCarloBlock(
+            final_equities=flat,
+            max_drawdowns=np.zeros(num_simulations),
+            sample_curves=[[float(initial_capital)] for _ in range(min(num_samples, num_simulations))]
+        )
+
+    shape = (num_simulations, num_trades)
+    equity = pnls[rng.integers(0, num_trades, size=shape)]
+    equity *= rng.uniform(*VARIANCE_RANGE, size=shape)
+    equity[rng.random(shape) < FAILED_TRADE_PROBABILITY] = 0.0
+
+    # P&L → equity acumulada, en el mismo buffer
+    np.cumsum(equity, axis=1, out=equity)
+    equity += initial_capital
+
+    sample_curves = []
+    if num_samples:
+        points = curve_points(num_trades, sample_points)
+        samples = equity[:num_samples]
+        full = np.concatenate([np.full((len(samples), 1), float(initial_capital)), samples], axis=1)
+        sample_curves = full[:, points].tolist()
+
+    final_equities = equity[:, -1].copy()
+
+    # Drawdown respecto al máximo previo (incluyendo el capital inicial)
+    peaks = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peaks, initial_capital, out=peaks)
+    np.divide(equity, peaks, out=peaks)
+    max_drawdowns = (1 - peaks.min(axis=1)) * 100
+
+    return MonteCarloBlock(final_equities, max_drawdowns, sample_curves)
+
+
+def plan_blocks(num_simulations: int, num_trades: int, max_chunk_mb: float) -> List[int]:
+    """
+    Simulaciones de cada bloque. Depende solo del tamaño del problema y
+    del techo de memoria total, nunca del número de workers.
+    """
+    rows = min(BLOCK_SIMULATIONS, chunk_rows(num_trades, max_chunk_mb / BUDGET_SLICES))
+    return [min(rows, num_simulations - start) for start in range(0, num_simulations, rows)]
+
+
+def _block_jobs(
+    pnls: np.ndarray,
+    num_simulations: int,
+    initial_capital: float,
+    max_chunk_mb: float,
+    seed: Optional[int],
+    num_samples: int,
+    sample_points: int
+) -> List[tuple]:
+    """Argumentos de _run_block para cada bloque, con su semilla derivada."""
+    blocks = plan_blocks(num_simulations, len(pnls), max_chunk_mb)
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    jobs = []
+    start = 0
+    for rows, block_seed in zip(blocks, seeds):
+        block_samples = max(0, min(rows, num_samples - start))
+        jobs.append((pnls, rows, initial_capital, block_seed, block_samples, sample_points))
+        start += rows
+    return jobs
+
+
+def _run_block(
+    pnls: np.ndarray,
+    num_simulations: int,
+    initial_capital: float,
+    seed_sequence: np.random.SeedSequence,
+    num_samples: int,
+    sample_points: int
+) -> MonteCarloBlock:
+    """Un bloque con su propio generador (ejecutable en otro proceso)."""
+    rng = np.random.default_rng(seed_sequence)
+    return simulate_block(pnls, num_simulations, initial_capital, rng, num_samples, sample_points)
+
+
+def merge_blocks(blocks: List[MonteCarloBlock]) -> MonteCarloBlock:
+    """Une los bloques en el orden del plan."""
+    sample_curves: List[List[float]] = []
+    for block in blocks:
+        sample_curves.extend(block.sample_curves)
+    return MonteCarloBlock(
+        final_equities=np.concatenate([block.final_equities for block in blocks]),
+        max_drawdowns=np.concatenate([block.max_drawdowns for block in blocks]),
+        sample_curves=sample_curves
+    )
+
+
+def run_chunked(
+    pnls: np.ndarray,
+    num_simulations: int,
+    initial_capital: float,
+    max_chunk_mb: float,
+    seed: Optional[int] = None,
+    num_samples: int = 100,
+    sample_points: int = 200
+) -> MonteCarloBlock:
+    """
+    Ejecuta num_simulations bloque a bloque en el proceso actual
+    (un solo bloque en memoria a la vez).
+
+    Con el mismo seed y el mismo techo de memoria el resultado es
+    idéntico al de run_parallel.
+    """
+    jobs = _block_jobs(pnls, num_simulations, initial_capital, max_chunk_mb, seed, num_samples, sample_points)
+    return merge_blocks([_run_block(*job) for job in jobs])
+
+
+def available_cpus() -> int:
+    """Núcleos que puede usar este proceso (afinidad / cpuset del contenedor)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def block_mb(num_simulations: int, num_trades: int, max_chunk_mb: float) -> float:
+    """Memoria pico (MB) del mayor bloque del plan."""
+    blocks = plan_blocks(num_simulations, num_trades, max_chunk_mb)
+    return max(blocks, default=0) * max(num_trades, 1) * CELL_BYTES / (1024 * 1024)
+
+
+def resolve_workers(workers: int, max_chunk_mb: float, worker_block_mb: float) -> int:
+    """
+    Procesos del pool: los pedidos (0 = núcleos disponibles), limitados a
+    los núcleos asignados y a los que caben en el techo de memoria con un
+    bloque en vuelo (worker_block_mb) y su intérprete cada uno.
+    """
+    cpus = available_cpus()
+    requested = min(workers, cpus) if workers else cpus
+    per_worker_mb = worker_block_mb + WORKER_OVERHEAD_MB
+    return max(1, min(requested, int(max_chunk_mb // per_worker_mb)))
+
+
+async def run_parallel(
+    pnls: np.ndarray,
+    num_simulations: int,
+    initial_capital: float,
+    max_chunk_mb: float,
+    seed: Optional[int] = None,
+    num_samples: int = 100,
+    sample_points: int = 200,
+    workers: int = 0
+) -> MonteCarloBlock:
+    """
+    Reparte los bloques entre los procesos del pool sin bloquear el event loop.
+
+    Cada bloque usa una semilla hija de SeedSequence(seed), así que el
+    resultado no depende del número de workers (ver resolve_workers). Los
+    problemas pequeños (o con un solo worker) se ejecutan en un hilo para
+    no pagar la serialización.
+    """
+    workers = resolve_workers(workers, max_chunk_mb, block_mb(num_simulations, len(pnls), max_chunk_mb))
+    args = (pnls, num_simulations, initial_capital, max_chunk_mb, seed, num_samples, sample_points)
+
+    if workers <= 1 or num_simulations * len(pnls) < PARALLEL_MIN_CELLS:
+        return await asyncio.to_thread(run_chunked, *args)
+
+    loop = asyncio.get_running_loop()
+    pool = get_monte_carlo_pool(workers)
+    jobs = _block_jobs(*args)
+    try:
+        blocks = await asyncio.gather(*[
+            loop.run_in_executor(pool, _run_block, *job) for job in jobs
+        ])
+    except BrokenProcessPool:
+        logger.warning("⚠️ Pool de Monte Carlo roto, reintentando en un hilo")
+        shutdown_monte_carlo_pool()
+        return await asyncio.to_thread(run_chunked, *args)
+
+    return merge_blocks(blocks)
+
+
+# Singleton
+_pool = None
+_pool_workers = 0
+
+def get_monte_carlo_pool(workers: int) -> ProcessPoolExecutor:
+    """Obtiene el pool de procesos de Monte Carlo (se crea al primer uso)."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # spawn: los workers no heredan hilos ni el event loop de la app
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+        logger.info(f"🧮 Pool de Monte Carlo creado: {workers} procesos")
+    return _pool
+
+
+def shutdown_monte_carlo_pool():
+    """Cierra el pool de procesos (shutdown de la app)."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
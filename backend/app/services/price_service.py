@@ -0,0 +1,120 @@
+# backend/app/services/price_service.py
+"""
+Servicio de precios actuales en bloque.
+
+En vez de un fetch_ticker por símbolo, cada refresco pide todos los
+tickers del universo de un exchange en una sola llamada (fetch_tickers)
+y los guarda con un TTL corto (sub-segundo por defecto). Los pedidos
+simultáneos al mismo exchange esperan al refresco en curso en lugar de
+lanzar el suyo.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.config.crypto_config import get_cryptos_by_exchange, get_exchange_for_crypto
+from app.utils.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class PriceService:
+    """Precios actuales con fetch_tickers por exchange y TTL corto."""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PRICE_CACHE_TTL_SECONDS
+        self._prices: Dict[str, Tuple[float, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.bulk_requests = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_fresh(self, symbol: str, requested_at: float) -> Optional[float]:
+        """Precio obtenido como máximo ttl_seconds antes del pedido."""
+        entry = self._prices.get(symbol)
+        if entry is not None and entry[0] > requested_at - self.ttl_seconds:
+            return entry[1]
+        return None
+
+    async def _refresh_exchange(self, fetcher, exchange_name: str, symbols: List[str], requested_at: float):
+        """Refresca de una vez todos los precios del universo del exchange."""
+        lock = self._locks.setdefault(exchange_name, asyncio.Lock())
+        async with lock:
+            # Otro pedido pudo refrescarlos mientras esperábamos el lock
+            if all(self._get_fresh(symbol, requested_at) is not None for symbol in symbols):
+                return
+
+            universe = sorted(set(get_cryptos_by_exchange(exchange_name)) | set(symbols))
+            await get_rate_limiter(exchange_name).acquire_async()
+            try:
+                prices = await fetcher.get_current_prices(exchange_name, universe)
+                self.bulk_requests += 1
+            except Exception as e:
+                # Fallback: solo los símbolos pedidos, uno a uno
+                logger.warning(f"⚠️ fetch_tickers falló en {exchange_name}, precio por símbolo: {e}")
+                prices = {}
+                for symbol in symbols:
+                    prices[symbol] = await fetcher.get_current_price(symbol)
+
+            now = time.monotonic()
+            for symbol, price in prices.items():
+                self._prices[symbol] = (now, price)
+
+    async def get_prices(self, fetcher, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Precios actuales de varios símbolos (un refresco por exchange,
+        exchanges en paralelo). Los símbolos sin precio no aparecen.
+        """
+        symbols = list(symbols)
+        requested_at = time.monotonic()
+        missing: Dict[str, List[str]] = {}
+        for symbol in symbols:
+            if self._get_fresh(symbol, requested_at) is None:
+                missing.setdefault(get_exchange_for_crypto(symbol), []).append(symbol)
+
+        self.hits += len(symbols) - sum(len(v) for v in missing.values())
+        self.misses += sum(len(v) for v in missing.values())
+
+        if missing:
+            await asyncio.gather(*[
+                self._refresh_exchange(fetcher, exchange_name, exchange_symbols, requested_at)
+                for exchange_name, exchange_symbols in missing.items()
+            ])
+
+        prices = {}
+        for symbol in symbols:
+            price = self._get_fresh(symbol, requested_at)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    async def get_price(self, fetcher, symbol: str) -> float:
+        """Precio actual de un símbolo (lanza excepción si no hay precio)."""
+        prices = await self.get_prices(fetcher, [symbol])
+        if symbol not in prices:
+            raise Exception(f"Precio no disponible para {symbol}")
+        return prices[symbol]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "symbols": len(self._prices),
+            "ttl_seconds": self.ttl_seconds,
+            "bulk_requests": self.bulk_requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# Singleton
+_price_service = None
+
+def get_price_service() -> PriceService:
+    """Obtiene instancia del servicio de precios."""
+    global _price_service
+    if _price_service is None:
+        _price_service = PriceService()
+    return _price_service
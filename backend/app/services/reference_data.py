@@ -0,0 +1,97 @@
+# backend/app/services/reference_data.py
+"""
+Caché de datos de referencia (BTC/ETH) con TTL.
+
+El módulo macro compara cada activo contra BTC y ETH. Estas series son
+iguales para todos los símbolos, así que se descargan una vez y se
+comparten entre el scanner, /validate-signal y /macro-analysis hasta que
+vence el TTL. Un lock por clave evita que varias peticiones simultáneas
+descarguen la misma serie a la vez.
+
+Los DataFrames se comparten: los consumidores solo deben leerlos.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from app.core.config import settings
+from app.config.crypto_config import get_exchange_for_crypto
+from app.utils.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_SYMBOLS = ("BTC/USDT", "ETH/USDT")
+
+
+class ReferenceDataCache:
+    """Series OHLCV de referencia compartidas, con expiración por TTL."""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.REFERENCE_DATA_TTL_SECONDS
+        self._entries: Dict[tuple, Tuple[float, pd.DataFrame]] = {}
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get_fresh(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    async def get_ohlcv(self, fetcher, symbol: str, timeframe: str = "1d", limit: int = 50) -> pd.DataFrame:
+        """Retorna la serie cacheada o la descarga con el fetcher dado."""
+        key = (symbol, timeframe, limit)
+        df = self._get_fresh(key)
+        if df is not None:
+            self.hits += 1
+            return df
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Otra petición pudo descargarla mientras esperábamos el lock
+            df = self._get_fresh(key)
+            if df is not None:
+                self.hits += 1
+                return df
+
+            self.misses += 1
+            await get_rate_limiter(get_exchange_for_crypto(symbol)).acquire_async()
+            df = await fetcher.get_ohlcv(symbol, timeframe, limit=limit)
+            self._entries[key] = (time.monotonic(), df)
+            logger.debug(f"📦 Referencia cacheada: {symbol} {timeframe} ({len(df)} velas)")
+            return df
+
+    async def get_macro_frames(self, fetcher, timeframe: str = "1d", limit: int = 50) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(df_btc, df_eth) para MacroAnalysisModule."""
+        df_btc, df_eth = await asyncio.gather(*[
+            self.get_ohlcv(fetcher, symbol, timeframe, limit) for symbol in REFERENCE_SYMBOLS
+        ])
+        return df_btc, df_eth
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# Singleton
+_reference_cache = None
+
+def get_reference_data_cache() -> ReferenceDataCache:
+    """Obtiene instancia de la caché de datos de referencia."""
+    global _reference_cache
+    if _reference_cache is None:
+        _reference_cache = ReferenceDataCache()
+    return _reference_cache
@@ -0,0 +1,211 @@
+# backend/app/services/scanner_scheduler.py
+"""
+Scanner continuo en segundo plano.
+
+Ejecuta scan_all_cryptos para cada timeframe justo después del cierre de
+cada vela y guarda el último ScannerResponse como snapshot, válido hasta el
+siguiente cierre de vela de su timeframe. /run y /test
+se sirven desde el snapshot (aplicando los filtros de cada request), así
+que los dashboards que consultan el scanner no generan tráfico hacia los
+exchanges. force_refresh=True sigue escaneando en vivo.
+
+Es opcional (SCANNER_SCHEDULER_ENABLED): cada proceso que lo active
+escanea el universo completo, así que con varios workers de uvicorn debe
+activarse en uno solo.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.models.scanner import ScannerRequest, ScannerResponse
+from app.services.scanner_service import ScannerService
+from app.utils.candles import TIMEFRAME_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = ScannerRequest.model_fields["deadline_seconds"].default
+
+# Filas que no se guardan en el snapshot (el símbolo se escanea en vivo)
+FAILED_RECOMMENDATIONS = ("TIMEOUT", "ERROR")
+
+
+def seconds_until_close(timeframe: str, now: Optional[float] = None) -> float:
+    """Segundos hasta el próximo cierre de vela (alineado a epoch UTC)."""
+    period = TIMEFRAME_SECONDS[timeframe]
+    now = time.time() if now is None else now
+    return period - (now % period)
+
+
+class ScannerScheduler:
+    """Snapshots del scanner por timeframe, recalculados al cierre de vela."""
+
+    def __init__(
+        self,
+        timeframes: Sequence[str] = None,
+        close_delay_seconds: float = None
+    ):
+        self.timeframes = list(timeframes or settings.SCANNER_TIMEFRAMES)
+        self.close_delay_seconds = (
+            close_delay_seconds if close_delay_seconds is not None else settings.SCANNER_CLOSE_DELAY_SECONDS
+        )
+        self.service = ScannerService()
+        # timeframe -> (monotonic al guardar, epoch de expiración o None,
+        #               ScannerResponse completo sin filtros)
+        self._snapshots: Dict[str, Tuple[float, Optional[float], ScannerResponse]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    # ==================== SNAPSHOTS ====================
+
+    def store(self, timeframe: str, response: ScannerResponse) -> bool:
+        """
+        Guarda un escaneo del universo entero (sin filtros) hasta el
+        próximo cierre de vela del timeframe.
+
+        Las filas TIMEOUT/ERROR se excluyen del snapshot: un símbolo que
+        falla siempre (p.ej. deslistado) no impide guardar el resto, y un
+        request que lo pida explícitamente se escanea en vivo. Si no hay
+        ninguna fila válida no se guarda.
+        """
+        results = [r for r in response.all_results if r["recommendation"] not in FAILED_RECOMMENDATIONS]
+        if not results:
+            logger.warning(f"⚠️ Escaneo {timeframe} sin resultados válidos, no se guarda como snapshot")
+            return False
+
+        failed = len(response.all_results) - len(results)
+        if failed:
+            logger.warning(f"⚠️ Snapshot {timeframe}: {failed} símbolos con TIMEOUT/ERROR excluidos")
+            response = response.copy(update={"all_results": results})
+
+        expires_at = time.time() + seconds_until_close(timeframe) if timeframe in TIMEFRAME_SECONDS else None
+        self._snapshots[timeframe] = (time.monotonic(), expires_at, response)
+        return True
+
+    def get_snapshot(self, timeframe: str) -> Optional[Tuple[ScannerResponse, float]]:
+        """(snapshot, edad en segundos) o None si no hay o ya cerró su vela."""
+        entry = self._snapshots.get(timeframe)
+        if entry is None:
+            return None
+        stored_at, expires_at, response = entry
+        if expires_at is not None and time.time() >= expires_at:
+            return None
+        return response, time.monotonic() - stored_at
+
+    def get_response(self, request: ScannerRequest) -> Optional[ScannerResponse]:
+        """
+        Respuesta para un request desde el snapshot, aplicando su
+        confluencia mínima y filtros. None si hay que escanear en vivo.
+        """
+        if request.force_refresh:
+            return None
+
+        snapshot = self.get_snapshot(request.timeframe)
+        if snapshot is None:
+            return None
+        response, age = snapshot
+
+        results = response.all_results
+        if request.symbols:
+            by_symbol = {r["symbol"]: r for r in results}
+            if not all(symbol in by_symbol for symbol in request.symbols):
+                return None
+            results = [by_symbol[symbol] for symbol in request.symbols]
+
+        served = self.service.build_response(request, results, timestamp=response.timestamp)
+        served.from_snapshot = True
+        served.snapshot_age_seconds = round(age, 1)
+        return served
+
+    def is_universe_scan(self, request: ScannerRequest) -> bool:
+        """
+        True si el request cubre todo el universo con el deadline por
+        defecto (se puede guardar como snapshot). Con un deadline más corto
+        el escaneo no es representativo para el resto de clientes.
+        """
+        return (
+            not request.symbols
+            and request.timeframe in self.timeframes
+            and request.deadline_seconds == DEFAULT_DEADLINE_SECONDS
+        )
+
+    # ==================== REFRESCO ====================
+
+    async def refresh(self, timeframe: str) -> ScannerResponse:
+        """Escanea el universo completo y actualiza el snapshot."""
+        lock = self._locks.setdefault(timeframe, asyncio.Lock())
+        async with lock:
+            started = time.monotonic()
+            request = ScannerRequest(timeframe=timeframe, min_confluence=0.0)
+            response = await self.service.scan_all_cryptos(request)
+            if self.store(timeframe, response):
+                logger.info(
+                    f"📸 Snapshot scanner {timeframe}: {response.total_scanned} símbolos "
+                    f"en {time.monotonic() - started:.1f}s"
+                )
+            return response
+
+    async def _run_timeframe(self, timeframe: str):
+        """Bucle: escaneo inicial y luego uno tras cada cierre de vela."""
+        while True:
+            try:
+                await self.refresh(timeframe)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error en scanner {timeframe}: {e}")
+
+            wait = seconds_until_close(timeframe) + self.close_delay_seconds
+            logger.info(f"⏰ Próximo escaneo {timeframe} en {wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    def start(self):
+        """Lanza un bucle por timeframe en el event loop actual."""
+        if self._tasks:
+            return
+        for timeframe in self.timeframes:
+            if timeframe not in TIMEFRAME_SECONDS:
+                logger.warning(f"⚠️ Timeframe no soportado por el scheduler: {timeframe}")
+                continue
+            self._tasks.append(asyncio.create_task(self._run_timeframe(timeframe)))
+        logger.info(f"🔄 Scanner en segundo plano iniciado: {self.timeframes}")
+
+    async def stop(self):
+        """Detiene los bucles de escaneo."""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.service.close()
+
+    def status(self) -> dict:
+        now = time.time()
+        snapshots = {}
+        for timeframe in self.timeframes:
+            snapshot = self.get_snapshot(timeframe)
+            snapshots[timeframe] = {
+                "available": snapshot is not None,
+                "timestamp": snapshot[0].timestamp if snapshot else None,
+                "age_seconds": round(snapshot[1], 1) if snapshot else None,
+                "next_scan_in_seconds": (
+                    round(seconds_until_close(timeframe, now) + self.close_delay_seconds, 1)
+                    if timeframe in TIMEFRAME_SECONDS else None
+                )
+            }
+        return {
+            "running": any(not task.done() for task in self._tasks),
+            "snapshots": snapshots
+        }
+
+
+# Singleton
+_scheduler = None
+
+def get_scanner_scheduler() -> ScannerScheduler:
+    """Obtiene instancia del scanner en segundo plano."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ScannerScheduler()
+    return _scheduler
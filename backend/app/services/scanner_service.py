@@ -1,16 +1,27 @@
 # backend/app/services/scanner_service.py
-from typing import Dict, Any
+from typing import Dict, Any, List, AsyncIterator, Awaitable, Callable, Optional, Tuple
 from datetime import datetime
+import time
 import pandas as pd
 import numpy as np
 import asyncio
 
-from app.models.scanner import ScannerRequest, ScannerResponse, CryptoOpportunity
+from app.models.scanner import (
+    ScannerRequest, ScannerResponse, CryptoOpportunity,
+    MultiTimeframeScannerRequest, MultiTimeframeScannerResponse,
+    MultiTimeframeResult, TimeframeConfluence
+)
+from app.core.config import settings
 from app.services.modules.technical_analysis import TechnicalAnalysisModule
 from app.services.modules.market_structure import MarketStructureModule
 from app.services.modules.macro_analysis import MacroAnalysisModule
 from app.services.modules.sentiment_analysis import SentimentAnalysisModule
-from app.utils.market_data import MarketDataFetcher
+from app.utils.market_data import get_market_data_fetcher
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.candles import can_resample, resample_ohlcv, resampled_bars
+from app.services.reference_data import get_reference_data_cache
+from app.services.price_service import get_price_service
+from app.services.indicators import IndicatorContext, compute_batch
 from app.config.crypto_config import (
     get_all_symbols,
     get_exchange_for_crypto,
@@ -19,6 +30,9 @@ from app.config.crypto_config import (
     BINANCE_COUNT
 )
 
+# Velas analizadas por símbolo y timeframe
+CANDLE_LIMIT = 200
+
 class ScannerService:
     def __init__(self):
         """Inicializa servicio de scanner con módulos de análisis"""
@@ -26,29 +40,38 @@ class ScannerService:
         self.structure_module = MarketStructureModule()
         self.macro_module = MacroAnalysisModule()
         self.sentiment_module = SentimentAnalysisModule()
-        self.fetcher = MarketDataFetcher()
+        self.fetcher = get_market_data_fetcher()
+    
+    async def close(self):
+        """Libera el fetcher (los clientes HTTP son del pool compartido y se cierran en el shutdown)"""
+        await self.fetcher.close()
     
-    def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
+    def calculate_atr(self, df: pd.DataFrame, period: int = 14, indicators: Optional[IndicatorContext] = None) -> float:
         """
         Calcula ATR (Average True Range) - Indicador de volatilidad
         
         ATR mide la volatilidad promedio del activo
         Útil para determinar SL y TP dinámicos
-        """
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
-        # True Range = max de:
-        # 1. High - Low
-        # 2. abs(High - Close anterior)
-        # 3. abs(Low - Close anterior)
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
         
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean().iloc[-1]
+        indicators: contexto de indicadores del frame (reutiliza su ATR)
+        """
+        if indicators is not None:
+            atr = indicators.atr(period)[-1]
+        else:
+            high = df['high']
+            low = df['low']
+            close = df['close']
+            
+            # True Range = max de:
+            # 1. High - Low
+            # 2. abs(High - Close anterior)
+            # 3. abs(Low - Close anterior)
+            tr1 = high - low
+            tr2 = abs(high - close.shift())
+            tr3 = abs(low - close.shift())
+            
+            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+            atr = tr.rolling(window=period).mean().iloc[-1]
         
         # Redondeo dinámico basado en el valor
         if atr < 0.01:
@@ -105,113 +128,167 @@ class ScannerService:
             "atr": atr
         }
 
-    async def analyze_crypto(self, symbol: str, timeframe: str = "1h") -> Dict[str, Any]:
-        """Analiza una criptomoneda completa con todos los módulos"""
-        
-        exchange_name = get_exchange_for_crypto(symbol)
-        
+    def _empty_result(self, symbol: str, exchange_name: str, recommendation: str, summary: str) -> Dict[str, Any]:
+        """Resultado vacío para símbolos con error o sin terminar (timeout)"""
+        return {
+            "symbol": symbol,
+            "current_price": 0,
+            "technical_score": 0,
+            "structure_score": 0,
+            "risk_score": 0,
+            "macro_score": 0,
+            "sentiment_score": 0,
+            "total_score": 0,
+            "confluence_percentage": 0,
+            "recommendation": recommendation,
+            "summary": summary,
+            "exchange": exchange_name,
+            "suggested_stop_loss": None,
+            "suggested_take_profit": None,
+            "atr_value": None,
+            "direction": None
+        }
+    
+    async def _fetch_reference_data(self):
+        """Datos diarios de BTC/ETH para el módulo macro (caché compartida con TTL)"""
+        return await get_reference_data_cache().get_macro_frames(self.fetcher, "1d", limit=50)
+    
+    async def fetch_symbol_data(
+        self,
+        symbol: str,
+        timeframe: str,
+        current_price: float = None,
+        limit: int = CANDLE_LIMIT
+    ):
+        """
+        Fase de red de un símbolo: velas (200 por defecto) y precio actual.
+        current_price: precio ya obtenido en bloque (si no, del PriceService)
+        """
+        # Anti-rate-limit: token bucket compartido por exchange (en vez de sleep fijo)
+        await get_rate_limiter(get_exchange_for_crypto(symbol)).acquire_async()
+        df = await self.fetcher.get_ohlcv(symbol, timeframe, limit=limit)
+        if current_price is None:
+            current_price = await get_price_service().get_price(self.fetcher, symbol)
+        return df, current_price
+    
+    async def analyze_crypto(
+        self,
+        symbol: str,
+        timeframe: str = "1h",
+        df_btc: pd.DataFrame = None,
+        df_eth: pd.DataFrame = None,
+        current_price: float = None
+    ) -> Dict[str, Any]:
+        """
+        Analiza una criptomoneda completa con todos los módulos
         
-        # Delay anti-rate-limit (más lento para Kraken)
-        if exchange_name == "kraken":
-            await asyncio.sleep(0.6)
-        else:
-            await asyncio.sleep(0.3)
+        df_btc/df_eth: datos macro ya descargados (si no, se descargan aquí;
+        si tampoco están disponibles, el módulo macro puntúa neutro)
+        current_price: precio ya obtenido en bloque (si no, del PriceService)
+        """
         try:
-            # Obtener datos de mercado usando el fetcher
-            df = await self.fetcher.get_ohlcv(symbol, timeframe, limit=200)
-            current_price = await self.fetcher.get_current_price(symbol)
-            
-            # Módulo 1: Análisis técnico (7 puntos)
-            technical = self.technical_module.analyze(df, symbol, timeframe, current_price)
-            
-            # Módulo 2: Estructura de mercado (5 puntos)
-            structure = self.structure_module.analyze(df, symbol, timeframe, current_price)
-            
-            # Módulo 4: Análisis macro (5 puntos)
-            df_btc = await self.fetcher.get_ohlcv("BTC/USDT", "1d", limit=50)
-            df_eth = await self.fetcher.get_ohlcv("ETH/USDT", "1d", limit=50)
-            macro = self.macro_module.analyze(symbol, df, df_btc, df_eth, timeframe, current_price)
-            
-            # Módulo 5: Análisis de sentimiento (4 puntos)
-            sentiment = self.sentiment_module.analyze(symbol, df, timeframe, current_price)
-            
-            # Módulo 3: Risk score neutro (2/4) - no aplica en scanner
-            risk_score = 2
-            
-            # Calcular score total (máximo 25 puntos)
-            total_score = (
-                technical.total_score +
-                structure.total_score +
-                risk_score +
-                macro.total_score +
-                sentiment.total_score
-            )
-            
-            confluence_percentage = round((total_score / 25) * 100)
-            
-            # Determinar recomendación
-            if confluence_percentage >= 85:
-                recommendation = "STRONG BUY"
-            elif confluence_percentage >= 70:
-                recommendation = "BUY"
-            elif confluence_percentage >= 55:
-                recommendation = "HOLD"
-            elif confluence_percentage >= 40:
-                recommendation = "SELL"
-            else:
-                recommendation = "STRONG SELL"
-            
-            # 🆕 CALCULAR ATR y SL/TP AUTOMÁTICOS
-            atr = self.calculate_atr(df, period=14)
-            sl_tp_data = self.calculate_sl_tp(current_price, atr, recommendation)
+            df, current_price = await self.fetch_symbol_data(symbol, timeframe, current_price)
+            if df_btc is None or df_eth is None:
+                try:
+                    df_btc, df_eth = await self._fetch_reference_data()
+                except Exception as e:
+                    # El módulo macro puntúa neutro sin referencias; los demás módulos siguen
+                    print(f"⚠️ BTC/ETH no disponibles para {symbol}: {e}")
+                    df_btc = df_eth = None
             
-            # Generar resumen
-            summary = (
-                f"{symbol}: {confluence_percentage}% confluencias. "
-                f"Técnico: {technical.total_score}/7, Estructura: {structure.total_score}/5, "
-                f"Macro: {macro.total_score}/5"
+            return self.analyze_frame(
+                symbol, timeframe, df, current_price, df_btc, df_eth,
+                indicators=IndicatorContext(df)
             )
-            
-            return {
-                "symbol": symbol,
-                "current_price": current_price,
-                "technical_score": technical.total_score,
-                "structure_score": structure.total_score,
-                "risk_score": risk_score,
-                "macro_score": macro.total_score,
-                "sentiment_score": sentiment.total_score,
-                "total_score": total_score,
-                "confluence_percentage": confluence_percentage,
-                "recommendation": recommendation,
-                "summary": summary,
-                "exchange": exchange_name,
-                # 🆕 NUEVOS CAMPOS
-                "suggested_stop_loss": sl_tp_data["stop_loss"],
-                "suggested_take_profit": sl_tp_data["take_profit"],
-                "atr_value": sl_tp_data["atr"],
-                "direction": sl_tp_data["direction"]
-            }
-        
         except Exception as e:
             # En caso de error, retornar estructura vacía
-            return {
-                "symbol": symbol,
-                "current_price": 0,
-                "technical_score": 0,
-                "structure_score": 0,
-                "risk_score": 0,
-                "macro_score": 0,
-                "sentiment_score": 0,
-                "total_score": 0,
-                "confluence_percentage": 0,
-                "recommendation": "ERROR",
-                "summary": f"Error: {str(e)}",
-                "exchange": exchange_name,
-                "suggested_stop_loss": None,
-                "suggested_take_profit": None,
-                "atr_value": None,
-                "direction": None
-            }
+            return self._empty_result(symbol, get_exchange_for_crypto(symbol), "ERROR", f"Error: {str(e)}")
+    
+    def analyze_frame(
+        self,
+        symbol: str,
+        timeframe: str,
+        df: pd.DataFrame,
+        current_price: float,
+        df_btc: pd.DataFrame,
+        df_eth: pd.DataFrame,
+        indicators: Optional[IndicatorContext] = None
+    ) -> Dict[str, Any]:
+        """
+        Fase de cálculo (sin red): los 5 módulos sobre datos ya descargados.
+        indicators: contexto de indicadores del frame, compartido por los
+        módulos (si no, cada módulo calcula los suyos)
+        """
+        exchange_name = get_exchange_for_crypto(symbol)
+        
+        # Módulo 1: Análisis técnico (7 puntos)
+        technical = self.technical_module.analyze(df, symbol, timeframe, current_price, indicators)
+        
+        # Módulo 2: Estructura de mercado (5 puntos)
+        structure = self.structure_module.analyze(df, symbol, timeframe, current_price, indicators)
+        
+        # Módulo 4: Análisis macro (5 puntos)
+        macro = self.macro_module.analyze(symbol, df, df_btc, df_eth, timeframe, current_price)
+        
+        # Módulo 5: Análisis de sentimiento (4 puntos)
+        sentiment = self.sentiment_module.analyze(symbol, df, timeframe, current_price, indicators)
+        
+        # Módulo 3: Risk score neutro (2/4) - no aplica en scanner
+        risk_score = 2
+        
+        # Calcular score total (máximo 25 puntos)
+        total_score = (
+            technical.total_score +
+            structure.total_score +
+            risk_score +
+            macro.total_score +
+            sentiment.total_score
+        )
+        
+        confluence_percentage = round((total_score / 25) * 100)
+        
+        # Determinar recomendación
+        if confluence_percentage >= 85:
+            recommendation = "STRONG BUY"
+        elif confluence_percentage >= 70:
+            recommendation = "BUY"
+        elif confluence_percentage >= 55:
+            recommendation = "HOLD"
+        elif confluence_percentage >= 40:
+            recommendation = "SELL"
+        else:
+            recommendation = "STRONG SELL"
+        
+        # 🆕 CALCULAR ATR y SL/TP AUTOMÁTICOS
+        atr = self.calculate_atr(df, period=14, indicators=indicators)
+        sl_tp_data = self.calculate_sl_tp(current_price, atr, recommendation)
+        
+        # Generar resumen
+        summary = (
+            f"{symbol}: {confluence_percentage}% confluencias. "
+            f"Técnico: {technical.total_score}/7, Estructura: {structure.total_score}/5, "
+            f"Macro: {macro.total_score}/5"
+        )
+        
+        return {
+            "symbol": symbol,
+            "current_price": current_price,
+            "technical_score": technical.total_score,
+            "structure_score": structure.total_score,
+            "risk_score": risk_score,
+            "macro_score": macro.total_score,
+            "sentiment_score": sentiment.total_score,
+            "total_score": total_score,
+            "confluence_percentage": confluence_percentage,
+            "recommendation": recommendation,
+            "summary": summary,
+            "exchange": exchange_name,
+            # 🆕 NUEVOS CAMPOS
+            "suggested_stop_loss": sl_tp_data["stop_loss"],
+            "suggested_take_profit": sl_tp_data["take_profit"],
+            "atr_value": sl_tp_data["atr"],
+            "direction": sl_tp_data["direction"]
+        }
     
 
     def apply_advanced_filters(
@@ -254,54 +331,323 @@ class ScannerService:
         
         return filtered, filters_info
     
+    def _resolve_symbols(self, request: ScannerRequest) -> List[str]:
+        """Símbolos personalizados (máx. 5) o todos por defecto"""
+        # Validar máximo 5 símbolos personalizados
+        if request.symbols and len(request.symbols) > 5:
+            raise ValueError("Máximo 5 símbolos permitidos para escaneo personalizado")
+        return request.symbols if request.symbols else get_all_symbols()
+    
+    async def _prepare_scan(self, symbols: List[str]):
+        """Datos compartidos por todo el escaneo: BTC/ETH y precios en bloque"""
+        try:
+            df_btc, df_eth = await self._fetch_reference_data()
+        except Exception as e:
+            print(f"⚠️ Error obteniendo BTC/ETH: {e}")
+            df_btc = df_eth = None
+        
+        # Precios actuales: una llamada fetch_tickers por exchange
+        try:
+            prices = await get_price_service().get_prices(self.fetcher, symbols)
+        except Exception as e:
+            print(f"⚠️ Error obteniendo precios en bloque: {e}")
+            prices = {}
+        
+        return df_btc, df_eth, prices
+    
+    def _is_opportunity(self, result: Dict[str, Any], request: ScannerRequest) -> bool:
+        """Filtro de confluencia mínima (excluye errores y timeouts)"""
+        return (
+            result["confluence_percentage"] >= request.min_confluence
+            and result["recommendation"] not in ("ERROR", "TIMEOUT")
+        )
+    
+    def _to_opportunity(self, opp: Dict[str, Any]) -> CryptoOpportunity:
+        """Convierte un resultado de analyze_crypto en CryptoOpportunity"""
+        return CryptoOpportunity(
+            symbol=opp["symbol"],
+            current_price=opp["current_price"],
+            confluence_percentage=opp["confluence_percentage"],
+            recommendation=opp["recommendation"],
+            total_score=opp["total_score"],
+            exchange=opp["exchange"],
+            suggested_stop_loss=opp.get("suggested_stop_loss"),
+            suggested_take_profit=opp.get("suggested_take_profit"),
+            atr_value=opp.get("atr_value"),
+            direction=opp.get("direction")
+        )
+    
     async def scan_all_cryptos(self, request: ScannerRequest) -> ScannerResponse:
         """Escanea todas las criptomonedas configuradas"""
         
         # Obtener lista de símbolos
         # Usar símbolos personalizados o todos por defecto
-        symbols = request.symbols if request.symbols else get_all_symbols()
-        
-        # Validar máximo 5 símbolos personalizados
-        if request.symbols and len(request.symbols) > 5:
-            raise ValueError("Máximo 5 símbolos permitidos para escaneo personalizado")
+        symbols = self._resolve_symbols(request)
         
         print(f"🔍 Escaneando {len(symbols)} criptomonedas...")
         print(f"📊 Timeframe: {request.timeframe}")
         print(f"🎯 Filtro mínimo: {request.min_confluence}%")
         
-        # Analizar cada cripto
-        results = []
-        for i, symbol in enumerate(symbols, 1):
-            print(f"  [{i}/{len(symbols)}] Analizando {symbol}...")
-            analysis = await self.analyze_crypto(symbol, request.timeframe)
-            results.append(analysis)
+        df_btc, df_eth, prices = await self._prepare_scan(symbols)
+        
+        # Fase 1 (red): velas y precio de cada símbolo, en paralelo por exchange
+        async def fetch(symbol: str):
+            return await self.fetch_symbol_data(symbol, request.timeframe, prices.get(symbol))
+        
+        # Resultados en el orden original de símbolos
+        results = [None] * len(symbols)
+        fetched = {}
+        async for index, status, value in self._iter_outcomes(symbols, request, fetch):
+            if status == "ok":
+                fetched[index] = value
+            else:
+                results[index] = self._failed_result(symbols[index], status, value, request)
+        
+        # Fase 2 (cálculo): indicadores de todo el universo en bloque + módulos
+        self._analyze_fetched(symbols, request.timeframe, fetched, results, df_btc, df_eth, request)
+        
+        return self.build_response(request, results)
+    
+    def _analyze_fetched(
+        self,
+        symbols: List[str],
+        timeframe: str,
+        fetched: Dict[int, Tuple[pd.DataFrame, float]],
+        results: List[Optional[Dict[str, Any]]],
+        df_btc: pd.DataFrame,
+        df_eth: pd.DataFrame,
+        request: ScannerRequest
+    ):
+        """
+        Fase de cálculo de un escaneo: indicadores de todos los símbolos
+        descargados en bloque y los módulos de cada uno.
+        fetched: {índice: (velas, precio)}; rellena results en su índice.
+        """
+        batch = compute_batch({symbols[index]: df for index, (df, _) in fetched.items()})
+        for index, (df, current_price) in fetched.items():
+            symbol = symbols[index]
+            try:
+                results[index] = self.analyze_frame(
+                    symbol, timeframe, df, current_price, df_btc, df_eth,
+                    indicators=IndicatorContext.from_batch(df, batch, symbol)
+                )
+            except Exception as e:
+                results[index] = self._failed_result(symbol, "error", e, request)
+    
+    async def scan_multi_timeframe(self, request: MultiTimeframeScannerRequest) -> MultiTimeframeScannerResponse:
+        """
+        Escanea varios timeframes compartiendo descargas.
+        
+        Se descargan SCANNER_MTF_BASE_LIMIT velas del timeframe base (1h) y
+        los timeframes que con ellas alcanzan SCANNER_MTF_MIN_BARS velas se
+        construyen localmente (resample alineado a UTC). Los que no llegan
+        (p.ej. 1d: 1000 velas de 1h son solo 41 días) se descargan nativos,
+        para que sus EMAs y su confluencia sean comparables con un escaneo
+        normal. Si el exchange de un símbolo devuelve menos velas base de
+        las pedidas (Kraken: máximo 720) y no alcanzan, ese timeframe se
+        descarga nativo solo para ese símbolo.
+        
+        Todas las descargas comparten un único deadline (deadline_seconds)
+        y el límite de concurrencia por exchange. Cada timeframe se analiza
+        con sus últimas 200 velas.
+        """
+        started = time.monotonic()
+        base_timeframe = settings.SCANNER_MTF_BASE_TIMEFRAME
+        timeframes = list(dict.fromkeys(request.timeframes))
+        for timeframe in timeframes:
+            if not can_resample(base_timeframe, timeframe):
+                raise ValueError(f"Timeframe {timeframe} no se puede construir a partir de {base_timeframe}")
+        
+        sources = {
+            timeframe: (
+                "resampled"
+                if resampled_bars(settings.SCANNER_MTF_BASE_LIMIT, timeframe, base_timeframe) >= settings.SCANNER_MTF_MIN_BARS
+                else "native"
+            )
+            for timeframe in timeframes
+        }
+        
+        symbols = self._resolve_symbols(request)
+        print(f"🔍 Escaneo multi-timeframe de {len(symbols)} criptomonedas: {sources} (base {base_timeframe})")
         
+        df_btc, df_eth, prices = await self._prepare_scan(symbols)
+        
+        # Fase 1 (red): velas base una vez por símbolo + timeframes nativos,
+        # en paralelo bajo un único deadline
+        deadline = time.monotonic() + request.deadline_seconds
+        semaphores = self._exchange_semaphores(symbols, request)
+        jobs = {}
+        if "resampled" in sources.values():
+            jobs[base_timeframe] = (symbols, settings.SCANNER_MTF_BASE_LIMIT)
+        for timeframe, source in sources.items():
+            if source == "native":
+                jobs[timeframe] = (symbols, CANDLE_LIMIT)
+        downloads = await self._fetch_downloads(jobs, request, prices, deadline, semaphores)
+        
+        # Símbolos con menos velas base de las necesarias → timeframe nativo
+        short_indices = {}
+        for timeframe in timeframes:
+            if sources[timeframe] != "resampled":
+                continue
+            short = [
+                index for index, (df, _) in downloads[base_timeframe][0].items()
+                if resampled_bars(len(df), timeframe, base_timeframe) < settings.SCANNER_MTF_MIN_BARS
+            ]
+            if short:
+                print(f"↩️ {timeframe}: {len(short)} símbolos sin velas base suficientes, se descargan nativos")
+                short_indices[timeframe] = short
+        fallback_downloads = await self._fetch_downloads(
+            {timeframe: ([symbols[i] for i in short], CANDLE_LIMIT) for timeframe, short in short_indices.items()},
+            request, prices, deadline, semaphores
+        )
+        # timeframe -> {índice en symbols: (estado, valor)}
+        fallbacks = {}
+        for timeframe, (fetched, failed) in fallback_downloads.items():
+            short = short_indices[timeframe]
+            outcomes = {short[j]: ("ok", value) for j, value in fetched.items()}
+            outcomes.update({short[j]: outcome for j, outcome in failed.items()})
+            fallbacks[timeframe] = outcomes
+        
+        # Fase 2 (cálculo): resample local y análisis por timeframe
+        results_by_timeframe = {}
+        for timeframe in timeframes:
+            download = base_timeframe if sources[timeframe] == "resampled" else timeframe
+            fetched, failed = downloads[download]
+            native = fallbacks.get(timeframe, {})
+            
+            results = [None] * len(symbols)
+            for index, (status, error) in failed.items():
+                results[index] = self._failed_result(symbols[index], status, error, request)
+            
+            frames = {}
+            for index, (df, current_price) in fetched.items():
+                try:
+                    if index in native:
+                        status, value = native[index]
+                        if status != "ok":
+                            results[index] = self._failed_result(symbols[index], status, value, request)
+                            continue
+                        df, current_price = value
+                    elif sources[timeframe] == "resampled":
+                        df = resample_ohlcv(df, timeframe, base_timeframe)
+                    frames[index] = (df.tail(CANDLE_LIMIT).reset_index(drop=True), current_price)
+                except Exception as e:
+                    results[index] = self._failed_result(symbols[index], "error", e, request)
+            
+            self._analyze_fetched(symbols, timeframe, frames, results, df_btc, df_eth, request)
+            results_by_timeframe[timeframe] = results
+        
+        return MultiTimeframeScannerResponse(
+            timestamp=datetime.now().isoformat(),
+            base_timeframe=base_timeframe,
+            timeframes=timeframes,
+            timeframe_sources=sources,
+            total_scanned=len(symbols),
+            results=self._merge_timeframes(symbols, timeframes, results_by_timeframe),
+            per_timeframe={
+                timeframe: self.build_response(request.copy(update={"timeframe": timeframe}), results)
+                for timeframe, results in results_by_timeframe.items()
+            },
+            elapsed_seconds=round(time.monotonic() - started, 2)
+        )
+    
+    async def _fetch_universe(
+        self,
+        symbols: List[str],
+        request: ScannerRequest,
+        timeframe: str,
+        prices: Dict[str, float],
+        limit: int,
+        deadline: Optional[float] = None,
+        semaphores: Optional[Dict[str, asyncio.Semaphore]] = None
+    ) -> Tuple[Dict[int, Tuple[pd.DataFrame, float]], Dict[int, Tuple[str, Any]]]:
+        """Velas de todos los símbolos: ({índice: (velas, precio)}, {índice: (estado, error)})"""
+        async def fetch(symbol: str):
+            return await self.fetch_symbol_data(symbol, timeframe, prices.get(symbol), limit=limit)
+        
+        fetched = {}
+        failed = {}
+        async for index, status, value in self._iter_outcomes(symbols, request, fetch, deadline, semaphores):
+            if status == "ok":
+                fetched[index] = value
+            else:
+                failed[index] = (status, value)
+        return fetched, failed
+    
+    async def _fetch_downloads(
+        self,
+        jobs: Dict[str, Tuple[List[str], int]],
+        request: ScannerRequest,
+        prices: Dict[str, float],
+        deadline: float,
+        semaphores: Dict[str, asyncio.Semaphore]
+    ) -> Dict[str, Tuple[Dict[int, Tuple[pd.DataFrame, float]], Dict[int, Tuple[str, Any]]]]:
+        """
+        Varias descargas {timeframe: (símbolos, velas)} con un deadline y
+        semáforos comunes; en paralelo si request.concurrent.
+        """
+        async def download(timeframe: str):
+            symbols, limit = jobs[timeframe]
+            return await self._fetch_universe(symbols, request, timeframe, prices, limit, deadline, semaphores)
+        
+        if request.concurrent:
+            outcomes = await asyncio.gather(*[download(timeframe) for timeframe in jobs])
+        else:
+            outcomes = [await download(timeframe) for timeframe in jobs]
+        return dict(zip(jobs, outcomes))
+    
+    def _merge_timeframes(
+        self,
+        symbols: List[str],
+        timeframes: List[str],
+        results_by_timeframe: Dict[str, List[Dict[str, Any]]]
+    ) -> List[MultiTimeframeResult]:
+        """Confluencia por símbolo en todos los timeframes, ordenada por media"""
+        merged = []
+        for index, symbol in enumerate(symbols):
+            per_symbol = [results_by_timeframe[timeframe][index] for timeframe in timeframes]
+            valid = [r for r in per_symbol if r["recommendation"] not in ("ERROR", "TIMEOUT")]
+            if not valid:
+                continue
+            
+            directions = {r.get("direction") for r in valid}
+            aligned = directions.pop() if len(directions) == 1 and len(valid) == len(timeframes) else None
+            
+            merged.append(MultiTimeframeResult(
+                symbol=symbol,
+                exchange=valid[0]["exchange"],
+                current_price=valid[0]["current_price"],
+                timeframes={
+                    timeframe: TimeframeConfluence(
+                        timeframe=timeframe,
+                        confluence_percentage=r["confluence_percentage"],
+                        recommendation=r["recommendation"],
+                        total_score=r["total_score"],
+                        direction=r.get("direction")
+                    )
+                    for timeframe, r in zip(timeframes, per_symbol)
+                },
+                average_confluence=round(sum(r["confluence_percentage"] for r in valid) / len(valid), 1),
+                aligned_direction=aligned
+            ))
+        
+        merged.sort(key=lambda x: x.average_confluence, reverse=True)
+        return merged
+    
+    def build_response(self, request: ScannerRequest, results: List[Dict[str, Any]], timestamp: str = None) -> ScannerResponse:
+        """
+        Construye el ScannerResponse a partir de los resultados crudos de
+        analyze_crypto aplicando confluencia mínima y filtros avanzados.
+        Permite servir distintos filtros desde un mismo snapshot.
+        """
         # Filtrar por confluencia mínima
-        opportunities = [
-            r for r in results 
-            if r["confluence_percentage"] >= request.min_confluence
-            and r["recommendation"] != "ERROR"
-        ]
+        opportunities = [r for r in results if self._is_opportunity(r, request)]
         
         # Ordenar por confluencias (mayor a menor)
         opportunities.sort(key=lambda x: x["confluence_percentage"], reverse=True)
         
         # Crear objetos CryptoOpportunity
-        top_opportunities = [
-            CryptoOpportunity(
-                symbol=opp["symbol"],
-                current_price=opp["current_price"],
-                confluence_percentage=opp["confluence_percentage"],
-                recommendation=opp["recommendation"],
-                total_score=opp["total_score"],
-                exchange=opp["exchange"],
-                suggested_stop_loss=opp.get("suggested_stop_loss"),
-                suggested_take_profit=opp.get("suggested_take_profit"),
-                atr_value=opp.get("atr_value"),
-                direction=opp.get("direction")
-            )
-            for opp in opportunities
-        ]
+        top_opportunities = [self._to_opportunity(opp) for opp in opportunities]
         
         # 🆕 Aplicar filtros avanzados
         filters_info = {}
@@ -315,9 +661,9 @@ class ScannerService:
         print(f"\n✅ Escaneo completado: {len(top_opportunities)} oportunidades encontradas (después de filtros)")
         
         return ScannerResponse(
-            timestamp=datetime.now().isoformat(),
+            timestamp=timestamp or datetime.now().isoformat(),
             timeframe=request.timeframe,
-            total_scanned=len(symbols),
+            total_scanned=len(results),
             opportunities_found=len(top_opportunities),
             min_confluence_filter=request.min_confluence,
             top_opportunities=top_opportunities,
@@ -325,6 +671,186 @@ class ScannerService:
             filters_applied=filters_info if filters_info else None
         )
     
+    async def scan_stream(self, request: ScannerRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Variante streaming de scan_all_cryptos.
+        
+        Emite eventos a medida que termina cada análisis:
+        - start: símbolos a escanear
+        - progress: un evento por símbolo analizado
+        - opportunity: CryptoOpportunity que pasa confluencia y filtros
+        - summary: resumen final (top ordenado, errores, timeouts)
+        """
+        started = time.monotonic()
+        symbols = self._resolve_symbols(request)
+        
+        yield {
+            "event": "start",
+            "data": {
+                "timestamp": datetime.now().isoformat(),
+                "timeframe": request.timeframe,
+                "total": len(symbols),
+                "min_confluence_filter": request.min_confluence
+            }
+        }
+        
+        df_btc, df_eth, prices = await self._prepare_scan(symbols)
+        
+        completed = 0
+        errors = 0
+        timeouts = 0
+        top_opportunities = []
+        filters_info = {}
+        
+        async for index, analysis in self._iter_results(symbols, request, df_btc, df_eth, prices):
+            completed += 1
+            if analysis["recommendation"] == "ERROR":
+                errors += 1
+            elif analysis["recommendation"] == "TIMEOUT":
+                timeouts += 1
+            
+            yield {
+                "event": "progress",
+                "data": {
+                    "completed": completed,
+                    "total": len(symbols),
+                    "symbol": analysis["symbol"],
+                    "recommendation": analysis["recommendation"],
+                    "confluence_percentage": analysis["confluence_percentage"]
+                }
+            }
+            
+            if not self._is_opportunity(analysis, request):
+                continue
+            
+            candidates = [self._to_opportunity(analysis)]
+            if request.direction_filter or request.exchange_filter:
+                candidates, filters_info = self.apply_advanced_filters(candidates, request)
+            
+            for opportunity in candidates:
+                top_opportunities.append(opportunity)
+                yield {"event": "opportunity", "data": opportunity.dict()}
+        
+        top_opportunities.sort(key=lambda x: x.confluence_percentage, reverse=True)
+        
+        yield {
+            "event": "summary",
+            "data": {
+                "timestamp": datetime.now().isoformat(),
+                "timeframe": request.timeframe,
+                "total_scanned": len(symbols),
+                "opportunities_found": len(top_opportunities),
+                "min_confluence_filter": request.min_confluence,
+                "top_opportunities": [opp.dict() for opp in top_opportunities],
+                "errors": errors,
+                "timeouts": timeouts,
+                "filters_applied": filters_info if filters_info else None,
+                "elapsed_seconds": round(time.monotonic() - started, 2)
+            }
+        }
+    
+    def _failed_result(self, symbol: str, status: str, error, request: ScannerRequest) -> Dict[str, Any]:
+        """Resultado vacío para un símbolo con error o timeout"""
+        exchange_name = get_exchange_for_crypto(symbol)
+        if status == "timeout":
+            return self._empty_result(
+                symbol, exchange_name, "TIMEOUT",
+                f"Timeout: sin respuesta en {request.deadline_seconds}s"
+            )
+        return self._empty_result(symbol, exchange_name, "ERROR", f"Error: {str(error)}")
+    
+    async def _iter_results(
+        self,
+        symbols: List[str],
+        request: ScannerRequest,
+        df_btc: pd.DataFrame = None,
+        df_eth: pd.DataFrame = None,
+        prices: Dict[str, float] = None
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """(índice, resultado) de cada símbolo a medida que termina su análisis"""
+        prices = prices or {}
+        
+        async def analyze(symbol: str):
+            return await self.analyze_crypto(
+                symbol, request.timeframe, df_btc, df_eth, prices.get(symbol)
+            )
+        
+        async for index, status, value in self._iter_outcomes(symbols, request, analyze):
+            if status == "ok":
+                yield index, value
+            else:
+                yield index, self._failed_result(symbols[index], status, value, request)
+    
+    async def _iter_outcomes(
+        self,
+        symbols: List[str],
+        request: ScannerRequest,
+        worker: Callable[[str], Awaitable[Any]],
+        deadline: Optional[float] = None,
+        semaphores: Optional[Dict[str, asyncio.Semaphore]] = None
+    ) -> AsyncIterator[Tuple[int, str, Any]]:
+        """
+        Ejecuta worker(símbolo) para cada símbolo y emite
+        (índice, estado, valor) en orden de finalización.
+        estado: "ok" (valor = resultado), "error" (valor = excepción) o
+        "timeout" (sin terminar al vencer el deadline global).
+        
+        Con request.concurrent los exchanges avanzan en paralelo y cada uno
+        limita sus tareas simultáneas con un semáforo (además del token
+        bucket); si no, se procesa un símbolo tras otro.
+        
+        deadline (time.monotonic) y semaphores permiten que varias llamadas
+        simultáneas compartan el deadline global y los límites por exchange.
+        """
+        if not request.concurrent:
+            # Analizar cada cripto
+            for i, symbol in enumerate(symbols):
+                print(f"  [{i + 1}/{len(symbols)}] Analizando {symbol}...")
+                try:
+                    yield i, "ok", await worker(symbol)
+                except Exception as e:
+                    yield i, "error", e
+            return
+        
+        if semaphores is None:
+            semaphores = self._exchange_semaphores(symbols, request)
+        timeout = request.deadline_seconds if deadline is None else max(0.0, deadline - time.monotonic())
+        
+        async def run_limited(index: int, symbol: str):
+            async with semaphores[get_exchange_for_crypto(symbol)]:
+                try:
+                    return index, "ok", await worker(symbol)
+                except Exception as e:
+                    return index, "error", e
+        
+        tasks = [asyncio.create_task(run_limited(i, symbol)) for i, symbol in enumerate(symbols)]
+        finished = set()
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=timeout):
+                index, status, value = await next_done
+                finished.add(index)
+                print(f"  [{len(finished)}/{len(symbols)}] {symbols[index]}: {status}")
+                yield index, status, value
+        except asyncio.TimeoutError:
+            print(f"⏱️ Deadline de {request.deadline_seconds}s: {len(symbols) - len(finished)} símbolos sin terminar")
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        for index in range(len(symbols)):
+            if index not in finished:
+                yield index, "timeout", None
+    
+    def _exchange_semaphores(self, symbols: List[str], request: ScannerRequest) -> Dict[str, asyncio.Semaphore]:
+        """Un semáforo por exchange con max_concurrency_per_exchange tareas simultáneas"""
+        return {
+            exchange_name: asyncio.Semaphore(request.max_concurrency_per_exchange)
+            for exchange_name in {get_exchange_for_crypto(s) for s in symbols}
+        }
+    
     def get_scanner_status(self):
         """Estado del scanner"""
         return {
@@ -0,0 +1,272 @@
+# backend/app/services/streaming_indicators.py
+"""
+Indicadores incrementales con estado por (símbolo, timeframe).
+
+Cada indicador guarda solo lo necesario para avanzar una vela en O(1):
+- EMA: último valor (ewm adjust=False)
+- RSI: ventanas de ganancias/pérdidas (medias simples, como los módulos)
+- MACD: EMAs rápida/lenta y EMA de señal
+- ATR: ventana de True Range
+- Volumen medio: ventana de volúmenes
+
+IndicatorStateStore guarda el estado entre ejecuciones. En cada refresco
+solo se procesan las velas cerradas nuevas (normalmente una); la vela en
+formación (la última del DataFrame) se evalúa sobre una copia del estado
+sin confirmarla, porque todavía puede cambiar.
+
+Al persistir el estado, las EMAs arrastran toda la historia procesada y
+no solo las últimas 200 velas de cada descarga.
+"""
+import copy
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingEMA:
+    """EMA (span=period, adjust=False): arranca en el primer valor."""
+
+    def __init__(self, period: int):
+        self.alpha = 2.0 / (period + 1.0)
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingSMA:
+    """Media simple de las últimas `window` entradas (NaN hasta llenar la ventana)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window:
+            return math.nan
+        return sum(self.values) / self.window
+
+
+class StreamingRSI:
+    """RSI con medias simples de ganancias/pérdidas (como calculate_rsi)."""
+
+    def __init__(self, period: int = 14):
+        self.gains = StreamingSMA(period)
+        self.losses = StreamingSMA(period)
+        self.prev_close = None
+
+    def update(self, close: float) -> float:
+        # La primera vela (sin cierre previo) cuenta como 0, igual que pandas
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        self.gains.update(delta if delta > 0 else 0.0)
+        self.losses.update(-delta if delta < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        gain, loss = self.gains.value, self.losses.value
+        if math.isnan(gain) or math.isnan(loss):
+            return math.nan
+        if loss == 0:
+            return 100.0 if gain > 0 else math.nan
+        return 100 - (100 / (1 + gain / loss))
+
+
+class StreamingMACD:
+    """Línea MACD (EMA fast - EMA slow), señal (EMA de la línea) e histograma."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.line = math.nan
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        self.line = self.fast.update(close) - self.slow.update(close)
+        self.signal.update(self.line)
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        return self.line, self.signal.value, self.line - self.signal.value
+
+
+class StreamingATR:
+    """ATR: media simple del True Range."""
+
+    def __init__(self, period: int = 14):
+        self.true_ranges = StreamingSMA(period)
+        self.prev_close = None
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.true_ranges.update(tr)
+
+    @property
+    def value(self) -> float:
+        return self.true_ranges.value
+
+
+class StreamingIndicatorState:
+    """
+    Estado de indicadores de un (símbolo, timeframe).
+
+    values() usa las mismas claves que compute_batch, más ema_21_slope
+    (pendiente de 5 velas que usa BreakoutValidatorModule).
+    """
+
+    EMA_PERIODS = (9, 21, 50, 200)
+
+    def __init__(self):
+        self.emas = {period: StreamingEMA(period) for period in self.EMA_PERIODS}
+        self.macd = StreamingMACD(12, 26, 9)
+        self.rsi = StreamingRSI(14)
+        self.atr = StreamingATR(14)
+        self.volume_avg = StreamingSMA(20)
+        self.ema_21_history = deque(maxlen=5)
+        self.last_timestamp = None
+        self.bars = 0
+
+    def update(self, timestamp, open_: float, high: float, low: float, close: float, volume: float):
+        """Procesa una vela (O(1))."""
+        for ema in self.emas.values():
+            ema.update(close)
+        self.ema_21_history.append(self.emas[21].value)
+        self.macd.update(close)
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        self.volume_avg.update(volume)
+        self.last_timestamp = timestamp
+        self.bars += 1
+
+    def values(self) -> Dict[str, float]:
+        macd_line, macd_signal, macd_hist = self.macd.value
+        history = self.ema_21_history
+        values = {f"ema_{period}": ema.value for period, ema in self.emas.items()}
+        values.update({
+            "rsi_14": self.rsi.value,
+            "macd": macd_line,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "atr_14": self.atr.value,
+            "volume_avg_20": self.volume_avg.value,
+            "ema_21_slope": (history[-1] - history[0]) / 5 if len(history) == 5 else 0
+        })
+        return values
+
+    def preview(self, candle) -> Dict[str, float]:
+        """Valores incluyendo una vela en formación, sin modificar el estado."""
+        state = copy.deepcopy(self)
+        state.update(*candle)
+        return state.values()
+
+
+def _candles(df: pd.DataFrame):
+    return zip(
+        df["timestamp"], df["open"].to_numpy(), df["high"].to_numpy(),
+        df["low"].to_numpy(), df["close"].to_numpy(), df["volume"].to_numpy()
+    )
+
+
+class IndicatorStateStore:
+    """Estados incrementales por (símbolo, timeframe), persistentes entre ejecuciones."""
+
+    def __init__(self):
+        self._states: Dict[Tuple[str, str], StreamingIndicatorState] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.bars_processed = 0
+        self.rebuilds = 0
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def sync(self, symbol: str, timeframe: str, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Avanza el estado con las velas cerradas nuevas de df y retorna
+        los indicadores incluyendo la última vela (en formación).
+
+        Si df no contiene la última vela procesada (estado vacío, hueco o
+        datos más antiguos) el estado se reconstruye con todo df.
+
+        Se puede llamar desde hilos (validación en lote con
+        asyncio.to_thread) y desde el event loop a la vez: cada
+        (símbolo, timeframe) se sincroniza bajo su propio lock, así dos
+        llamadas nunca confirman las mismas velas dos veces.
+        """
+        key = (symbol, timeframe)
+        with self._key_lock(key):
+            return self._sync_locked(key, symbol, timeframe, df)
+
+    def _sync_locked(self, key: Tuple[str, str], symbol: str, timeframe: str, df: pd.DataFrame) -> Dict[str, float]:
+        state = self._states.get(key)
+        timestamps = df["timestamp"]
+        closed = df.iloc[:-1]
+
+        if state is not None and state.last_timestamp is not None:
+            position = timestamps.searchsorted(state.last_timestamp)
+            known = position < len(timestamps) - 1 and timestamps.iloc[position] == state.last_timestamp
+            if known:
+                new_closed = closed.iloc[position + 1:]
+            else:
+                state = None
+
+        if state is None:
+            state = StreamingIndicatorState()
+            new_closed = closed
+            with self._lock:
+                self.rebuilds += 1
+            logger.debug(f"🔁 Estado de indicadores reconstruido: {symbol} {timeframe}")
+
+        for candle in _candles(new_closed):
+            state.update(*candle)
+        with self._lock:
+            self.bars_processed += len(new_closed)
+        self._states[key] = state
+
+        return state.preview(next(_candles(df.iloc[-1:])))
+
+    def clear(self):
+        self._states.clear()
+
+    def stats(self) -> dict:
+        return {
+            "states": len(self._states),
+            "bars_processed": self.bars_processed,
+            "rebuilds": self.rebuilds
+        }
+
+
+# Singleton
+_state_store = None
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Obtiene instancia del almacén de estados de indicadores."""
+    global _state_store
+    if _state_store is None:
+        _state_store = IndicatorStateStore()
+    return _state_store
@@ -0,0 +1,173 @@
+# backend/app/services/swing_points.py
+"""
+Índice de swing points (pivots) y niveles de soporte/resistencia.
+
+Los pivots se detectan con comparaciones vectorizadas contra las
+``order`` velas a cada lado (sin bucles por vela). Los niveles se
+agrupan con la misma regla first-fit de siempre (cada pivot, en orden
+cronológico, se suma al primer nivel creado dentro de ``tolerance``),
+pero buscando candidatos por bisect sobre los precios ordenados de los
+niveles en vez de comparar cada pivot contra todos.
+
+El índice se construye una vez por DataFrame y lo consultan
+TechnicalAnalysisModule.find_support_resistance,
+EntryContextAnalyzer._find_key_levels y
+TradingLevelsService.analyze_proximity.
+"""
+import bisect
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ORDER = 2
+DEFAULT_TOLERANCE = 0.02
+
+
+@dataclass
+class SwingLevel:
+    """Nivel agrupado: precio del pivot que lo creó y número de toques."""
+    price: float
+    strength: int
+    kind: str  # "support" | "resistance"
+    first_index: int
+    last_index: int
+
+
+def find_pivots(values: np.ndarray, order: int = DEFAULT_ORDER, kind: str = "low") -> np.ndarray:
+    """
+    Posiciones de los pivots: mínimos (kind="low") o máximos (kind="high")
+    estrictos respecto a las ``order`` velas de cada lado.
+    """
+    n = len(values)
+    if n < 2 * order + 1:
+        return np.empty(0, dtype=np.int64)
+
+    center = values[order:n - order]
+    mask = np.ones(len(center), dtype=bool)
+    for offset in range(1, order + 1):
+        left = values[order - offset:n - order - offset]
+        right = values[order + offset:n - order + offset]
+        if kind == "low":
+            mask &= (center < left) & (center < right)
+        else:
+            mask &= (center > left) & (center > right)
+    return np.flatnonzero(mask) + order
+
+
+def cluster_levels(
+    positions: np.ndarray,
+    prices: np.ndarray,
+    tolerance: float,
+    kind: str
+) -> List[SwingLevel]:
+    """
+    Agrupación first-fit en orden de llegada (cronológico): cada pivot se
+    suma al primer nivel creado cuyo precio cumple
+    abs(nivel - precio) / precio < tolerance; si no hay ninguno, abre un
+    nivel nuevo con su precio.
+
+    Los precios de los niveles se mantienen ordenados, así que solo se
+    comprueban los pocos niveles dentro de la banda ±tolerance (bisect)
+    en vez de recorrer todos los niveles por cada pivot.
+    """
+    levels: List[SwingLevel] = []
+    anchors: List[float] = []   # precios de los niveles, ordenados
+    anchor_ids: List[int] = []  # índice en levels de cada precio de anchors
+
+    # Banda algo más ancha que la tolerancia; la condición exacta se evalúa después
+    margin = tolerance * (1 + 1e-9) + 1e-12
+    for position, price in zip(positions, prices):
+        lo = bisect.bisect_left(anchors, price - price * margin)
+        hi = bisect.bisect_right(anchors, price + price * margin)
+
+        match = None
+        for k in range(lo, hi):
+            level_id = anchor_ids[k]
+            if abs(levels[level_id].price - price) / price < tolerance and (match is None or level_id < match):
+                match = level_id
+
+        if match is None:
+            k = bisect.bisect_right(anchors, price)
+            anchors.insert(k, price)
+            anchor_ids.insert(k, len(levels))
+            levels.append(SwingLevel(
+                price=price,
+                strength=1,
+                kind=kind,
+                first_index=int(position),
+                last_index=int(position)
+            ))
+        else:
+            levels[match].strength += 1
+            levels[match].last_index = int(position)
+    return levels
+
+
+class SwingPointIndex:
+    """Pivots de un DataFrame y niveles S/R agrupados, memoizados por consulta."""
+
+    def __init__(self, highs: np.ndarray, lows: np.ndarray, order: int = DEFAULT_ORDER):
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.order = order
+        self.length = len(self.lows)
+        self.low_positions = find_pivots(self.lows, order, "low")
+        self.high_positions = find_pivots(self.highs, order, "high")
+        self._levels: Dict[Tuple, List[SwingLevel]] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, order: int = DEFAULT_ORDER) -> "SwingPointIndex":
+        return cls(df["high"].to_numpy(dtype=np.float64), df["low"].to_numpy(dtype=np.float64), order)
+
+    def levels(
+        self,
+        kind: str,
+        tolerance: float = DEFAULT_TOLERANCE,
+        last_bars: Optional[int] = None
+    ) -> List[SwingLevel]:
+        """
+        Niveles de soporte (kind="support") o resistencia ("resistance"),
+        opcionalmente solo con pivots de las últimas ``last_bars`` velas.
+        """
+        key = (kind, tolerance, last_bars)
+        if key not in self._levels:
+            if kind == "support":
+                positions, values = self.low_positions, self.lows
+            else:
+                positions, values = self.high_positions, self.highs
+            if last_bars is not None:
+                positions = positions[positions >= self.length - last_bars]
+            self._levels[key] = cluster_levels(positions, values[positions], tolerance, kind)
+        return self._levels[key]
+
+    def nearest(
+        self,
+        price: float,
+        kind: str,
+        tolerance: float = DEFAULT_TOLERANCE,
+        last_bars: Optional[int] = None
+    ) -> Optional[SwingLevel]:
+        """Soporte más cercano por debajo de ``price`` o resistencia más cercana por encima."""
+        if kind == "support":
+            candidates = [level for level in self.levels(kind, tolerance, last_bars) if level.price < price]
+            return max(candidates, key=lambda level: level.price, default=None)
+        candidates = [level for level in self.levels(kind, tolerance, last_bars) if level.price > price]
+        return min(candidates, key=lambda level: level.price, default=None)
+
+    def near(
+        self,
+        price: float,
+        max_distance_pct: float,
+        tolerance: float = DEFAULT_TOLERANCE,
+        last_bars: Optional[int] = None
+    ) -> List[Tuple[SwingLevel, float]]:
+        """(nivel, distancia %) de los niveles a menos de max_distance_pct del precio."""
+        nearby = []
+        for kind in ("support", "resistance"):
+            for level in self.levels(kind, tolerance, last_bars):
+                distance_pct = abs(price - level.price) / price * 100
+                if distance_pct <= max_distance_pct:
+                    nearby.append((level, distance_pct))
+        return sorted(nearby, key=lambda item: item[1])
@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import List, Optional
 from pathlib import Path
 from app.models.trading_levels import TradingLevel, TradingLevelCreate, TradingLevelUpdate, LevelsAnalysis
+from app.services.swing_points import SwingPointIndex
 
 class TradingLevelsService:
     def __init__(self):
@@ -86,7 +87,13 @@ class TradingLevelsService:
         
         return False
     
-    def analyze_proximity(self, symbol: str, entry_price: float, direction: str) -> LevelsAnalysis:
+    def analyze_proximity(
+        self,
+        symbol: str,
+        entry_price: float,
+        direction: str,
+        swing_index: Optional[SwingPointIndex] = None
+    ) -> LevelsAnalysis:
         """
         Analizar proximidad del precio de entrada a niveles clave
         
@@ -96,6 +103,9 @@ class TradingLevelsService:
         - Cerca de Soporte/Resistencia (1%): +2 puntos
         
         Máximo: 10 puntos bonus
+        
+        Con swing_index también se consideran los soportes/resistencias
+        detectados en las velas (si no hay ya uno manual cerca).
         """
         levels = self.get_levels_by_symbol(symbol, active_only=True)
         
@@ -147,6 +157,28 @@ class TradingLevelsService:
                     "notes": level.notes
                 })
         
+        if swing_index is not None:
+            manual_types = {
+                item["level_type"] for item in nearby
+                if item["level_type"] in ["Soporte", "Resistencia"] and item["points"] > 0
+            }
+            for swing_level, distance_pct in swing_index.near(entry_price, max_distance_pct=1):
+                level_type = "Soporte" if swing_level.kind == "support" else "Resistencia"
+                if level_type in manual_types:
+                    continue
+                manual_types.add(level_type)
+                bonus_points += 2
+                nearby.append({
+                    "level_type": level_type,
+                    "direction": "BULLISH" if swing_level.kind == "support" else "BEARISH",
+                    "zone_high": round(float(swing_level.price), 2),
+                    "zone_low": None,
+                    "distance_pct": round(distance_pct, 2),
+                    "points": 2,
+                    "status": f"📍 A {distance_pct:.1f}% del {level_type} detectado",
+                    "notes": f"Swing point automático ({swing_level.strength} toques)"
+                })
+        
         # Cap a 10 puntos máximo
         bonus_points = min(bonus_points, 10)
         
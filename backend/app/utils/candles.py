@@ -0,0 +1,72 @@
+# backend/app/utils/candles.py
+"""
+Utilidades de velas: duración de cada timeframe y resampleo local.
+
+resample_ohlcv construye velas de 4h/1d a partir de velas de 1h ya
+descargadas. Los buckets se alinean a epoch UTC (origin="epoch"), igual
+que las velas de Kraken y Binance: 4h empieza a las 00/04/08/... UTC y
+1d a las 00:00 UTC.
+"""
+import pandas as pd
+
+TIMEFRAME_SECONDS = {
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+
+def can_resample(base_timeframe: str, timeframe: str) -> bool:
+    """True si timeframe se puede construir a partir de base_timeframe."""
+    if base_timeframe not in TIMEFRAME_SECONDS or timeframe not in TIMEFRAME_SECONDS:
+        return False
+    return TIMEFRAME_SECONDS[timeframe] % TIMEFRAME_SECONDS[base_timeframe] == 0
+
+
+def resampled_bars(base_bars: int, timeframe: str, base_timeframe: str = "1h") -> int:
+    """
+    Velas completas de timeframe que se obtienen como mínimo con base_bars
+    velas de base_timeframe (el primer bucket puede quedar incompleto).
+    """
+    per_bucket = TIMEFRAME_SECONDS[timeframe] // TIMEFRAME_SECONDS[base_timeframe]
+    if per_bucket == 1:
+        return base_bars
+    return max(0, base_bars // per_bucket - 1)
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, base_timeframe: str = "1h") -> pd.DataFrame:
+    """
+    Agrega velas OHLCV (columna 'timestamp' en UTC) a un timeframe mayor.
+
+    - open: primera, high: máximo, low: mínimo, close: última, volume: suma
+    - Se descarta el primer bucket si está incompleto (la descarga empezó
+      a mitad de vela); el último se conserva aunque esté en formación,
+      como hace el exchange con la vela actual.
+    - Los buckets sin ninguna vela base (huecos del exchange) no aparecen.
+    """
+    if not can_resample(base_timeframe, timeframe):
+        raise ValueError(f"No se puede construir {timeframe} a partir de {base_timeframe}")
+    if timeframe == base_timeframe:
+        return df
+
+    seconds = TIMEFRAME_SECONDS[timeframe]
+    per_bucket = seconds // TIMEFRAME_SECONDS[base_timeframe]
+
+    grouped = df.set_index("timestamp").resample(f"{seconds}s", origin="epoch", label="left", closed="left")
+    resampled = grouped.agg({
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum"
+    })
+    counts = grouped["close"].count()
+
+    resampled = resampled[counts > 0]
+    counts = counts[counts > 0]
+    if len(resampled) and counts.iloc[0] < per_bucket:
+        resampled = resampled.iloc[1:]
+
+    return resampled.reset_index()
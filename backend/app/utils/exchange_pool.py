@@ -0,0 +1,114 @@
+# backend/app/utils/exchange_pool.py
+"""
+Pool de clientes ccxt compartido por todo el proceso.
+
+Antes cada MarketDataFetcher instanciaba sus propios clientes (y cada
+cliente su sesión HTTP y sus mercados). El pool crea cada cliente una
+sola vez, al primer uso, y lo reutiliza entre peticiones:
+
+- Clientes async (ccxt.async_support): uno por exchange para todo el
+  event loop. Su sesión aiohttp mantiene las conexiones keep-alive, así
+  que el handshake TLS se paga una vez por exchange.
+- Clientes sync (ccxt): uno por exchange y por hilo, porque los
+  descargadores en hilos (bulk_backfill, DataService) no deben compartir
+  la sesión de requests entre hilos.
+- Los mercados se cargan de forma perezosa: ccxt llama a load_markets en
+  la primera petición que los necesita y quedan cacheados en el cliente
+  compartido.
+
+Se inicia en el startup de la app y se cierra en el shutdown.
+"""
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+logger = logging.getLogger(__name__)
+
+EXCHANGES = ("kraken", "kucoin", "coinex")
+
+
+class ExchangeClientPool:
+    """Clientes ccxt sync/async reutilizables, creados al primer uso."""
+
+    def __init__(self, exchange_names: Tuple[str, ...] = EXCHANGES):
+        self.exchange_names = tuple(exchange_names)
+        self._async_clients: Dict[str, object] = {}
+        self._sync_local = threading.local()
+        self._sync_clients: List[object] = []
+        self._sync_lock = threading.Lock()
+        self.created = 0
+        self.closed = False
+
+    def _check(self, exchange_name: str):
+        if exchange_name not in self.exchange_names:
+            raise KeyError(exchange_name)
+
+    def get_async(self, exchange_name: str):
+        """Cliente async compartido del exchange."""
+        self._check(exchange_name)
+        client = self._async_clients.get(exchange_name)
+        if client is None:
+            client = getattr(ccxt_async, exchange_name)({'enableRateLimit': True})
+            self._async_clients[exchange_name] = client
+            self.created += 1
+            self.closed = False
+            logger.info(f"🔌 Cliente async creado: {exchange_name}")
+        return client
+
+    def get_sync(self, exchange_name: str):
+        """Cliente sync del exchange para el hilo actual."""
+        self._check(exchange_name)
+        clients = getattr(self._sync_local, "clients", None)
+        if clients is None:
+            clients = self._sync_local.clients = {}
+        client = clients.get(exchange_name)
+        if client is None:
+            client = getattr(ccxt, exchange_name)({'enableRateLimit': True})
+            clients[exchange_name] = client
+            with self._sync_lock:
+                self._sync_clients.append(client)
+                self.created += 1
+        return client
+
+    async def close(self):
+        """Cierra las sesiones HTTP de todos los clientes creados."""
+        for client in self._async_clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"⚠️ Error cerrando {client.id}: {e}")
+        self._async_clients = {}
+
+        with self._sync_lock:
+            sync_clients, self._sync_clients = self._sync_clients, []
+        for client in sync_clients:
+            session = getattr(client, "session", None)
+            if session is not None:
+                session.close()
+        self._sync_local = threading.local()
+        self.closed = True
+        logger.info("🔌 Pool de exchanges cerrado")
+
+    def stats(self) -> dict:
+        return {
+            "async_clients": sorted(self._async_clients.keys()),
+            "sync_clients": len(self._sync_clients),
+            "created": self.created,
+            "markets_loaded": sorted(
+                name for name, client in self._async_clients.items() if client.markets
+            )
+        }
+
+
+# Singleton
+_pool = None
+
+def get_exchange_pool() -> ExchangeClientPool:
+    """Obtiene el pool de clientes de exchanges del proceso."""
+    global _pool
+    if _pool is None:
+        _pool = ExchangeClientPool()
+    return _pool
@@ -1,34 +1,58 @@
 # backend/app/utils/market_data.py
-import ccxt
 import pandas as pd
 import logging
+from typing import Dict, List
 from app.config.crypto_config import get_exchange_for_crypto
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.exchange_pool import ExchangeClientPool, get_exchange_pool
 
 logger = logging.getLogger(__name__)
 
 class MarketDataFetcher:
-    def __init__(self):
-        """Inicializa fetcher con múltiples exchanges"""
-        self.exchanges = {
-            "kraken": ccxt.kraken({'enableRateLimit': True}),
-            "kucoin": ccxt.kucoin({'enableRateLimit': True}),
-            "coinex": ccxt.coinex({'enableRateLimit': True})
-        }
-        logger.info(f"✅ Exchanges inicializados: {list(self.exchanges.keys())}")
+    def __init__(self, pool: ExchangeClientPool = None):
+        """
+        Fetcher sobre el pool de clientes compartido del proceso.
+        No crea clientes propios: construirlo es gratis y close() no
+        cierra nada (el pool se cierra en el shutdown de la app).
+        """
+        self.pool = pool or get_exchange_pool()
+    
+    @property
+    def exchanges(self):
+        """Exchanges disponibles"""
+        return self.pool.exchange_names
     
     def _get_exchange(self, symbol: str):
-        """Obtiene el exchange correcto para un símbolo"""
+        """Obtiene el cliente sync del exchange correcto para un símbolo"""
         exchange_name = get_exchange_for_crypto(symbol)
         logger.debug(f"   Exchange para {symbol}: {exchange_name}")
-        return self.exchanges[exchange_name]
+        return self.pool.get_sync(exchange_name)
+    
+    def _get_async_exchange(self, symbol: str):
+        """Obtiene el cliente async (ccxt.async_support) para un símbolo"""
+        return self._get_async_client(get_exchange_for_crypto(symbol))
+    
+    def _get_async_client(self, exchange_name: str):
+        """Obtiene el cliente async compartido de un exchange"""
+        return self.pool.get_async(exchange_name)
+    
+    async def close(self):
+        """Sin efecto: los clientes pertenecen al pool compartido"""
+        return None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
     
     async def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 500):
         """Obtiene datos OHLCV del exchange correcto"""
         exchange_name = get_exchange_for_crypto(symbol)
         try:
             logger.debug(f"   Fetching OHLCV: {symbol} from {exchange_name}")
-            exchange = self._get_exchange(symbol)
-            ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            exchange = self._get_async_exchange(symbol)
+            ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             logger.debug(f"   ✓ Obtenidos {len(df)} candles para {symbol}")
@@ -42,8 +66,8 @@ class MarketDataFetcher:
         exchange_name = get_exchange_for_crypto(symbol)
         try:
             logger.debug(f"   Fetching precio: {symbol} from {exchange_name}")
-            exchange = self._get_exchange(symbol)
-            ticker = exchange.fetch_ticker(symbol)
+            exchange = self._get_async_exchange(symbol)
+            ticker = await exchange.fetch_ticker(symbol)
             price = ticker['last']
             logger.debug(f"   ✓ Precio {symbol}: ${price}")
             return price
@@ -51,16 +75,38 @@ class MarketDataFetcher:
             logger.error(f"   ❌ Error obteniendo precio de {symbol} ({exchange_name}): {str(e)}")
             raise Exception(f"Error obteniendo precio de {symbol} en {exchange_name}: {str(e)}")
 
+    async def get_current_prices(self, exchange_name: str, symbols: List[str]) -> Dict[str, float]:
+        """
+        Precios actuales de varios símbolos de un mismo exchange.
+        
+        Usa una sola llamada fetch_tickers si el exchange la soporta;
+        si no, cae a fetch_ticker por símbolo.
+        """
+        exchange = self._get_async_client(exchange_name)
+        try:
+            if exchange.has.get('fetchTickers'):
+                logger.debug(f"   Fetching {len(symbols)} tickers en bloque de {exchange_name}")
+                tickers = await exchange.fetch_tickers(symbols)
+            else:
+                tickers = {}
+                for symbol in symbols:
+                    tickers[symbol] = await exchange.fetch_ticker(symbol)
+        except Exception as e:
+            logger.error(f"   ❌ Error obteniendo tickers de {exchange_name}: {str(e)}")
+            raise Exception(f"Error obteniendo precios en {exchange_name}: {str(e)}")
+        
+        return {
+            symbol: ticker['last']
+            for symbol, ticker in tickers.items()
+            if ticker and ticker.get('last') is not None
+        }
+
     async def get_historical_ohlcv_range(self, symbol: str, timeframe: str, start_date, end_date):
         """Obtiene datos históricos en un rango de fechas para backtesting"""
-        import asyncio
-        from datetime import datetime
-    
         exchange_name = get_exchange_for_crypto(symbol)
-        exchange = self.exchanges.get(exchange_name)
-    
-        if not exchange:
+        if exchange_name not in self.exchanges:
             raise Exception(f"Exchange {exchange_name} no disponible")
+        exchange = self._get_async_exchange(symbol)
     
         since = int(start_date.timestamp() * 1000)
         end_ts = int(end_date.timestamp() * 1000)
@@ -72,9 +118,9 @@ class MarketDataFetcher:
     
         while current_since < end_ts:
             try:
-                await asyncio.sleep(0.6 if exchange_name == "kraken" else 0.3)
+                await get_rate_limiter(exchange_name).acquire_async()
     
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=current_since, limit=1000)
+                ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, since=current_since, limit=1000)
     
                 if not ohlcv:
                     break
@@ -105,14 +151,10 @@ class MarketDataFetcher:
 
     def get_historical_ohlcv_range_sync(self, symbol: str, timeframe: str, start_date, end_date):
         """Obtiene datos históricos SYNC (para backtesting sin async)"""
-        import time
-        from datetime import datetime
-        
         exchange_name = get_exchange_for_crypto(symbol)
-        exchange = self.exchanges.get(exchange_name)
-        
-        if not exchange:
+        if exchange_name not in self.exchanges:
             raise Exception(f"Exchange {exchange_name} no disponible")
+        exchange = self.pool.get_sync(exchange_name)
         
         since = int(start_date.timestamp() * 1000)
         end_ts = int(end_date.timestamp() * 1000)
@@ -124,8 +166,8 @@ class MarketDataFetcher:
         
         while current_since < end_ts:
             try:
-                # Sleep SYNC
-                time.sleep(0.6 if exchange_name == "kraken" else 0.3)
+                # Token bucket del exchange (compartido entre hilos)
+                get_rate_limiter(exchange_name).acquire()
                 
                 # fetch_ohlcv es SYNC por defecto
                 ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=current_since, limit=1000)
@@ -156,3 +198,14 @@ class MarketDataFetcher:
         
         logger.info(f"✅ {len(df)} velas descargadas (SYNC)")
         return df
+
+
+# Singleton
+_fetcher = None
+
+def get_market_data_fetcher() -> MarketDataFetcher:
+    """Obtiene el fetcher compartido (sobre el pool de exchanges)."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = MarketDataFetcher()
+    return _fetcher
@@ -0,0 +1,63 @@
+# backend/app/utils/rate_limiter.py
+"""
+Token buckets por exchange.
+
+Cada exchange tiene su propio presupuesto de requests, así que los
+exchanges descargan en paralelo mientras cada uno respeta su límite.
+Seguro entre hilos y utilizable desde código sync y async.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict
+
+from app.config.crypto_config import get_exchange_rate_limit
+
+
+class TokenBucket:
+    """Token bucket con reservas: las esperas se reparten en orden de llegada."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserva un token y retorna cuántos segundos hay que esperar."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Bloquea el hilo hasta disponer de un token."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Espera (sin bloquear el event loop) hasta disponer de un token."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(exchange_name: str) -> TokenBucket:
+    """Obtiene el token bucket compartido (por proceso) de un exchange."""
+    with _buckets_lock:
+        bucket = _buckets.get(exchange_name)
+        if bucket is None:
+            bucket = TokenBucket(get_exchange_rate_limit(exchange_name))
+            _buckets[exchange_name] = bucket
+        return bucket
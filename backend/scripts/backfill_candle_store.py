@@ -0,0 +1,40 @@
+"""
+Backfill concurrente del universo CRYPTO_CONFIG al almacén de velas.
+
+Uso (desde backend/):
+    python scripts/backfill_candle_store.py [--symbols BTC/USDT ETH/USDT] [--timeframes 1h 4h 1d] [--days 730]
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.bulk_backfill import BulkBackfillEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill concurrente de velas históricas")
+    parser.add_argument("--symbols", nargs="*", help="Símbolos (default: todo CRYPTO_CONFIG)")
+    parser.add_argument("--timeframes", nargs="*", default=["1h", "4h", "1d"])
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--workers-per-exchange", type=int, default=2)
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    engine = BulkBackfillEngine(args.data_dir, workers_per_exchange=args.workers_per_exchange)
+    summary = engine.run(symbols=args.symbols, timeframes=args.timeframes, days=args.days)
+
+    print(f"\n✅ Backfill completado en {summary['elapsed_seconds']}s")
+    print(f"   Trabajos: {summary['successful']}/{summary['total_jobs']} OK")
+    print(f"   Velas agregadas: {summary['candles_added']}")
+    for result in summary["results"]:
+        if result["status"] != "ok":
+            print(f"   ❌ {result['symbol']} {result['timeframe']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
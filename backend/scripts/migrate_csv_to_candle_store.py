@@ -0,0 +1,37 @@
+"""
+Migración única de CSV históricos al almacén columnar de velas.
+
+Uso (desde backend/):
+    python scripts/migrate_csv_to_candle_store.py [--source data] [--overwrite]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.candle_store import CandleStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra CSV de velas al almacén binario")
+    parser.add_argument("--data-dir", default="data", help="Directorio de datos (default: data)")
+    parser.add_argument("--source", action="append", help="Directorio(s) con CSV a migrar")
+    parser.add_argument("--overwrite", action="store_true", help="Reemplazar archivos ya migrados")
+    args = parser.parse_args()
+
+    store = CandleStore(args.data_dir)
+    sources = args.source or [args.data_dir]
+
+    total = {}
+    for source in sources:
+        print(f"📂 Migrando CSV de {source} → {store.store_dir}")
+        total.update(store.migrate_csv_files(source, overwrite=args.overwrite))
+
+    for key, rows in sorted(total.items()):
+        print(f"  ✅ {key}: {rows} velas")
+    print(f"\n✅ Migración completada: {len(total)} series")
+
+
+if __name__ == "__main__":
+    main()